@@ -8,8 +8,12 @@ from visuals import (
     plot_artist_map,
     plot_genre_clusters,
     plot_language_entropy,
-    load_mood_cluster_model
+    plot_rolling_popularity,
+    plot_similar_tracks,
+    get_mood_predictor,
+    sidebar_filters
 )
+from streamlit_app.profiler import begin_rerun, show_profile_panel
 
 # Set up basic configuration for the Streamlit app.
 # This includes the title shown in the browser tab and layout styling.
@@ -18,6 +22,10 @@ st.set_page_config(
     layout="wide",
 )
 
+# Opt-in render profiling (open the app with ?profile=1): times every chart's load, transform,
+# spec build and render plus each cached loader call, shown in a panel at the bottom of the page
+begin_rerun()
+
 # Display the main title of the dashboard.
 # Markdown below it gives a concise summary of what the user can explore.
 st.title("Global Music Trends Dashboard")
@@ -28,14 +36,20 @@ st.markdown(
     """
 )
 
-# Create three tabs that organize the dashboard into major categories:
+# Global year-range and region filters in the sidebar.
+# Every chart below receives the same selection, and the filtering runs as indexed SQL queries.
+filters = sidebar_filters()
+
+# Create four tabs that organize the dashboard into major categories:
 # 1. Genre & Mood
 # 2. Languages & Regions
 # 3. Artist Origins & Advanced ML Predictor
-tab1, tab2, tab3 = st.tabs([
+# 4. Sounds Like (nearest-neighbour track search)
+tab1, tab2, tab3, tab4 = st.tabs([
     "Genre & Mood",
     "Languages & Regions",
-    "Artist Origins"
+    "Artist Origins",
+    "Sounds Like"
 ])
 
 # Tab 1 contains four key visualizations focused on genre popularity and mood analytics.
@@ -46,12 +60,12 @@ with tab1:
     with col1:
         st.subheader("Genre Trends Over Time")
         st.markdown("Explore how the popularity of different music genres evolves year over year.")
-        plot_genre_over_time()
+        plot_genre_over_time(filters)
 
     with col2:
         st.subheader("Mood Metrics by Genre")
         st.markdown("Select a mood-related audio feature (like energy or valence) to compare across genres.")
-        plot_mood_heatmap()
+        plot_mood_heatmap(filters)
 
     col3, col4 = st.columns(2)
     # A scatterplot to show how genres vary in emotional and rhythmic space.
@@ -59,13 +73,19 @@ with tab1:
     with col3:
         st.subheader("Mood Landscape: Valence vs Danceability")
         st.markdown("Genres in the top-right are both upbeat and danceable.")
-        plot_valence_vs_danceability()
+        plot_valence_vs_danceability(filters)
 
     # Clustered genres using KMeans or other unsupervised learning based on mood features.
     # Gives a higher-level view of how genres group based on shared audio characteristics.
     with col4:
         st.subheader("Genre Clusters Based on Mood Similarity")
-        plot_genre_clusters()
+        plot_genre_clusters(filters)
+
+    # Rolling 7/28/90-day share of streams for the top genres, artists or languages.
+    # Shows short-term momentum that yearly counts smooth away.
+    st.subheader("Rolling Popularity")
+    st.markdown("Pick genres, artists or languages and a trailing window to see who is gaining share of streams.")
+    plot_rolling_popularity(filters)
 
 # Tab 2 provides analysis of language usage in global music, as well as country-level artist data.
 with tab2:
@@ -78,14 +98,14 @@ with tab2:
     with col1:
         st.markdown("🈷 **Top Languages in Global Music**")
         st.markdown("Which languages appear most frequently in charted track titles? Hover to see the full names.")
-        plot_language_distribution_expanded()
+        plot_language_distribution_expanded(filters)
 
     # Vertical bar chart showing countries with the highest number of unique artists in the dataset.
     # This gives a sense of global music diversity and artist productivity by region.
     with col2:
         st.markdown("**Top Countries by Unique Artists**")
         st.markdown("Which countries produce the most distinct artists featured in global charts?")
-        plot_top_artist_countries()
+        plot_top_artist_countries(filters)
 
     col3, col4 = st.columns(2)
 
@@ -94,7 +114,7 @@ with tab2:
     with col3:
         st.markdown("**Language Entropy by Region**")
         st.markdown("Measures how evenly languages are distributed in a region’s music charts.")
-        plot_language_entropy()
+        plot_language_entropy(filters)
 
 # Tab 3 combines a choropleth-style map with an interactive machine learning form.
 # This tab is especially useful for showcasing advanced skills like clustering and model prediction.
@@ -108,7 +128,7 @@ with tab3:
     with col1:
         st.markdown("**Global Artist Origin Map**")
         st.markdown("Each circle shows where artists are coming from based on chart data.")
-        plot_artist_map()
+        plot_artist_map(filters)
 
     # This interactive form allows users to input audio features and predict a genre cluster.
     # Based on a trained unsupervised ML model (e.g., KMeans) on mood-based audio features.
@@ -133,35 +153,33 @@ with tab3:
             submitted = st.form_submit_button("Predict Genre Cluster")
 
             if submitted:
-                # Load the trained clustering model from disk (e.g., using joblib or pickle)
-                model = load_mood_cluster_model()
-
-                import pandas as pd
-                # Wrap user input into a DataFrame so it's compatible with the model's `.predict()` method
-                input_df = pd.DataFrame([{
-                    "valence": valence,
-                    "danceability": danceability,
-                    "energy": energy,
-                    "tempo": tempo,
-                    "acousticness": acousticness,
-                    "instrumentalness": instrumentalness,
-                    "liveness": liveness,
-                    "speechiness": speechiness
-                }])
-
-                # Predict which mood-based genre cluster the input features belong to
-                prediction = model.predict(input_df)[0]
-
-                # Load precomputed genre labels for each cluster from CSV
-                cluster_df = pd.read_csv("data/genre_clusters.csv")
-                genres_in_cluster = cluster_df[
-                    cluster_df["cluster"] == prediction
-                ]["track_genre"].dropna().unique()
+                # The predictor is built once per model version and shared by all sessions,
+                # so a submit is one in-memory prediction (no model load or CSV read)
+                result = get_mood_predictor().predict(
+                    valence=valence,
+                    danceability=danceability,
+                    energy=energy,
+                    tempo=tempo,
+                    acousticness=acousticness,
+                    instrumentalness=instrumentalness,
+                    liveness=liveness,
+                    speechiness=speechiness
+                )
 
                 # Display the result to the user
-                st.success(f"Predicted Cluster: Cluster {prediction}")
+                st.success(f"Predicted Cluster: Cluster {result.cluster} ({result.probability:.0%} probability)")
                 st.markdown("Likely genres in this cluster:")
-                st.markdown(", ".join(f"**{genre}**" for genre in sorted(genres_in_cluster)))
+                st.markdown(", ".join(f"**{genre}**" for genre in result.genres))
+
+# Tab 4 finds tracks with the most similar audio features to a chosen track.
+# Backed by a KD-tree over standardized mood features, so lookups stay fast on large catalogues.
+with tab4:
+    st.subheader("Sounds Like")
+    st.markdown("Pick a track to find the tracks and genres closest to it in valence, energy, danceability, tempo and other mood features.")
+    plot_similar_tracks()
 
 # Show footer with attribution and technology stack
-st.markdown("Made by Bria Tran | Powered by Spotify, Kaggle, pandas, and Streamlit")
\ No newline at end of file
+st.markdown("Made by Bria Tran | Powered by Spotify, Kaggle, pandas, and Streamlit")
+
+# Profiling results for this rerun (only shown when profiling is on)
+show_profile_panel()
\ No newline at end of file
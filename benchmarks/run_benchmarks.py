@@ -0,0 +1,261 @@
+# benchmarks/run_benchmarks.py
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Add the project root (for utils) and the scripts folder (for the pipeline definition) to the system path
+# Only lightweight modules are imported here: the stages are forked from this process, and on Linux
+# a child's peak RSS includes the memory of the parent at fork time
+sys.path.append(PROJECT_ROOT)
+sys.path.append(os.path.join(PROJECT_ROOT, "scripts"))
+from run_pipeline import STAGES, topological_order
+
+GENERATOR_SCRIPT = os.path.join(PROJECT_ROOT, "benchmarks", "synthetic_data.py")
+MANIFEST_PATH = os.path.join("data", "synthetic_manifest.json")
+
+RESULTS_DIR = os.path.join(PROJECT_ROOT, "benchmarks", "results")
+
+# Code copied into each workspace, so every script reads and writes the synthetic data
+# (some scripts resolve their paths relative to their own location rather than the working directory)
+CODE_DIRS = ["scripts", "utils", "sql", "streamlit_app"]
+
+# Default scales: chart rows per run
+DEFAULT_ROWS = [10_000, 100_000, 1_000_000]
+
+# Dashboard loaders timed in-process; each is called with (data_version, filters)
+LOADERS = [
+    "get_filter_options", "load_genre_trends", "load_mood_by_genre", "get_language_distribution",
+    "get_artist_origin_data", "load_genre_clusters", "load_language_entropy", "load_rolling_popularity",
+]
+
+# The pipeline stages in dependency order, plus the database build (which needs lang_detect and
+# country_utils) and its incremental refresh; populate_db uses --bulk, the mode meant for large files
+def benchmark_stages():
+    stages = [{"name": s["name"], "script": s["script"], "args": s.get("args", [])} for s in topological_order(STAGES)]
+    stages.append({"name": "populate_db", "script": "scripts/populate_db.py", "args": ["--bulk"]})
+    stages.append({"name": "refresh_aggregates_full", "script": "scripts/populate_db.py", "args": ["refresh", "--full"]})
+    return stages
+
+# Runs a command in the workspace and measures wall time, CPU time and peak resident memory of the process
+# Peak RSS comes from wait4's resource usage for this child only (not available on Windows)
+def run_measured(command, workspace, log_path):
+    start = time.perf_counter()
+    with open(log_path, "w", encoding="utf-8") as log:
+        proc = subprocess.Popen(command, cwd=workspace, stdout=log, stderr=subprocess.STDOUT)
+        if hasattr(os, "wait4"):
+            _, status, usage = os.wait4(proc.pid, 0)
+            proc.returncode = os.waitstatus_to_exitcode(status)
+            cpu_seconds = usage.ru_utime + usage.ru_stime
+            # ru_maxrss is in KiB on Linux and in bytes on macOS
+            peak_rss = usage.ru_maxrss if sys.platform == "darwin" else usage.ru_maxrss * 1024
+        else:
+            proc.wait()
+            cpu_seconds, peak_rss = None, None
+    return {
+        "status": "ok" if proc.returncode == 0 else "failed",
+        "returncode": proc.returncode,
+        "wall_seconds": round(time.perf_counter() - start, 4),
+        "cpu_seconds": None if cpu_seconds is None else round(cpu_seconds, 4),
+        "peak_rss_mb": None if peak_rss is None else round(peak_rss / 2**20, 2),
+    }
+
+# Total size of the files a stage wrote (directories are summed)
+def output_bytes(workspace, paths):
+    total = 0
+    for path in paths:
+        full = os.path.join(workspace, path)
+        if os.path.isdir(full):
+            total += sum(os.path.getsize(os.path.join(root, f)) for root, _, files in os.walk(full) for f in files)
+        elif os.path.exists(full):
+            total += os.path.getsize(full)
+    return total
+
+# Times every dashboard loader in the current process (run inside a workspace by run_loaders)
+# The cache is bypassed so each call measures the query itself; the first call is reported as cold,
+# the median of the repeats as warm, and tracemalloc gives the peak Python allocation of one call
+def time_loaders(repeat=3):
+    sys.path.insert(0, os.getcwd())
+    from streamlit_app import visuals
+
+    if not visuals.database_available():
+        raise RuntimeError("data/music.db is missing; populate_db must run first")
+
+    # Every loader runs unfiltered and with the last two years selected
+    _, last_year, _ = visuals.get_filter_options.__wrapped__()
+    variants = {"all": None, "last_two_years": visuals.ChartFilters(int(last_year) - 1, int(last_year), ())}
+
+    results = []
+    for name in LOADERS:
+        loader = getattr(visuals, name).__wrapped__
+        for variant, filters in variants.items():
+            if name == "get_filter_options" and variant != "all":
+                continue
+            args = (None,) if name == "get_filter_options" else (None, filters)
+            timings = []
+            for _ in range(repeat + 1):
+                start = time.perf_counter()
+                result = loader(*args)
+                timings.append(time.perf_counter() - start)
+
+            tracemalloc.start()
+            loader(*args)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            warm = sorted(timings[1:])[len(timings[1:]) // 2]
+            results.append({
+                "name": name,
+                "variant": variant,
+                "rows": len(result) if hasattr(result, "__len__") else None,
+                "cold_seconds": round(timings[0], 4),
+                "warm_seconds": round(warm, 4),
+                "peak_alloc_mb": round(peak / 2**20, 2),
+            })
+    print(json.dumps(results))
+
+# Runs time_loaders in a fresh process inside the workspace and returns its results
+def run_loaders(workspace, repeat):
+    command = [sys.executable, os.path.abspath(__file__), "loaders", "--repeat", str(repeat)]
+    proc = subprocess.run(command, cwd=workspace, capture_output=True, text=True)
+    if proc.returncode != 0:
+        print(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "loader benchmark failed")
+        return []
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+# Generates data at one scale in a fresh workspace, runs every stage and the loaders, and returns the results
+def benchmark_scale(chart_rows, seed, workspace, repeat):
+    print(f"\n=== {chart_rows:,} chart rows (workspace: {workspace}) ===")
+    for folder in CODE_DIRS:
+        shutil.copytree(os.path.join(PROJECT_ROOT, folder), os.path.join(workspace, folder),
+                        ignore=shutil.ignore_patterns("__pycache__"), dirs_exist_ok=True)
+    os.makedirs(os.path.join(workspace, "models"), exist_ok=True)
+    logs_dir = os.path.join(workspace, "logs")
+    os.makedirs(logs_dir, exist_ok=True)
+
+    command = [sys.executable, GENERATOR_SCRIPT, workspace, "--rows", str(chart_rows), "--seed", str(seed)]
+    stages = [{"name": "generate_synthetic_data",
+               **run_measured(command, workspace, os.path.join(logs_dir, "generate_synthetic_data.log"))}]
+    if stages[0]["status"] != "ok":
+        raise RuntimeError(f"Synthetic data generation failed; see {logs_dir}")
+    with open(os.path.join(workspace, MANIFEST_PATH), "r", encoding="utf-8") as f:
+        dataset = json.load(f)["files"]
+
+    outputs = {s["name"]: s["outputs"] for s in STAGES}
+    for stage in benchmark_stages():
+        command = [sys.executable, os.path.join(workspace, stage["script"])] + stage["args"]
+        result = run_measured(command, workspace, os.path.join(logs_dir, f"{stage['name']}.log"))
+        result = {"name": stage["name"], **result}
+        if stage["name"] in outputs:
+            result["bytes_written"] = output_bytes(workspace, outputs[stage["name"]])
+        stages.append(result)
+        rss = "" if result["peak_rss_mb"] is None else f", peak RSS {result['peak_rss_mb']:,.0f} MB"
+        print(f"{stage['name']:<36} {result['status']:<6} {result['wall_seconds']:>9.2f}s{rss}")
+
+    loaders = run_loaders(workspace, repeat)
+    for loader in loaders:
+        print(f"{loader['name'] + ' [' + loader['variant'] + ']':<48} "
+              f"cold {loader['cold_seconds']:.4f}s, warm {loader['warm_seconds']:.4f}s, {loader['rows']} rows")
+
+    return {"chart_rows": chart_rows, "dataset": dataset, "stages": stages, "loaders": loaders}
+
+# Identifies the code that was measured
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=PROJECT_ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+# Runs the benchmark at every requested scale and writes one JSON results file
+def run(rows, seed=0, output=None, workspace_root=None, keep=False, repeat=3):
+    started = datetime.datetime.now()
+    report = {
+        "created_at": started.isoformat(timespec="seconds"),
+        "git_commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "seed": seed,
+        "runs": [],
+    }
+    for chart_rows in rows:
+        workspace = tempfile.mkdtemp(prefix=f"bench_{chart_rows}_", dir=workspace_root)
+        try:
+            report["runs"].append(benchmark_scale(chart_rows, seed, workspace, repeat))
+        finally:
+            if not keep:
+                shutil.rmtree(workspace, ignore_errors=True)
+
+    output = output or os.path.join(RESULTS_DIR, f"benchmark_{started:%Y%m%d_%H%M%S}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nSaved benchmark results to {output}")
+    return report
+
+# Prints the change in wall time and peak memory of every stage and loader between two result files
+def compare(baseline_path, current_path):
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    with open(current_path, "r", encoding="utf-8") as f:
+        current = json.load(f)
+
+    def index(report):
+        entries = {}
+        for run in report["runs"]:
+            for stage in run["stages"]:
+                entries[(run["chart_rows"], stage["name"])] = (stage.get("wall_seconds"), stage.get("peak_rss_mb"))
+            for loader in run["loaders"]:
+                key = (run["chart_rows"], f"{loader['name']} [{loader['variant']}]")
+                entries[key] = (loader["warm_seconds"], loader["peak_alloc_mb"])
+        return entries
+
+    def change(old, new):
+        if old is None or new is None or old == 0:
+            return "n/a"
+        return f"{(new - old) / old:+.1%}"
+
+    old_entries, new_entries = index(baseline), index(current)
+    print(f"{'rows':>11}  {'stage / loader':<48} {'time':>12} {'change':>8} {'memory':>8}")
+    for key in sorted(old_entries.keys() & new_entries.keys(), key=lambda k: (k[0], k[1])):
+        (old_time, old_mem), (new_time, new_mem) = old_entries[key], new_entries[key]
+        print(f"{key[0]:>11,}  {key[1]:<48} {new_time if new_time is not None else 'n/a':>12} "
+              f"{change(old_time, new_time):>8} {change(old_mem, new_mem):>8}")
+
+# Parses command line options
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark every pipeline stage and dashboard loader on synthetic data.")
+    parser.add_argument("command", nargs="?", default="run", choices=["run", "compare", "loaders"],
+                        help="run: generate data and benchmark (default); compare: diff two result files; "
+                             "loaders: time the dashboard loaders in the current directory (used internally)")
+    parser.add_argument("files", nargs="*", help="With compare: baseline and current result files")
+    parser.add_argument("--rows", type=int, nargs="+", default=DEFAULT_ROWS,
+                        help="Chart row counts to benchmark (10k to 50M)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the synthetic data generator")
+    parser.add_argument("-o", "--output", help="Results file (default: benchmarks/results/benchmark_<time>.json)")
+    parser.add_argument("--workspace", help="Directory to create the per-scale workspaces in (default: system temp)")
+    parser.add_argument("--keep", action="store_true", help="Keep the workspaces (data, logs) after the run")
+    parser.add_argument("--repeat", type=int, default=3, help="Warm calls per loader")
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.command == "loaders":
+        time_loaders(args.repeat)
+    elif args.command == "compare":
+        if len(args.files) != 2:
+            sys.exit("compare needs a baseline and a current results file")
+        compare(*args.files)
+    else:
+        run(args.rows, args.seed, args.output, args.workspace, args.keep, args.repeat)
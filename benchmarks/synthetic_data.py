@@ -0,0 +1,241 @@
+# benchmarks/synthetic_data.py
+
+import argparse
+import contextlib
+import importlib.util
+import io
+import json
+import os
+import sqlite3
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Add the project root to the system path to allow importing from the utils folder
+sys.path.append(PROJECT_ROOT)
+from utils.data_utils import CHARTS_SCHEMA
+
+# Real country names and coordinates used for the chart regions and the country_utils table
+CENTROIDS_PATH = os.path.join(PROJECT_ROOT, "data", "country_centroids.csv")
+
+# Chart rows generated and written per chunk; the seed of each chunk depends only on its position,
+# so the same seed and row count always produce byte-identical files
+CHUNK_SIZE = 1_000_000
+
+# Chart dates span the same years as the real dataset
+START_DATE = "2017-01-01"
+END_DATE = "2023-12-31"
+
+GENRES = [
+    "pop", "rock", "hip-hop", "latin", "reggaeton", "k-pop", "j-pop", "edm", "house", "techno",
+    "jazz", "blues", "soul", "r-n-b", "country", "folk", "acoustic", "metal", "punk", "indie",
+    "samba", "sertanejo", "mpb", "salsa", "tango", "chanson", "german", "anime", "classical", "dance",
+]
+
+# Title vocabulary per language, so language detection sees realistic, partly repeated titles
+TITLE_WORDS = {
+    "en": ["love", "night", "heart", "dance", "forever", "baby", "fire", "dream", "summer", "lonely", "tonight", "home"],
+    "es": ["amor", "noche", "corazón", "bailar", "siempre", "contigo", "fuego", "sueño", "verano", "sola", "vida", "mía"],
+    "pt": ["saudade", "coração", "você", "beijo", "noite", "sempre", "amanhã", "cidade", "menina", "paixão", "sonho", "mar"],
+    "fr": ["amour", "toujours", "nuit", "cœur", "jamais", "soleil", "chanson", "rêve", "belle", "pourquoi", "demain", "ciel"],
+    "de": ["liebe", "immer", "nacht", "herz", "wieder", "sommer", "traum", "schön", "morgen", "nicht", "zusammen", "himmel"],
+    "ko": ["사랑", "너를", "우리", "오늘", "밤", "마음", "하늘", "봄날", "눈물", "기억", "안녕", "꿈"],
+    "ja": ["愛してる", "夜空", "さくら", "君の", "未来", "ありがとう", "夢", "涙", "桜", "心", "明日", "花火"],
+}
+
+# Chart region weights: the global chart and a handful of large markets dominate, as in the real data
+LARGE_MARKETS = ["Global", "United States", "Brazil", "Mexico", "Germany", "United Kingdom", "Japan"]
+
+# Summary of the generated files, written next to them
+MANIFEST_FILE = "synthetic_manifest.json"
+
+# Tables written by the generator, with the columns populate_db.create_tables defines for them
+TABLES = ["charts", "audio_features", "lang_detect", "country_utils"]
+
+# Returns {table: [(column, SQL type), ...]} by running populate_db.create_tables on an in-memory database,
+# so the synthetic files always follow the schema the loader actually creates
+def table_schemas():
+    spec = importlib.util.spec_from_file_location("populate_db", os.path.join(PROJECT_ROOT, "scripts", "populate_db.py"))
+    populate_db = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(populate_db)
+
+    conn = sqlite3.connect(":memory:")
+    with contextlib.redirect_stdout(io.StringIO()):
+        populate_db.create_tables(conn)
+    schemas = {table: [(row[1], row[2].upper()) for row in conn.execute(f"PRAGMA table_info({table})")]
+               for table in TABLES}
+    conn.close()
+    return schemas
+
+# Number of distinct tracks and artists for a given number of chart rows
+# (roughly the proportions of the real dataset, capped so language detection stays tractable)
+def catalogue_size(chart_rows):
+    tracks = int(np.clip(chart_rows // 100, 1_000, 200_000))
+    return tracks, max(tracks // 5, 100)
+
+# Fills a table's columns from the given values; columns without a generator get a default by SQL type
+def fill_columns(schema, values, rng, n):
+    columns = {}
+    for name, sql_type in schema:
+        if name in values:
+            columns[name] = values[name]
+        elif sql_type == "INTEGER":
+            columns[name] = rng.integers(0, 100, n)
+        elif sql_type == "REAL":
+            columns[name] = rng.random(n)
+        else:
+            columns[name] = np.char.add(f"{name}_", rng.integers(0, 1_000, n).astype(str))
+    return pd.DataFrame(columns)
+
+# Builds the track catalogue shared by every file: ids, titles, artists, genres, release dates and languages
+def build_catalogue(n_tracks, n_artists, rng):
+    languages = np.array(list(TITLE_WORDS))
+    language = rng.choice(languages, n_tracks, p=[0.45, 0.2, 0.12, 0.06, 0.05, 0.07, 0.05])
+    titles = np.empty(n_tracks, dtype=object)
+    for lang in languages:
+        mask = language == lang
+        words = np.array(TITLE_WORDS[lang], dtype=object)
+        picks = rng.choice(words, (mask.sum(), 2))
+        titles[mask] = picks[:, 0] + " " + picks[:, 1]
+
+    release_days = rng.integers(0, (pd.Timestamp(END_DATE) - pd.Timestamp("2000-01-01")).days, n_tracks)
+    artist = rng.integers(0, n_artists, n_tracks)
+    return pd.DataFrame({
+        "track_id": [f"syn{i:09d}" for i in range(n_tracks)],
+        "track_name": titles,
+        "artist_name": np.char.add("Artist ", artist.astype(str)),
+        "artist_id": np.char.add("art", artist.astype(str)),
+        "track_genre": rng.choice(GENRES, n_tracks),
+        "release_date": (pd.Timestamp("2000-01-01") + pd.to_timedelta(release_days, "D")).strftime("%Y-%m-%d"),
+        "language": language,
+    })
+
+# Audio features per catalogue track (about 5% of tracks appear a second time under another genre,
+# as in the Kaggle dataset); each genre has its own centre so the genre clusters are meaningful
+def build_audio_features(schema, catalogue, rng):
+    extra = rng.random(len(catalogue)) < 0.05
+    tracks = pd.concat([catalogue, catalogue[extra].assign(track_genre=rng.choice(GENRES, extra.sum()))],
+                       ignore_index=True)
+    n = len(tracks)
+    genre_index = pd.Categorical(tracks["track_genre"], categories=GENRES).codes
+    centres = rng.random((len(GENRES), 7))
+
+    def mood(i):
+        return np.clip(centres[genre_index, i] + rng.normal(0, 0.12, n), 0, 1)
+
+    values = {
+        "track_id": tracks["track_id"], "track_name": tracks["track_name"], "artist_name": tracks["artist_name"],
+        "popularity": rng.integers(0, 101, n), "explicit": rng.random(n) < 0.15,
+        "danceability": mood(0), "energy": mood(1), "key": rng.integers(0, 12, n),
+        "loudness": -60 * rng.beta(1.5, 8, n), "mode": rng.integers(0, 2, n), "speechiness": mood(2) * 0.5,
+        "acousticness": mood(3), "instrumentalness": mood(4) ** 3, "liveness": mood(5) * 0.6, "valence": mood(6),
+        "tempo": np.clip(60 + centres[genre_index, 0] * 120 + rng.normal(0, 15, n), 40, 220),
+        "duration_ms": rng.integers(90_000, 400_000, n), "time_signature": rng.choice([3, 4, 5], n, p=[0.08, 0.9, 0.02]),
+        "track_genre": tracks["track_genre"],
+    }
+    return fill_columns(schema, values, rng, n)
+
+# Writes chart rows chunk by chunk in date order; popular tracks and large markets chart far more often
+# The extra columns of the cleaned charts file (year, track_genre) are appended after the table columns
+def write_charts(path, schema, catalogue, regions, chart_rows, seed, chunk_size=CHUNK_SIZE):
+    total_days = (pd.Timestamp(END_DATE) - pd.Timestamp(START_DATE)).days + 1
+    weights = np.array([8.0 if r in LARGE_MARKETS else 1.0 for r in regions])
+    weights /= weights.sum()
+    extra_columns = [c for c in CHARTS_SCHEMA if c not in {name for name, _ in schema}]
+    n_tracks = len(catalogue)
+
+    chunks = range(0, chart_rows, chunk_size)
+    for number, start in enumerate(chunks):
+        rng = np.random.default_rng([seed, number])
+        n = min(chunk_size, chart_rows - start)
+        first_day = total_days * start // chart_rows
+        last_day = max(total_days * (start + n) // chart_rows, first_day + 1)
+        days = np.sort(rng.integers(first_day, last_day, n))
+        track = np.minimum((rng.random(n) ** 3 * n_tracks).astype(np.int64), n_tracks - 1)
+        chart = rng.choice(["top200", "viral50"], n, p=[0.8, 0.2])
+        top200 = chart == "top200"
+        dates = pd.Timestamp(START_DATE) + pd.to_timedelta(days, "D")
+
+        values = {
+            "track_id": catalogue["track_id"].to_numpy()[track],
+            "track_name": catalogue["track_name"].to_numpy()[track],
+            "artist_name": catalogue["artist_name"].to_numpy()[track],
+            "date": dates.strftime("%Y-%m-%d"),
+            "region": rng.choice(regions, n, p=weights),
+            "chart": chart,
+            "trend": rng.choice(["MOVE_UP", "MOVE_DOWN", "SAME_POSITION", "NEW_ENTRY"], n),
+            # Viral charts carry no stream counts
+            "streams": pd.Series(rng.integers(1_000, 2_000_000, n), dtype="Int64").mask(~top200),
+            "position": np.where(top200, rng.integers(1, 201, n), rng.integers(1, 51, n)),
+        }
+        df = fill_columns(schema, values, rng, n)
+        if "year" in extra_columns:
+            df["year"] = dates.year
+        if "track_genre" in extra_columns:
+            df["track_genre"] = catalogue["track_genre"].to_numpy()[track]
+        df.to_csv(path, mode="w" if number == 0 else "a", header=number == 0, index=False)
+
+# Generates a complete synthetic input set in <workspace>/data:
+#   charts_2017_2023_clean.csv, audio_features_kaggle.csv (raw input of clean_audio_features),
+#   lang_detect.csv, country_utils.csv and tracks_2020.csv (release dates and titles for lang_detect)
+# Returns a summary with the row count and size of every file written, also saved as MANIFEST_FILE.
+def generate(workspace, chart_rows, seed=0, chunk_size=CHUNK_SIZE):
+    start = time.perf_counter()
+    data_dir = os.path.join(workspace, "data")
+    os.makedirs(data_dir, exist_ok=True)
+    schemas = table_schemas()
+    rng = np.random.default_rng(seed)
+
+    n_tracks, n_artists = catalogue_size(chart_rows)
+    catalogue = build_catalogue(n_tracks, n_artists, rng)
+    centroids = pd.read_csv(CENTROIDS_PATH, keep_default_na=False)
+    regions = ["Global"] + centroids["country_name"].tolist()
+
+    files = {}
+    audio = build_audio_features(schemas["audio_features"], catalogue, rng)
+    files["audio_features_kaggle.csv"] = audio.rename(columns={"artist_name": "artists"})
+
+    files["lang_detect.csv"] = fill_columns(schemas["lang_detect"], {
+        "track_id": catalogue["track_id"], "name": catalogue["track_name"],
+        "artist_name": catalogue["artist_name"], "language": catalogue["language"],
+    }, rng, n_tracks)
+
+    files["country_utils.csv"] = fill_columns(schemas["country_utils"], {
+        "country_name": centroids["country_name"], "latitude": centroids["latitude"],
+        "longitude": centroids["longitude"],
+    }, rng, len(centroids))
+
+    files["tracks_2020.csv"] = catalogue.rename(columns={"track_name": "name"})[
+        ["track_id", "name", "artist_name", "artist_id", "release_date", "track_genre"]
+    ].rename(columns={"track_genre": "genre"})
+
+    summary = {}
+    for name, df in files.items():
+        path = os.path.join(data_dir, name)
+        df.to_csv(path, index=False)
+        summary[name] = {"rows": len(df), "bytes": os.path.getsize(path)}
+
+    charts_path = os.path.join(data_dir, "charts_2017_2023_clean.csv")
+    write_charts(charts_path, schemas["charts"], catalogue, regions, chart_rows, seed, chunk_size)
+    summary["charts_2017_2023_clean.csv"] = {"rows": chart_rows, "bytes": os.path.getsize(charts_path)}
+    with open(os.path.join(data_dir, MANIFEST_FILE), "w", encoding="utf-8") as f:
+        json.dump({"chart_rows": chart_rows, "seed": seed, "files": summary}, f, indent=2)
+
+    print(f"Generated {chart_rows:,} chart rows, {len(audio):,} audio feature rows and {n_tracks:,} tracks "
+          f"in {time.perf_counter() - start:.1f}s → {data_dir}")
+    return summary
+
+# Parses command line options for standalone generation
+def parse_args():
+    parser = argparse.ArgumentParser(description="Generate deterministic synthetic input data at a given scale.")
+    parser.add_argument("workspace", help="Directory to write data/ into")
+    parser.add_argument("--rows", type=int, default=100_000, help="Number of chart rows (10k to 50M)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed; the same seed gives identical files")
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_args()
+    generate(args.workspace, args.rows, args.seed)
@@ -4,6 +4,7 @@ import sys, os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 import pandas as pd
+from utils.metrics_utils import start_stage, span
 
 # Define file paths for input and output
 AUDIO_SRC = os.path.join("data", "audio_features_kaggle.csv")
@@ -17,7 +18,9 @@ def clean_audio_features():
         return
 
     # Load the raw dataset
-    df = pd.read_csv(AUDIO_SRC)
+    with span("read") as s:
+        df = pd.read_csv(AUDIO_SRC)
+        s.record_read(AUDIO_SRC, rows=len(df))
 
     # Rename column for consistency across tables
     df = df.rename(columns={"artists": "artist_name"})
@@ -34,9 +37,12 @@ def clean_audio_features():
     df = df.dropna(subset=["track_id", "track_name", "artist_name"])
 
     # Save cleaned data to a new CSV file
-    df.to_csv(AUDIO_DST, index=False)
+    with span("write") as s:
+        df.to_csv(AUDIO_DST, index=False)
+        s.record_write(AUDIO_DST, rows=len(df))
     print(f"Cleaned audio features saved to {AUDIO_DST} ({len(df):,} rows)")
 
 # Run cleaning when script is executed directly
 if __name__ == "__main__":
+    start_stage("clean_audio_features")
     clean_audio_features()
\ No newline at end of file
@@ -0,0 +1,68 @@
+# scripts/convert_to_parquet.py
+
+import sys, os
+
+# Add the project root to the system path to allow importing from the utils folder
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from utils.data_utils import (
+    CHARTS_CSV_PATH, CHARTS_PARQUET_PATH, CHARTS_SCHEMA,
+    AUDIO_CSV_PATH, AUDIO_PARQUET_PATH, AUDIO_FEATURES_SCHEMA,
+    arrow_schema
+)
+from utils.metrics_utils import start_stage, span
+
+# Each CSV is read in chunks of this many rows, and each chunk becomes one Parquet row group
+CHUNK_SIZE = 500_000
+
+# Datasets that can be converted, keyed by the name used on the command line
+DATASETS = {
+    "charts": (CHARTS_CSV_PATH, CHARTS_PARQUET_PATH, CHARTS_SCHEMA),
+    "audio_features": (AUDIO_CSV_PATH, AUDIO_PARQUET_PATH, AUDIO_FEATURES_SCHEMA),
+}
+
+# Streams a CSV into a typed, zstd-compressed Parquet file without loading it all into memory
+# Column statistics are written per row group so readers can skip groups that fail a filter (e.g. year)
+# Returns the number of rows converted
+def convert_csv_to_parquet(csv_path, parquet_path, schema_types, chunk_size=CHUNK_SIZE):
+    if not os.path.exists(csv_path):
+        print(f"Missing input file: {csv_path}")
+        return 0
+
+    columns = pd.read_csv(csv_path, nrows=0).columns.tolist()
+    schema = arrow_schema(columns, schema_types)
+    string_columns = [c for c in columns if pa.types.is_string(schema.field(c).type)]
+    date_columns = [c for c in columns if pa.types.is_date(schema.field(c).type)]
+
+    # Write to a temporary file first so a failed conversion never leaves a truncated Parquet behind
+    tmp_path = parquet_path + ".tmp"
+    total_rows = 0
+    with pq.ParquetWriter(tmp_path, schema, compression="zstd") as writer:
+        for chunk in pd.read_csv(csv_path, chunksize=chunk_size, dtype={c: str for c in string_columns}):
+            for col in date_columns:
+                chunk[col] = pd.to_datetime(chunk[col], errors="coerce")
+            table = pa.Table.from_pandas(chunk, schema=schema, preserve_index=False)
+            writer.write_table(table)
+            total_rows += len(chunk)
+
+    os.replace(tmp_path, parquet_path)
+    csv_mb = os.path.getsize(csv_path) / 1e6
+    parquet_mb = os.path.getsize(parquet_path) / 1e6
+    print(f"Converted {csv_path} → {parquet_path} ({total_rows:,} rows, {csv_mb:.1f} MB → {parquet_mb:.1f} MB)")
+    return total_rows
+
+# Run conversion for the datasets named on the command line (default: all)
+if __name__ == "__main__":
+    names = sys.argv[1:] or list(DATASETS)
+    # Named like the pipeline stages (e.g. convert_charts_to_parquet)
+    start_stage(f"convert_{'_'.join(names)}_to_parquet")
+    for name in names:
+        if name not in DATASETS:
+            sys.exit(f"Unknown dataset: {name} (choose from {', '.join(DATASETS)})")
+        csv_path, parquet_path, schema_types = DATASETS[name]
+        with span(name) as s:
+            rows = convert_csv_to_parquet(csv_path, parquet_path, schema_types)
+            s.record_read(csv_path, rows=rows).record_write(parquet_path, rows=rows)
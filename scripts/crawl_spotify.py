@@ -0,0 +1,185 @@
+# scripts/crawl_spotify.py
+
+import sys, os
+
+# Add parent directory to the Python path for shared utility imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import glob
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+from fetch_spotify import fetch_search_page, extract_track_data
+from utils.http_utils import make_session, Throttle
+from utils.metrics_utils import start_stage, span
+
+# Partitioned output: data/tracks/year=YYYY/market=XX.csv (read back by utils.data_utils.load_tracks)
+OUTPUT_DIR = os.path.join("data", "tracks")
+# Crawl progress, kept outside the output folder so it doesn't count as data
+CHECKPOINT_PATH = os.path.join("data", "tracks_crawl_checkpoint.json")
+
+# Spotify search returns at most 50 items per page and refuses offsets beyond 1000
+PAGE_SIZE = 50
+MAX_OFFSET = 1000
+
+# Markets crawled by default (all regions with their own Spotify chart)
+DEFAULT_MARKETS = [
+    "US", "GB", "CA", "AU", "DE", "FR", "ES", "IT", "NL", "SE", "BR", "MX", "AR", "CO", "CL",
+    "JP", "KR", "IN", "ID", "PH", "TR", "PL", "ZA", "NG", "EG"
+]
+
+# Global request budget shared by all market workers
+# Once it is used up, workers stop after their current page and the checkpoint allows a later resume
+class RequestBudget:
+    def __init__(self, limit=None):
+        self.limit = limit
+        self.used = 0
+        self.lock = threading.Lock()
+
+    # Reserves one request; returns False when the budget is exhausted
+    def take(self):
+        with self.lock:
+            if self.limit is not None and self.used >= self.limit:
+                return False
+            self.used += 1
+            return True
+
+# Crawls search results for many years and markets, resuming from the last checkpoint
+# Markets are crawled concurrently; each market pages through its years in order.
+# Track IDs are deduplicated across all markets and years as pages arrive.
+class SpotifyCrawler:
+    def __init__(self, years, markets, output_dir=OUTPUT_DIR, checkpoint_path=CHECKPOINT_PATH,
+                 workers=4, rate=None, max_requests=None):
+        self.years = years
+        self.markets = markets
+        self.output_dir = output_dir
+        self.checkpoint_path = checkpoint_path
+        self.workers = workers
+        self.throttle = Throttle(rate)
+        self.budget = RequestBudget(max_requests)
+        self.session = make_session(pool_size=workers)
+        self.lock = threading.Lock()
+        self.checkpoint = self.load_checkpoint()
+        self.seen_ids = self.load_seen_ids()
+        self.new_tracks = 0
+
+    # Reads crawl progress: {"YEAR:MARKET": {"next_offset": n, "done": bool}}
+    def load_checkpoint(self):
+        if not os.path.exists(self.checkpoint_path):
+            return {}
+        with open(self.checkpoint_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    # Writes crawl progress atomically; called with self.lock held
+    def save_checkpoint(self):
+        tmp_path = self.checkpoint_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.checkpoint, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.checkpoint_path)
+
+    # Track IDs already written by earlier runs, so a resumed crawl keeps deduplicating
+    def load_seen_ids(self):
+        seen = set()
+        for path in glob.glob(os.path.join(self.output_dir, "year=*", "market=*.csv")):
+            seen.update(pd.read_csv(path, usecols=["track_id"], dtype=str)["track_id"].dropna())
+        return seen
+
+    # Appends the not-yet-seen tracks of one page to its partition file
+    # and advances the checkpoint (output first, so an interruption never skips data)
+    def record_page(self, year, market, items, next_offset, done):
+        df = extract_track_data([t for t in items if t])
+        with self.lock:
+            if not df.empty:
+                df = df[~df["track_id"].isin(self.seen_ids)].drop_duplicates(subset="track_id")
+            if not df.empty:
+                df["market"] = market
+                path = os.path.join(self.output_dir, f"year={year}", f"market={market}.csv")
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                df.to_csv(path, mode="a", header=not os.path.exists(path), index=False)
+                self.seen_ids.update(df["track_id"])
+                self.new_tracks += len(df)
+
+            self.checkpoint[f"{year}:{market}"] = {"next_offset": next_offset, "done": done}
+            self.save_checkpoint()
+
+    # Pages through every year for one market until results run out, the offset cap is hit,
+    # or the global budget is exhausted
+    def crawl_market(self, market):
+        for year in self.years:
+            state = self.checkpoint.get(f"{year}:{market}", {"next_offset": 0, "done": False})
+            offset = state["next_offset"]
+            if state["done"]:
+                continue
+
+            while offset < MAX_OFFSET:
+                if not self.budget.take():
+                    return
+                limit = min(PAGE_SIZE, MAX_OFFSET - offset)
+                page = fetch_search_page(year, market, limit=limit, offset=offset,
+                                         session=self.session, throttle=self.throttle)
+                if page is None:
+                    # Leave this year unfinished; a later run resumes at the same offset
+                    print(f"{market} {year}: request failed at offset {offset}, will resume later")
+                    break
+
+                items, total = page
+                offset += limit
+                done = not items or offset >= min(total, MAX_OFFSET)
+                self.record_page(year, market, items, offset, done)
+                if done:
+                    print(f"{market} {year}: finished ({min(total, MAX_OFFSET)} results scanned)")
+                    break
+
+    # Runs all markets concurrently and reports how many new tracks were found
+    def run(self):
+        print(f"🎧 Crawling {len(self.years)} years × {len(self.markets)} markets "
+              f"({len(self.seen_ids):,} tracks already collected)...")
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            list(pool.map(self.crawl_market, self.markets))
+
+        remaining = [key for key in (f"{y}:{m}" for y in self.years for m in self.markets)
+                     if not self.checkpoint.get(key, {}).get("done")]
+        print(f"Crawl stopped after {self.budget.used:,} requests: {self.new_tracks:,} new tracks, "
+              f"{len(self.seen_ids):,} total, {len(remaining)} year/market pairs left to crawl")
+        return remaining
+
+# Parses "2017-2023" or "2018,2020" into a list of years
+def parse_years(value):
+    years = []
+    for part in value.split(","):
+        if "-" in part:
+            start, end = part.split("-")
+            years.extend(range(int(start), int(end) + 1))
+        else:
+            years.append(int(part))
+    return years
+
+# Parses command line options for the crawler
+def parse_args():
+    parser = argparse.ArgumentParser(description="Crawl Spotify search results for many years and markets.")
+    parser.add_argument("--years", type=parse_years, default=parse_years("2017-2023"),
+                        help="Years to crawl, e.g. 2017-2023 or 2019,2021")
+    parser.add_argument("--markets", default=",".join(DEFAULT_MARKETS),
+                        help="Comma-separated market codes")
+    parser.add_argument("--workers", type=int, default=4, help="Markets crawled concurrently")
+    parser.add_argument("--rate", type=float, default=5.0, help="Maximum requests per second across all workers")
+    parser.add_argument("--max-requests", type=int, default=None,
+                        help="Stop after this many requests (resume later from the checkpoint)")
+    return parser.parse_args()
+
+# Entry point: crawl, checkpointing after every page
+if __name__ == "__main__":
+    args = parse_args()
+    start_stage("crawl_spotify")
+    crawler = SpotifyCrawler(
+        years=args.years,
+        markets=[m.strip().upper() for m in args.markets.split(",") if m.strip()],
+        workers=args.workers,
+        rate=args.rate,
+        max_requests=args.max_requests
+    )
+    with span("crawl") as s:
+        crawler.run()
+        s.record_write(OUTPUT_DIR, rows=crawler.new_tracks)
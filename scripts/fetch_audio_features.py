@@ -3,53 +3,161 @@ import sys, os
 # Allow importing from the parent directory (useful for utils and shared code)
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+import argparse
+import json
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 import pandas as pd
-import requests
-from utils.spotify_auth import get_token
+from utils.spotify_auth import get_token, invalidate_token
+from utils.http_utils import make_session, get_with_retry, Throttle
+from utils.metrics_utils import start_stage, span
 
 # Spotify API endpoint for retrieving audio features by track ID
 BASE_URL = "https://api.spotify.com/v1/audio-features"
 
-# Fetches audio features in batches of up to 100 track IDs
-# Returns a list of feature dictionaries for all valid tracks
-def fetch_audio_features(track_ids):
-    token = get_token()
-    headers = {"Authorization": f"Bearer {token}"}
-    all_audio_features = []
-
-    print(f"🔍 Fetching audio features for {len(track_ids)} tracks...")
-
-    # Spotify allows up to 100 track IDs per request, so we batch the input list
-    for i in range(0, len(track_ids), 100):
-        batch = track_ids[i:i+100]
-        ids_param = ','.join(batch)
-        res = requests.get(BASE_URL, headers=headers, params={"ids": ids_param})
-
-        # If the request succeeds, collect all valid feature entries
-        if res.status_code == 200:
-            features = res.json().get("audio_features", [])
-            valid_features = [f for f in features if f is not None]
-            all_audio_features.extend(valid_features)
-            print(f"Batch {i//100 + 1}: Fetched {len(valid_features)} tracks")
-        else:
-            # Print the error message if the batch fails
-            print(f"Error in batch {i//100 + 1}:", res.json())
-
-    return all_audio_features
+# Spotify allows up to 100 track IDs per request
+BATCH_SIZE = 100
+
+# Results are appended to a JSON-lines file as each batch arrives, and the IDs of finished
+# batches to a checkpoint file, so an interrupted run resumes where it stopped
+RESULTS_PATH = os.path.join("data", "audio_features.jsonl")
+CHECKPOINT_PATH = os.path.join("data", "audio_features.checkpoint")
+OUTPUT_PATH = os.path.join("data", "audio_features.csv")
+
+# Raised when a batch still fails after all retries
+class BatchFailed(Exception):
+    pass
+
+# Reads the set of track IDs that earlier runs already fetched
+def load_checkpoint(path):
+    if not os.path.exists(path):
+        return set()
+    with open(path, "r", encoding="utf-8") as f:
+        return {line.strip() for line in f if line.strip()}
+
+# Fetches one batch of up to 100 IDs, retrying rate limits and transient errors
+# Uses the shared cached token (or a fixed token, e.g. for a stub server) and replaces it once on 401
+# Returns the list of valid feature dictionaries (Spotify returns null for unknown IDs)
+def fetch_batch(session, base_url, batch, throttle, token=None):
+    for _ in range(2):
+        used_token = token or get_token()
+        res = get_with_retry(session, base_url, params={"ids": ",".join(batch)},
+                             headers={"Authorization": f"Bearer {used_token}"}, throttle=throttle)
+        if res.status_code == 401:
+            if token:
+                break
+            invalidate_token(used_token)
+            continue
+        if res.status_code != 200:
+            raise BatchFailed(f"HTTP {res.status_code}: {res.text[:200]}")
+        features = res.json().get("audio_features", [])
+        return [f for f in features if f is not None]
+    raise BatchFailed("HTTP 401: access token rejected")
+
+# Fetches audio features for all track IDs with a bounded number of batches in flight
+# Batches run concurrently over pooled connections; 429 Retry-After pauses every worker.
+# Each finished batch is written to disk immediately and checkpointed, so re-running the
+# function skips IDs that were already fetched and retries only the batches that failed.
+# Returns a summary dictionary with the number of tracks fetched and batches that failed.
+def fetch_audio_features(track_ids, results_path=RESULTS_PATH, checkpoint_path=CHECKPOINT_PATH,
+                         workers=8, max_in_flight=16, base_url=BASE_URL, token=None):
+    done_ids = load_checkpoint(checkpoint_path)
+    pending_ids = [tid for tid in dict.fromkeys(track_ids) if tid not in done_ids]
+    batches = [pending_ids[i:i + BATCH_SIZE] for i in range(0, len(pending_ids), BATCH_SIZE)]
+
+    print(f"🔍 Fetching audio features for {len(pending_ids)} tracks "
+          f"({len(done_ids)} already done) in {len(batches)} batches...")
+
+    session = make_session(pool_size=workers)
+    throttle = Throttle()
+    fetched, failed = 0, []
+
+    os.makedirs(os.path.dirname(results_path) or ".", exist_ok=True)
+    with open(results_path, "a", encoding="utf-8") as results_file, \
+            open(checkpoint_path, "a", encoding="utf-8") as checkpoint_file, \
+            ThreadPoolExecutor(max_workers=workers) as pool:
+
+        in_flight = {}
+        batch_iter = iter(enumerate(batches, start=1))
+
+        # Keeps at most max_in_flight batches queued or running
+        def submit_next():
+            item = next(batch_iter, None)
+            if item:
+                number, batch = item
+                in_flight[pool.submit(fetch_batch, session, base_url, batch, throttle, token)] = (number, batch)
+
+        for _ in range(max_in_flight):
+            submit_next()
+
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                number, batch = in_flight.pop(future)
+                try:
+                    features = future.result()
+                except Exception as e:
+                    # Failed batches are not checkpointed, so the next run retries them
+                    failed.append(number)
+                    print(f"Error in batch {number}: {e}")
+                else:
+                    # Write results before the checkpoint: a crash in between re-fetches, never loses
+                    results_file.writelines(json.dumps(f) + "\n" for f in features)
+                    results_file.flush()
+                    checkpoint_file.writelines(tid + "\n" for tid in batch)
+                    checkpoint_file.flush()
+                    fetched += len(features)
+                    print(f"Batch {number}: Fetched {len(features)} tracks")
+                submit_next()
+
+    if failed:
+        print(f"{len(failed)} batches failed; run again to retry them.")
+    return {"fetched": fetched, "failed_batches": failed}
+
+# Builds a CSV from every result fetched so far (across resumed runs), one row per track
+def write_results_csv(results_path=RESULTS_PATH, output_path=OUTPUT_PATH):
+    if not os.path.exists(results_path):
+        return 0
+    df_audio = pd.read_json(results_path, lines=True)
+    if "id" in df_audio.columns:
+        df_audio = df_audio.drop_duplicates(subset="id", keep="last")
+    df_audio.to_csv(output_path, index=False)
+    return len(df_audio)
+
+# Parses command line options for the fetcher
+def parse_args():
+    parser = argparse.ArgumentParser(description="Fetch Spotify audio features for the tracks in data/tracks_2020.csv.")
+    parser.add_argument("--tracks", default="data/tracks_2020.csv", help="CSV with a track_id column")
+    parser.add_argument("--workers", type=int, default=8, help="Concurrent request threads")
+    parser.add_argument("--max-in-flight", type=int, default=16, help="Maximum batches queued or running at once")
+    parser.add_argument("--base-url", default=BASE_URL, help="Audio features endpoint (e.g. a local stub server)")
+    parser.add_argument("--token", help="Fixed access token to send instead of the cached client-credentials token")
+    return parser.parse_args()
 
 # If the script is run directly, fetch and save audio features to CSV
 if __name__ == "__main__":
+    args = parse_args()
+    start_stage("fetch_audio_features")
+
     # Ensure the output directory exists
     os.makedirs("data", exist_ok=True)
 
     # Load track IDs from the dataset (must contain a 'track_id' column)
-    df_tracks = pd.read_csv("data/tracks_2020.csv")
-    track_ids = df_tracks["track_id"].dropna().unique().tolist()
+    with span("read") as s:
+        df_tracks = pd.read_csv(args.tracks)
+        track_ids = df_tracks["track_id"].dropna().unique().tolist()
+        s.record_read(args.tracks, rows=len(df_tracks))
 
     # Retrieve audio features using Spotify API
-    audio_data = fetch_audio_features(track_ids)
-    df_audio = pd.DataFrame(audio_data)
+    with span("fetch") as s:
+        summary = fetch_audio_features(track_ids, workers=args.workers,
+                                       max_in_flight=args.max_in_flight, base_url=args.base_url,
+                                       token=args.token)
+        s.record_read(rows=len(track_ids)).record_write(rows=summary["fetched"])
 
     # Save the result to a CSV file for reuse
-    df_audio.to_csv("data/audio_features.csv", index=False)
-    print(f"Done. Saved {len(df_audio)} audio features to data/audio_features.csv")
\ No newline at end of file
+    with span("write") as s:
+        total = write_results_csv()
+        s.record_write(OUTPUT_PATH, rows=total)
+    print(f"Done. Saved {total} audio features to {OUTPUT_PATH}")
+    if summary["failed_batches"]:
+        sys.exit(1)
@@ -5,6 +5,7 @@ import sys, os
 
 # Add the parent directory to sys.path to enable imports from the root or utils directory
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from utils.metrics_utils import start_stage, span
 
 # Loads the chart dataset downloaded from Kaggle
 # Cleans and standardizes column names to match the rest of the project
@@ -28,5 +29,8 @@ def load_kaggle_chart_data(path="data/charts_kaggle.csv"):
 
 # If this script is executed directly, load the chart data and print a success message
 if __name__ == "__main__":
-    df = load_kaggle_chart_data()
+    start_stage("fetch_charts")
+    with span("read") as s:
+        df = load_kaggle_chart_data()
+        s.record_read("data/charts_kaggle.csv", rows=len(df))
     print("✅ Loaded Kaggle charts with", len(df), "records")
\ No newline at end of file
@@ -5,33 +5,47 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 import requests
 import pandas as pd
-from utils.spotify_auth import get_token
+from utils.spotify_auth import get_token, invalidate_token
+from utils.http_utils import get_with_retry
+from utils.metrics_utils import start_stage, span
 
 # Base URL for the Spotify Web API
 BASE_URL = "https://api.spotify.com/v1"
 
-# Sends a request to Spotify’s search API to retrieve tracks for a given year and country
-# Uses Spotify’s query syntax: year:<year>
-# Returns a list of track objects from the search result
-def fetch_tracks_by_year(year, country="US", limit=50):
-    token = get_token()
-    headers = {"Authorization": f"Bearer {token}"}
-    query = f"year:{year}"
-
+# Sends a request to Spotify’s search API to retrieve one page of tracks for a given year and country
+# Uses Spotify’s query syntax: year:<year>, and pages through results with offset
+# Rate limits and transient errors are retried; an expired token is replaced once
+# Returns the track objects on the page and the total number of results, or None on failure
+def fetch_search_page(year, country="US", limit=50, offset=0, session=None, throttle=None):
     params = {
-        "q": query,
+        "q": f"year:{year}",
         "type": "track",
         "limit": limit,
+        "offset": offset,
         "market": country
     }
 
-    res = requests.get(f"{BASE_URL}/search", headers=headers, params=params)
+    for _ in range(2):
+        token = get_token()
+        res = get_with_retry(session or requests, f"{BASE_URL}/search", params=params,
+                             headers={"Authorization": f"Bearer {token}"}, throttle=throttle)
+        if res.status_code == 401:
+            invalidate_token(token)
+            continue
+        break
 
     if res.status_code == 200:
-        return res.json().get("tracks", {}).get("items", [])
+        tracks = res.json().get("tracks", {})
+        return tracks.get("items", []), tracks.get("total", 0)
     else:
-        print("Spotify error:", res.json())
-        return []
+        print("Spotify error:", res.text[:200])
+        return None
+
+# Sends a request to Spotify’s search API to retrieve tracks for a given year and country
+# Returns a list of track objects from the search result
+def fetch_tracks_by_year(year, country="US", limit=50, offset=0):
+    page = fetch_search_page(year, country, limit, offset)
+    return page[0] if page else []
 
 # Extracts relevant metadata from the raw Spotify API response
 # Returns a DataFrame with selected track and artist fields
@@ -53,9 +67,12 @@ def extract_track_data(tracks):
 if __name__ == "__main__":
     year = 2020
     os.makedirs("data", exist_ok=True)
+    start_stage("fetch_spotify")
 
     print(f"🎧 Fetching Spotify tracks for {year}...")
-    tracks = fetch_tracks_by_year(year)
+    with span("fetch") as s:
+        tracks = fetch_tracks_by_year(year)
+        s.record_write(rows=len(tracks or []))
 
     if not tracks:
         print("No tracks fetched. Check your credentials or API quota.")
@@ -1,29 +1,63 @@
 # scripts/generate_artist_counts_by_country.py
 
+import argparse
 import pandas as pd
-import os
+import sys, os
+
+# Add the project root to the system path to allow importing from the utils folder
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from utils.data_utils import load_charts, CHARTS_PARQUET_PATH
+from utils.metrics_utils import start_stage, span
+from utils.parallel_utils import map_regions
 
 # Define paths to input and output files
-CHARTS_PATH = os.path.join("data", "charts_2017_2023_clean.csv")      # Cleaned charts dataset with region and artist info
 COUNTRY_PATH = os.path.join("data", "country_utils.csv")              # Contains country name, latitude, longitude
 OUTPUT_PATH = os.path.join("data", "artist_counts_by_country.csv")    # Output file for merged result
 
-# Load datasets
-charts = pd.read_csv(CHARTS_PATH)
-countries = pd.read_csv(COUNTRY_PATH)
+# Number of distinct artists among one region's chart entries
+def region_artist_count(region, rows):
+    return {"artist_count": rows["artist_name"].nunique()}
+
+# Parses the number of worker processes for the per-region counts
+def parse_args():
+    parser = argparse.ArgumentParser(description="Count the distinct charting artists of every country.")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Number of processes for the per-region counts (default: one per CPU core)")
+    return parser.parse_args()
+
+# The work runs under a main guard because the per-region counts use a process pool,
+# whose workers re-import this module on platforms that spawn processes
+if __name__ == "__main__":
+    args = parse_args()
+    start_stage("generate_artist_counts_by_country")
+
+    # Load datasets (only the two chart columns this summary needs)
+    with span("read") as s:
+        charts = load_charts(columns=["region", "artist_name"])
+        countries = pd.read_csv(COUNTRY_PATH)
+        s.record_read(CHARTS_PARQUET_PATH, rows=len(charts)).record_read(COUNTRY_PATH, rows=len(countries))
 
-# Count the number of unique artists per region in the chart dataset
-# This gives us a measure of how many distinct artists appeared in each country
-artist_counts = charts.groupby("region")["artist_name"].nunique().reset_index()
-artist_counts = artist_counts.rename(columns={"region": "country", "artist_name": "artist_count"})
+    # Count the number of unique artists per region in the chart dataset
+    # This gives us a measure of how many distinct artists appeared in each country
+    with span("groupby") as s:
+        s.record_read(rows=len(charts))
+        # Regions are counted in parallel worker processes, which read their rows from shared memory
+        artist_counts = map_regions(region_artist_count, charts, workers=args.workers)
+        artist_counts = artist_counts.rename(columns={"region": "country"})
+        s.record_write(rows=len(artist_counts))
 
-# Merge artist counts with geographic coordinates using the country name
-# This allows us to later map artist origins on a world map
-merged = artist_counts.merge(countries, left_on="country", right_on="country_name", how="left")
+    # Merge artist counts with geographic coordinates using the country name
+    # This allows us to later map artist origins on a world map
+    with span("merge") as s:
+        s.record_read(rows=len(artist_counts))
+        merged = artist_counts.merge(countries, left_on="country", right_on="country_name", how="left")
 
-# Drop any rows where the country couldn't be geolocated (missing lat/lon)
-merged = merged.dropna(subset=["latitude", "longitude"])
+        # Drop any rows where the country couldn't be geolocated (missing lat/lon)
+        merged = merged.dropna(subset=["latitude", "longitude"])
+        s.record_write(rows=len(merged))
 
-# Save the result to a CSV that will be used for visualizations
-merged.to_csv(OUTPUT_PATH, index=False)
-print(f"Saved artist origin summary to {OUTPUT_PATH}")
\ No newline at end of file
+    # Save the result to a CSV that will be used for visualizations
+    with span("write") as s:
+        merged.to_csv(OUTPUT_PATH, index=False)
+        s.record_write(OUTPUT_PATH, rows=len(merged))
+    print(f"Saved artist origin summary to {OUTPUT_PATH}")
@@ -1,39 +1,71 @@
-import pandas as pd
-from sklearn.linear_model import LinearRegression
+import argparse
+import sys, os
 
-# Load cleaned chart data that includes track genre, region, and year
-df = pd.read_csv("data/charts_2017_2023_clean.csv")
+# Add the project root to the system path to allow importing from the utils folder
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from utils.data_utils import load_charts, year_between, CHARTS_PARQUET_PATH
+from utils.metrics_utils import start_stage, span
+from utils.parallel_utils import map_regions
+from utils.trend_utils import compute_trend_slopes
 
-# Focus the analysis on recent years only
-df = df[df["year"].between(2018, 2023)]
+OUTPUT_PATH = os.path.join("data", "genre_trends_by_region.csv")
 
-trend_rows = []
+# Fits the yearly trend line of every genre within one region's chart entries
+def region_genre_trends(region, rows, start_year, end_year, min_count):
+    return compute_trend_slopes(
+        rows,
+        group_cols=["track_genre"],
+        start_year=start_year,
+        end_year=end_year,
+        min_count=min_count
+    )
 
-# For each unique combination of region and genre,
-# we fit a linear model to see if the genre is trending up or down over time
-for (region, genre), group in df.groupby(["region", "track_genre"]):
-    # Count the number of charting tracks per year and ensure all years are present
-    year_counts = group.groupby("year").size().reindex(range(2018, 2024), fill_value=0).reset_index()
+# Parses the year range and minimum-count threshold for the trend analysis
+def parse_args():
+    parser = argparse.ArgumentParser(description="Fit a yearly trend line for every (region, genre) pair.")
+    parser.add_argument("--start-year", type=int, default=2018, help="First year of the trend window")
+    parser.add_argument("--end-year", type=int, default=2023, help="Last year of the trend window")
+    parser.add_argument("--min-count", type=int, default=10,
+                        help="Skip region/genre pairs with fewer chart entries than this over the window")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Number of processes fitting regions in parallel (default: one per CPU core)")
+    return parser.parse_args()
 
-    # Prepare input (X = years) and output (y = number of tracks)
-    X = year_counts["year"].values.reshape(-1, 1)
-    y = year_counts[0].values
+if __name__ == "__main__":
+    args = parse_args()
+    start_stage("generate_country_genre_trends")
 
-    # Skip genres that are too rare to be meaningful (fewer than 10 total entries)
-    if y.sum() < 10:
-        continue
+    # Load cleaned chart data that includes track genre, region, and year
+    # Only the selected years are read; the year filter is applied while reading
+    with span("read") as s:
+        df = load_charts(
+            columns=["region", "track_genre", "year"],
+            filters=year_between(args.start_year, args.end_year)
+        )
+        s.record_read(CHARTS_PARQUET_PATH, rows=len(df))
 
-    # Fit a simple linear regression model to detect the trend slope
-    model = LinearRegression().fit(X, y)
+    # For every region and genre, fit a linear model of yearly chart counts to see if the genre
+    # is trending up or down over time (genres that are too rare are skipped). Regions are fitted in
+    # parallel worker processes, which read their rows from shared memory; each fits all its genres at once.
+    with span("fit_trends") as s:
+        s.record_read(rows=len(df))
+        trends = map_regions(
+            region_genre_trends,
+            df,
+            workers=args.workers,
+            start_year=args.start_year,
+            end_year=args.end_year,
+            min_count=args.min_count
+        )
+        s.record_write(rows=len(trends))
 
-    # Store the slope and trend type (rising or falling)
-    trend_rows.append({
-        "region": region,
-        "genre": genre,
-        "slope": model.coef_[0],
-        "trend_type": "rising" if model.coef_[0] > 0 else "falling"
-    })
+    # Store the slope and trend type (rising or falling), plus fit quality and significance
+    trends = trends.rename(columns={"track_genre": "genre"})
+    trends["trend_type"] = trends["slope"].map(lambda s: "rising" if s > 0 else "falling")
+    trends = trends[["region", "genre", "slope", "trend_type", "intercept", "r2", "p_value"]]
 
-# Save the trend results as a CSV for use in dashboards or regional analysis
-pd.DataFrame(trend_rows).to_csv("data/genre_trends_by_region.csv", index=False)
-print("Saved genre trends to data/genre_trends_by_region.csv")
\ No newline at end of file
+    # Save the trend results as a CSV for use in dashboards or regional analysis
+    with span("write") as s:
+        trends.to_csv(OUTPUT_PATH, index=False)
+        s.record_write(OUTPUT_PATH, rows=len(trends))
+    print(f"Saved genre trends for {len(trends):,} region/genre pairs to {OUTPUT_PATH}")
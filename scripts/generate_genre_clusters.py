@@ -3,10 +3,21 @@
 import pandas as pd
 from sklearn.preprocessing import StandardScaler
 from sklearn.cluster import KMeans
+import sys, os
+
+# Add the project root to the system path to allow importing from the utils folder
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from utils.metrics_utils import start_stage, span
+
+INPUT_PATH = "data/mood_by_genre.csv"
+
+start_stage("generate_genre_clusters")
 
 # Load the pre-aggregated mood feature dataset
 # Each row represents a music genre with its averaged audio characteristics
-df = pd.read_csv("data/mood_by_genre.csv")
+with span("read") as s:
+    df = pd.read_csv(INPUT_PATH)
+    s.record_read(INPUT_PATH, rows=len(df))
 
 # Select the mood-related audio features to use for clustering
 # These features describe the general vibe or structure of each genre
@@ -14,13 +25,16 @@ features = ["valence", "energy", "danceability", "tempo",
             "acousticness", "instrumentalness", "liveness", "speechiness"]
 
 # Standardize feature values so that all features contribute equally to clustering
-scaler = StandardScaler()
-X_scaled = scaler.fit_transform(df[features])
+with span("cluster") as s:
+    s.record_read(rows=len(df))
+    scaler = StandardScaler()
+    X_scaled = scaler.fit_transform(df[features])
 
-# Apply KMeans clustering to group similar genres based on their mood profiles
-# We specify 6 clusters arbitrarily, which can be tuned later for better separation
-kmeans = KMeans(n_clusters=6, random_state=42, n_init=10)
-df["cluster"] = kmeans.fit_predict(X_scaled)
+    # Apply KMeans clustering to group similar genres based on their mood profiles
+    # We specify 6 clusters arbitrarily, which can be tuned later for better separation
+    kmeans = KMeans(n_clusters=6, random_state=42, n_init=10)
+    df["cluster"] = kmeans.fit_predict(X_scaled)
+    s.record_write(rows=len(df))
 
 # Assign a readable name to each cluster based on the most common genre within it
 # This helps in making the clusters interpretable in charts or dashboards
@@ -29,5 +43,7 @@ df["cluster_name"] = df["cluster"].map(cluster_names)
 
 # Save the clustered data for use in Streamlit visualizations and ML predictions
 output_path = "data/genre_clusters.csv"
-df.to_csv(output_path, index=False)
+with span("write") as s:
+    df.to_csv(output_path, index=False)
+    s.record_write(output_path, rows=len(df))
 print(f"Saved clustered genre data to {output_path}")
\ No newline at end of file
@@ -1,31 +1,50 @@
 # scripts/generate_genre_trends.py
 
 import pandas as pd
-import os
+import sys, os
+
+# Add the project root to the system path to allow importing from the utils folder
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from utils.data_utils import iter_audio_features, load_tracks, AUDIO_PARQUET_PATH, TRACKS_CRAWL_DIR, TRACKS_SAMPLE_FILE
+from utils.aggregate_utils import PARTIALS_DIR, GroupCounts
+from utils.metrics_utils import start_stage, span
 
 # Define file paths
-AUDIO_PATH = os.path.join("data", "audio_features_cleaned.csv")   # Contains genre and audio features
-TRACKS_PATH = os.path.join("data", "tracks_2020.csv")             # Contains release dates
 OUTPUT_PATH = os.path.join("data", "genre_trends.csv")            # Output for yearly genre counts
+COUNTS_PATH = os.path.join(PARTIALS_DIR, "year_genre_counts.parquet")   # Mergeable year × genre counts
 
-# Load both datasets
-audio = pd.read_csv(AUDIO_PATH)
-tracks = pd.read_csv(TRACKS_PATH)
+start_stage("generate_genre_trends")
 
-# Merge audio features with release dates using track_id as the key
-# This allows us to assign a release year to each genre-tagged track
-merged = audio.merge(tracks[["track_id", "release_date"]], on="track_id", how="left")
+# Load release years (one small row per track)
+# Release dates come from the crawled track partitions, or the tracks_2020.csv sample before a crawl
+with span("read_tracks") as s:
+    tracks = load_tracks(columns=["track_id", "release_date"])
+    crawl_dir = os.path.join("data", TRACKS_CRAWL_DIR)
+    s.record_read(crawl_dir if os.path.isdir(crawl_dir) else os.path.join("data", TRACKS_SAMPLE_FILE), rows=len(tracks))
 
 # Convert release_date to datetime and extract the release year
-merged["release_date"] = pd.to_datetime(merged["release_date"], errors="coerce")
-merged["year"] = merged["release_date"].dt.year
-
-# Remove entries with missing genre or release year
-merged = merged.dropna(subset=["year", "track_genre"])
+release_year = pd.to_datetime(tracks["release_date"], errors="coerce").dt.year
+release_year.index = tracks["track_id"]
+
+# Stream the audio features (only track id and genre are needed) and count tracks per genre per year
+# Each chunk is matched to release years by track_id, so only the running counts stay in memory
+counts = GroupCounts(["year", "track_genre"])
+with span("aggregate") as s:
+    rows = 0
+    for chunk in iter_audio_features(columns=["track_id", "track_genre"]):
+        rows += len(chunk)
+        chunk = chunk.assign(year=chunk["track_id"].map(release_year))
+
+        # Remove entries with missing genre or release year
+        counts.update(chunk.dropna(subset=["year", "track_genre"]))
+    s.record_read(AUDIO_PARQUET_PATH, rows=rows)
 
 # Count the number of tracks per genre per year
-trend = merged.groupby(["year", "track_genre"]).size().reset_index(name="track_count")
-
-# Save the genre trend data to a CSV file for visualization or modeling
-trend.to_csv(OUTPUT_PATH, index=False)
-print(f"Saved genre trends to {OUTPUT_PATH}")
\ No newline at end of file
+trend = counts.to_frame("track_count")
+
+# Save the genre trend data to a CSV file for visualization or modeling, and the counts for reuse
+with span("write") as s:
+    trend.to_csv(OUTPUT_PATH, index=False)
+    counts.save(COUNTS_PATH)
+    s.record_write(OUTPUT_PATH, rows=len(trend)).record_write(COUNTS_PATH)
+print(f"Saved genre trends to {OUTPUT_PATH}")
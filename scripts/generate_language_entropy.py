@@ -1,45 +1,86 @@
 # scripts/generate_language_entropy.py
 
+import argparse
 import pandas as pd
 import numpy as np
-import os
+import sys, os
 
-# Load the language detection results and the cleaned chart data
-lang_df = pd.read_csv("data/lang_detect.csv")
-charts_df = pd.read_csv("data/charts_2017_2023_clean.csv")
+# Add the project root to the system path to allow importing from the utils folder
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from utils.data_utils import load_charts, CHARTS_PARQUET_PATH
+from utils.entity_utils import assign_track_keys
+from utils.metrics_utils import start_stage, span
+from utils.parallel_utils import map_regions
 
-# Rename 'name' to 'track_name' to ensure consistent column names for merging
-lang_df = lang_df.rename(columns={"name": "track_name"})
-
-# Merge language data with chart data using track name and artist name
-# This ensures we're matching language info with specific charted songs
-merged = charts_df.merge(lang_df, on=["track_name", "artist_name"], how="inner")
-
-# Drop any rows where region or language is missing
-merged = merged.dropna(subset=["region", "language"])
+LANG_PATH = os.path.join("data", "lang_detect.csv")
 
 # Define a function to calculate Shannon entropy
 # Entropy measures how evenly languages are distributed in a region
 def shannon_entropy(series):
     proportions = series.value_counts(normalize=True)
+    proportions = proportions[proportions > 0]
     return -np.sum(proportions * np.log2(proportions))
 
-# Group by region and calculate:
+# For one region's charted tracks:
 # - language entropy (diversity score)
 # - total number of charted tracks
 # - number of unique languages detected
-entropy_df = (
-    merged.groupby("region")
-    .agg(
-        entropy_score=("language", shannon_entropy),
-        total_tracks=("track_name", "count"),
-        unique_languages=("language", "nunique")
-    )
-    .reset_index()
-    .sort_values("entropy_score", ascending=False)
-)
-
-# Save the results to a CSV file for use in visualizations
-output_path = os.path.join("data", "language_entropy.csv")
-entropy_df.to_csv(output_path, index=False)
-print(f"Saved entropy-based diversity scores to {output_path}")
\ No newline at end of file
+def region_language_summary(region, rows):
+    return {
+        "entropy_score": shannon_entropy(rows["language"]),
+        "total_tracks": len(rows),
+        "unique_languages": rows["language"].nunique(),
+    }
+
+# Parses the number of worker processes for the per-region summaries
+def parse_args():
+    parser = argparse.ArgumentParser(description="Score the language diversity of every region's charts.")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Number of processes for the per-region summaries (default: one per CPU core)")
+    return parser.parse_args()
+
+# The work runs under a main guard because the per-region summaries use a process pool,
+# whose workers re-import this module on platforms that spawn processes
+if __name__ == "__main__":
+    args = parse_args()
+    start_stage("generate_language_entropy")
+
+    # Load the language detection results and the cleaned chart data
+    with span("read") as s:
+        lang_df = pd.read_csv(LANG_PATH)
+        charts_df = load_charts(columns=["region", "track_name", "artist_name"])
+        s.record_read(LANG_PATH, rows=len(lang_df)).record_read(CHARTS_PARQUET_PATH, rows=len(charts_df))
+
+    # Rename 'name' to 'track_name' to ensure consistent column names for merging
+    lang_df = lang_df.rename(columns={"name": "track_name"})
+
+    # Merge language data with chart data on the canonical track key (normalized title and primary artist),
+    # so differences in case, spacing or featured-artist credits between the sources still match.
+    # Each distinct title/artist spelling is hashed once, and the merge itself joins on integers.
+    with span("merge") as s:
+        s.record_read(rows=len(charts_df))
+        charts_df["track_key"] = assign_track_keys(charts_df)
+        lang_df["track_key"] = assign_track_keys(lang_df)
+        languages = lang_df.dropna(subset=["track_key", "language"]).drop_duplicates("track_key")
+        merged = charts_df.merge(languages[["track_key", "language"]], on="track_key", how="inner")
+
+        # Drop any rows where region or language is missing
+        merged = merged.dropna(subset=["region", "language"])
+        s.record_write(rows=len(merged))
+
+    # Summarize every region in parallel: the merged rows are split by region into shared memory,
+    # each worker process reads its regions from there, and the per-region rows are merged
+    with span("groupby") as s:
+        s.record_read(rows=len(merged))
+        entropy_df = (
+            map_regions(region_language_summary, merged[["region", "language"]], workers=args.workers)
+            .sort_values("entropy_score", ascending=False)
+        )
+        s.record_write(rows=len(entropy_df))
+
+    # Save the results to a CSV file for use in visualizations
+    output_path = os.path.join("data", "language_entropy.csv")
+    with span("write") as s:
+        entropy_df.to_csv(output_path, index=False)
+        s.record_write(output_path, rows=len(entropy_df))
+    print(f"Saved entropy-based diversity scores to {output_path}")
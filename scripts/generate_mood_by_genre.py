@@ -1,31 +1,45 @@
 # scripts/generate_mood_by_genre.py
 
-import pandas as pd
-import os
+import sys, os
 
-# Define input and output file paths
-AUDIO_PATH = os.path.join("data", "audio_features_cleaned.csv")
+# Add the project root to the system path to allow importing from the utils folder
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from utils.data_utils import iter_audio_features, AUDIO_PARQUET_PATH
+from utils.aggregate_utils import PARTIALS_DIR, FeatureMoments
+from utils.metrics_utils import start_stage, span
+
+# Define output file paths
 OUTPUT_PATH = os.path.join("data", "mood_by_genre.csv")
+# Per-genre count / sum / sum of squares of every mood feature, for scripts that need variance or std
+MOMENTS_PATH = os.path.join(PARTIALS_DIR, "mood_by_genre_moments.parquet")
+
+# Mood-related audio features averaged per genre
+MOOD_FEATURES = [
+    "valence", "energy", "danceability", "tempo",
+    "acousticness", "instrumentalness", "liveness", "speechiness"
+]
 
-# Load the cleaned audio features dataset
-df = pd.read_csv(AUDIO_PATH)
+start_stage("generate_mood_by_genre")
 
-# Keep only rows with valid, non-empty genre labels
-df = df[df["track_genre"].notna() & (df["track_genre"] != "")]
+# Stream the cleaned audio features dataset in chunks (genre plus mood features only)
+# Only the running per-genre moments are kept in memory, so the input can be larger than RAM
+moments = FeatureMoments(MOOD_FEATURES, group_name="track_genre")
+with span("aggregate") as s:
+    rows = 0
+    for chunk in iter_audio_features(columns=["track_genre"] + MOOD_FEATURES):
+        rows += len(chunk)
+        # Keep only rows with valid, non-empty genre labels
+        chunk = chunk[chunk["track_genre"].notna() & (chunk["track_genre"] != "")]
+        moments.update(chunk, "track_genre")
+    s.record_read(AUDIO_PARQUET_PATH, rows=rows)
 
 # Calculate the average value of mood-related audio features for each genre
 # These metrics give insight into the overall sound and emotion of each genre
-summary = df.groupby("track_genre").agg({
-    "valence": "mean",
-    "energy": "mean",
-    "danceability": "mean",
-    "tempo": "mean",
-    "acousticness": "mean",
-    "instrumentalness": "mean",
-    "liveness": "mean",
-    "speechiness": "mean"
-}).reset_index()
-
-# Save the mood profile summary per genre to a CSV file
-summary.to_csv(OUTPUT_PATH, index=False)
-print(f"Saved mood summary to {OUTPUT_PATH}")
\ No newline at end of file
+summary = moments.mean().sort_index().reset_index()
+
+# Save the mood profile summary per genre to a CSV file, and the moments for reuse
+with span("write") as s:
+    summary.to_csv(OUTPUT_PATH, index=False)
+    moments.save(MOMENTS_PATH)
+    s.record_write(OUTPUT_PATH, rows=len(summary)).record_write(MOMENTS_PATH)
+print(f"Saved mood summary to {OUTPUT_PATH}")
@@ -0,0 +1,77 @@
+# scripts/generate_rolling_popularity.py
+
+import pandas as pd
+import sys, os
+
+# Add the project root to the system path to allow importing from the utils folder
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from utils.data_utils import load_charts, load_audio_features, CHARTS_PARQUET_PATH, AUDIO_PARQUET_PATH
+from utils.entity_utils import assign_track_keys, assign_artist_keys
+from utils.rolling_utils import ROLLING_WINDOWS, rolling_popularity
+from utils.metrics_utils import start_stage, span
+
+LANG_PATH = os.path.join("data", "lang_detect.csv")
+OUTPUT_PATH = os.path.join("data", "rolling_popularity.parquet")
+
+start_stage("generate_rolling_popularity")
+
+with span("read") as s:
+    charts_df = load_charts(columns=["date", "region", "streams", "track_name", "artist_name"])
+    audio_df = load_audio_features(columns=["track_name", "artist_name", "track_genre"])
+    lang_df = pd.read_csv(LANG_PATH, usecols=["name", "artist_name", "language"]).rename(columns={"name": "track_name"})
+    s.record_read(CHARTS_PARQUET_PATH, rows=len(charts_df)).record_read(AUDIO_PARQUET_PATH, rows=len(audio_df))
+    s.record_read(LANG_PATH, rows=len(lang_df))
+
+# Every chart row's canonical track and artist, and the genres and language of each track
+# (genres come from the audio features, as in the database's track_genre table, so a track can have several)
+with span("resolve") as s:
+    s.record_read(rows=len(charts_df))
+    charts_df["track_key"] = assign_track_keys(charts_df)
+    charts_df["artist_key"] = assign_artist_keys(charts_df["artist_name"])
+    charts_df = charts_df.dropna(subset=["date", "region", "track_key"])
+    charts_df["streams"] = charts_df["streams"].fillna(0)
+
+    audio_df["track_key"] = assign_track_keys(audio_df)
+    genres = audio_df.dropna(subset=["track_key", "track_genre"]).drop_duplicates(["track_key", "track_genre"])
+    lang_df["track_key"] = assign_track_keys(lang_df)
+    languages = lang_df.dropna(subset=["track_key", "language"]).drop_duplicates("track_key")
+
+    # Artists are labelled with the first spelling seen for their key
+    artist_names = charts_df.drop_duplicates("artist_key").set_index("artist_key")["artist_name"].astype(str)
+    s.record_write(rows=len(charts_df))
+
+# Streams per region and day: the denominator of every share
+with span("daily_totals") as s:
+    totals = charts_df.groupby(["region", "date"], observed=True, as_index=False)["streams"].sum()
+    s.record_write(rows=len(totals))
+
+# Chart rows of each dimension, labelled with the entity they count towards
+entries = {
+    "genre": charts_df.merge(genres[["track_key", "track_genre"]], on="track_key")
+        .rename(columns={"track_genre": "entity"}),
+    "artist": charts_df.assign(entity=charts_df["artist_key"].map(artist_names)),
+    "language": charts_df.merge(languages[["track_key", "language"]], on="track_key")
+        .rename(columns={"language": "entity"}),
+}
+
+# One daily aggregation per dimension, then every window from a single cumulative sum over it
+frames = []
+for dimension, df in entries.items():
+    with span(dimension) as s:
+        s.record_read(rows=len(df))
+        daily = df.groupby(["region", "entity", "date"], observed=True, as_index=False)["streams"].sum()
+        rolling = rolling_popularity(daily, "entity", group_cols=["region"], group_totals=totals)
+        frames.append(rolling.assign(dimension=dimension))
+        s.record_write(rows=len(rolling))
+
+result = pd.concat(frames, ignore_index=True)
+result = result[["dimension", "region", "entity", "date"]
+                + [f"{m}_{w}d" for m in ("streams", "share") for w in ROLLING_WINDOWS]]
+for col in ("dimension", "region", "entity"):
+    result[col] = result[col].astype(str).astype("category")
+
+with span("write") as s:
+    result.to_parquet(OUTPUT_PATH, index=False)
+    s.record_write(OUTPUT_PATH, rows=len(result))
+print(f"Saved rolling {'/'.join(map(str, ROLLING_WINDOWS))}-day popularity "
+      f"({len(result):,} rows) to {OUTPUT_PATH}")
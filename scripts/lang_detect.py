@@ -1,46 +1,77 @@
 # scripts/lang_detect.py
 
-import pandas as pd
+import argparse
 import sqlite3
 import sys, os
 
 # Add the project root to the system path to allow importing from the utils folder
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
-from utils.lang_utils import detect_language
+from utils.lang_utils import detect_languages
+from utils.data_utils import load_tracks
+from utils.metrics_utils import start_stage, span
 
 # Define file paths for input and output
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
-TRACKS_PATH = os.path.join(PROJECT_ROOT, "data", "tracks_2020.csv")          # Input: track titles
+DATA_DIR = os.path.join(PROJECT_ROOT, "data")                                # Input: crawled tracks or tracks_2020.csv
 LANG_TABLE_PATH = os.path.join(PROJECT_ROOT, "data", "lang_detect.csv")      # Output: language detection CSV
 DB_PATH = os.path.join(PROJECT_ROOT, "data", "music.db")                     # SQLite database path
+CACHE_PATH = os.path.join(PROJECT_ROOT, "data", "lang_cache.db")             # Persistent detection cache
 
-# Load the tracks dataset and keep only relevant fields
-# Dropping rows with missing values to avoid detection errors
-df = pd.read_csv(TRACKS_PATH)
-df = df[["track_id", "name", "artist_name"]].dropna()
-
-# Apply language detection to each track name using langdetect
-# Adds a new 'language' column to the dataframe
-df["language"] = df["name"].apply(detect_language)
-
-# Save the detection results to a CSV as a backup or reference
-df.to_csv(LANG_TABLE_PATH, index=False)
-print(f"Saved language detection results to {LANG_TABLE_PATH}")
-
-# Create or replace the 'lang_detect' table in the SQLite database
-# This allows other scripts to join with this language data efficiently
-conn = sqlite3.connect(DB_PATH)
-c = conn.cursor()
-c.execute("""
-    CREATE TABLE IF NOT EXISTS lang_detect (
-        track_id TEXT,
-        name TEXT,
-        artist_name TEXT,
-        language TEXT
-    )
-""")
-df.to_sql("lang_detect", conn, if_exists="replace", index=False)
-conn.commit()
-conn.close()
-
-print(f"lang_detect table inserted into {DB_PATH}")
\ No newline at end of file
+# Parses command line options for language detection
+def parse_args():
+    parser = argparse.ArgumentParser(description="Detect the language of every track title.")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Number of detection processes (default: one per CPU core)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Ignore the on-disk cache and re-detect every title")
+    return parser.parse_args()
+
+# The work runs under a main guard because detection uses a process pool,
+# whose workers re-import this module on platforms that spawn processes
+if __name__ == "__main__":
+    args = parse_args()
+    start_stage("lang_detect")
+
+    # Load the tracks dataset and keep only relevant fields
+    # Dropping rows with missing values to avoid detection errors
+    with span("read") as s:
+        df = load_tracks(columns=["track_id", "name", "artist_name"], data_dir=DATA_DIR)
+        df = df.dropna()
+        s.record_read(rows=len(df))
+
+    # Detect the language of each track name in one batch
+    # Identical titles are detected once, and titles seen in earlier runs come from the cache
+    # Adds a new 'language' column to the dataframe
+    with span("detect") as s:
+        df["language"] = detect_languages(
+            df["name"].tolist(),
+            workers=args.workers,
+            cache_path=None if args.no_cache else CACHE_PATH
+        )
+        s.record_read(rows=len(df)).record_write(rows=int(df["language"].notna().sum()))
+
+    # Save the detection results to a CSV as a backup or reference
+    with span("write_csv") as s:
+        df.to_csv(LANG_TABLE_PATH, index=False)
+        s.record_write(LANG_TABLE_PATH, rows=len(df))
+    print(f"Saved language detection results to {LANG_TABLE_PATH}")
+
+    # Create or replace the 'lang_detect' table in the SQLite database
+    # This allows other scripts to join with this language data efficiently
+    with span("write_db") as s:
+        conn = sqlite3.connect(DB_PATH)
+        c = conn.cursor()
+        c.execute("""
+            CREATE TABLE IF NOT EXISTS lang_detect (
+                track_id TEXT,
+                name TEXT,
+                artist_name TEXT,
+                language TEXT
+            )
+        """)
+        df.to_sql("lang_detect", conn, if_exists="replace", index=False)
+        conn.commit()
+        conn.close()
+        s.record_write(rows=len(df))
+
+    print(f"lang_detect table inserted into {DB_PATH}")
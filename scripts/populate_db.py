@@ -1,9 +1,13 @@
+import argparse
 import sqlite3
+import time
 import pandas as pd
 import sys, os
 
 # Add project root to sys.path so we can import from parent directories if needed
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from utils.entity_utils import build_key_map
+from utils.metrics_utils import start_stage, span
 
 # Define all necessary file paths
 DB_PATH = os.path.join("data", "music.db")
@@ -13,21 +17,50 @@ COUNTRY_UTILS_PATH = os.path.join("data", "country_utils.csv")
 LANG_DETECT_PATH = os.path.join("data", "lang_detect.csv")
 SQL_FOLDER = os.path.join(os.path.dirname(__file__), "..", "sql")
 
+# Bulk-load settings: rows parsed per CSV chunk and rows inserted per transaction
+BULK_CHUNK_SIZE = 100_000
+BULK_ROWS_PER_TRANSACTION = 1_000_000
+
+# PRAGMAs applied only while bulk loading, trading crash safety for insert speed
+# (the database is rebuilt from the CSVs anyway); the previous values are restored afterwards
+BULK_LOAD_PRAGMAS = {
+    "journal_mode": "MEMORY",
+    "synchronous": "OFF",
+    "cache_size": -512000,   # negative = size in KiB, so roughly 500 MB of page cache
+    "temp_store": "MEMORY",
+}
+
+# Indexes are created after all tables are loaded, so inserts don't pay for index maintenance
+INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_charts_track_artist ON charts (track_name, artist_name)",
+    "CREATE INDEX IF NOT EXISTS idx_charts_region ON charts (region)",
+    # Leads with date for date filters; also the duplicate check of incremental ingestion
+    "CREATE INDEX IF NOT EXISTS idx_charts_entry ON charts (date, region, chart, position)",
+    "CREATE INDEX IF NOT EXISTS idx_audio_features_track_artist ON audio_features (track_name, artist_name)",
+    "CREATE INDEX IF NOT EXISTS idx_lang_detect_name_artist ON lang_detect (name, artist_name)",
+]
+
 # Connect to the SQLite database
+# Write-ahead logging lets the dashboard keep reading while this script writes (the mode is
+# stored in the database file; bulk loads switch it off temporarily and restore it afterwards)
 def connect_db():
     print(f"Connecting to SQLite database: {DB_PATH}")
-    return sqlite3.connect(DB_PATH)
+    conn = sqlite3.connect(DB_PATH)
+    conn.execute("PRAGMA journal_mode = WAL")
+    return conn
 
 # Create all required tables if they don't already exist
 def create_tables(conn):
     cursor = conn.cursor()
 
-    # Audio features table from Spotify
+    # Audio features table from Spotify (columns match audio_features_cleaned.csv)
     cursor.execute("""
         CREATE TABLE IF NOT EXISTS audio_features (
             track_id TEXT,
-            name TEXT,
+            track_name TEXT,
             artist_name TEXT,
+            popularity INTEGER,
+            explicit INTEGER,
             danceability REAL,
             energy REAL,
             key INTEGER,
@@ -40,7 +73,8 @@ def create_tables(conn):
             valence REAL,
             tempo REAL,
             duration_ms INTEGER,
-            time_signature INTEGER
+            time_signature INTEGER,
+            track_genre TEXT
         )
     """)
 
@@ -59,6 +93,17 @@ def create_tables(conn):
         )
     """)
 
+    # High-water marks of incremental chart ingestion: the latest date loaded per region and chart
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS chart_high_water (
+            region TEXT NOT NULL,
+            chart TEXT NOT NULL,
+            max_date TEXT NOT NULL,
+            updated_at TEXT,
+            PRIMARY KEY (region, chart)
+        )
+    """)
+
     # Country location utility table (used for mapping)
     cursor.execute("""
         CREATE TABLE IF NOT EXISTS country_utils (
@@ -68,6 +113,18 @@ def create_tables(conn):
         )
     """)
 
+    # Canonical track and artist keys for every raw title/artist spelling (see utils/entity_utils.py)
+    # The star schema joins the raw tables through this map, and everything downstream joins on the keys
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS track_key_map (
+            track_name TEXT NOT NULL,
+            artist_name TEXT NOT NULL,
+            track_key INTEGER NOT NULL,
+            artist_key INTEGER NOT NULL,
+            PRIMARY KEY (track_name, artist_name)
+        ) WITHOUT ROWID
+    """)
+
     # Language detection table (applied on track titles)
     cursor.execute("""
         CREATE TABLE IF NOT EXISTS lang_detect (
@@ -82,10 +139,12 @@ def create_tables(conn):
     print("Tables created")
 
 # Load a CSV into a table only if it’s currently empty
-def load_table_if_empty(conn, table_name, csv_path, display_name):
+# In bulk mode the CSV is streamed in chunks instead of being read into memory at once
+# Returns the number of rows inserted (0 if the table was skipped)
+def load_table_if_empty(conn, table_name, csv_path, display_name, bulk=False, chunksize=None):
     if not os.path.exists(csv_path):
         print(f"Missing file: {csv_path}")
-        return
+        return 0
 
     cur = conn.cursor()
     try:
@@ -93,34 +152,277 @@ def load_table_if_empty(conn, table_name, csv_path, display_name):
         row_count = cur.fetchone()[0]
         if row_count > 0:
             print(f"Skipped {display_name} (already has {row_count} rows)")
-            return
+            return 0
     except sqlite3.OperationalError:
         print(f"Table {table_name} doesn't exist, creating and loading...")
 
+    if bulk:
+        return bulk_load_table(conn, table_name, csv_path, display_name, chunksize)
+
     print(f"Reading {display_name} from {csv_path} ...")
     df = pd.read_csv(csv_path, low_memory=False)
     print(f"{display_name} CSV has {len(df)} rows. Inserting in chunks...")
 
     df.to_sql(table_name, conn, if_exists="append", index=False, chunksize=1000)
     print(f"Inserted {len(df)} rows into {display_name} (chunked)")
+    return len(df)
+
+# Sets loader PRAGMAs and returns the previous values so they can be restored
+def set_pragmas(conn, pragmas):
+    previous = {}
+    for name, value in pragmas.items():
+        previous[name] = conn.execute(f"PRAGMA {name}").fetchone()[0]
+        conn.execute(f"PRAGMA {name} = {value}")
+    return previous
+
+# Streams a CSV into an existing table in chunks using executemany inside large explicit transactions
+# Only columns present in both the CSV and the table are inserted; the rest are reported and skipped
+def bulk_load_table(conn, table_name, csv_path, display_name, chunksize=None,
+                    rows_per_transaction=BULK_ROWS_PER_TRANSACTION):
+    chunksize = chunksize or BULK_CHUNK_SIZE
+    table_columns = [(row[1], row[2].upper()) for row in conn.execute(f"PRAGMA table_info({table_name})")]
+    csv_columns = pd.read_csv(csv_path, nrows=0).columns.tolist()
+    columns = [name for name, _ in table_columns if name in csv_columns]
+    text_columns = [name for name, col_type in table_columns if name in columns and col_type == "TEXT"]
+
+    skipped = [col for col in csv_columns if col not in columns]
+    if skipped:
+        print(f"{display_name}: ignoring CSV columns not in table {table_name}: {', '.join(skipped)}")
+
+    placeholders = ", ".join("?" for _ in columns)
+    insert_sql = f"INSERT INTO {table_name} ({', '.join(columns)}) VALUES ({placeholders})"
+
+    print(f"Bulk loading {display_name} from {csv_path} in chunks of {chunksize:,} rows ...")
+    previous_isolation = conn.isolation_level
+    conn.commit()
+    conn.isolation_level = None  # manage transactions explicitly
+    previous_pragmas = set_pragmas(conn, BULK_LOAD_PRAGMAS)
+
+    start = time.perf_counter()
+    total_rows = 0
+    rows_in_transaction = 0
+    try:
+        conn.execute("BEGIN")
+        for chunk in pd.read_csv(csv_path, usecols=columns, dtype={c: str for c in text_columns},
+                                 chunksize=chunksize):
+            chunk = chunk[columns]
+            # Convert to Python objects with None for missing values, which sqlite3 binds directly
+            rows = chunk.astype(object).where(chunk.notna(), None).itertuples(index=False, name=None)
+            conn.executemany(insert_sql, rows)
+
+            total_rows += len(chunk)
+            rows_in_transaction += len(chunk)
+            if rows_in_transaction >= rows_per_transaction:
+                conn.execute("COMMIT")
+                conn.execute("BEGIN")
+                rows_in_transaction = 0
+
+            elapsed = time.perf_counter() - start
+            print(f"  {display_name}: {total_rows:,} rows ({total_rows / elapsed:,.0f} rows/s)")
+        conn.execute("COMMIT")
+    except Exception:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        raise
+    finally:
+        set_pragmas(conn, previous_pragmas)
+        conn.isolation_level = previous_isolation
+
+    elapsed = time.perf_counter() - start
+    rate = total_rows / elapsed if elapsed > 0 else float("inf")
+    print(f"Inserted {total_rows:,} rows into {display_name} in {elapsed:.1f}s ({rate:,.0f} rows/s)")
+    return total_rows
+
+# Build indexes for the join and filter columns once the data is in place
+def create_indexes(conn):
+    start = time.perf_counter()
+    for statement in INDEXES:
+        conn.execute(statement)
+    conn.commit()
+    print(f"Indexes created in {time.perf_counter() - start:.1f}s")
+
+# Every title/artist spelling in the raw tables
+ALL_TRACK_PAIRS_SQL = """
+    SELECT track_name, artist_name FROM charts
+    UNION
+    SELECT track_name, artist_name FROM audio_features
+    UNION
+    SELECT name, artist_name FROM lang_detect
+"""
+
+# Adds the canonical keys of title/artist spellings that aren't in track_key_map yet
+# pairs_sql selects (track_name, artist_name) rows, e.g. from a staging table; returns the number added
+def resolve_track_keys(conn, pairs_sql=ALL_TRACK_PAIRS_SQL):
+    start = time.perf_counter()
+    pairs = pd.read_sql_query(f"""
+        SELECT DISTINCT p.track_name, p.artist_name
+        FROM ({pairs_sql}) p
+        WHERE p.track_name IS NOT NULL AND p.artist_name IS NOT NULL
+          AND NOT EXISTS (
+              SELECT 1 FROM track_key_map k
+              WHERE k.track_name = p.track_name AND k.artist_name = p.artist_name
+          )
+    """, conn)
+    key_map = build_key_map(pairs)
+    rows = zip(key_map["track_name"].tolist(), key_map["artist_name"].tolist(),
+               key_map["track_key"].astype("int64").tolist(), key_map["artist_key"].astype("int64").tolist())
+    conn.executemany("INSERT OR IGNORE INTO track_key_map (track_name, artist_name, track_key, artist_key) "
+                     "VALUES (?, ?, ?, ?)", rows)
+    conn.commit()
+    print(f"Resolved {len(key_map):,} new title/artist spellings to canonical keys "
+          f"in {time.perf_counter() - start:.1f}s")
+    return len(key_map)
+
+# Build the star schema (integer-keyed dimensions, chart-entry fact table and covering indexes)
+# from the raw tables; skipped if the fact table has already been populated
+def build_star_schema(conn):
+    row_count = 0
+    try:
+        row_count = conn.execute("SELECT COUNT(*) FROM fact_chart_entry").fetchone()[0]
+    except sqlite3.OperationalError:
+        pass
+    if row_count > 0:
+        print(f"Skipped star schema (fact_chart_entry already has {row_count} rows)")
+        return
+
+    print("Building star schema from raw tables ...")
+    start = time.perf_counter()
+    resolve_track_keys(conn)
+    with open(os.path.join(SQL_FOLDER, "star_schema.sql"), "r", encoding="utf-8") as f:
+        conn.executescript(f.read())
+    conn.commit()
+
+    counts = {
+        table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        for table in ("dim_track", "dim_artist", "dim_region", "dim_genre", "fact_chart_entry")
+    }
+    print(f"Star schema built in {time.perf_counter() - start:.1f}s: "
+          + ", ".join(f"{table}={n:,}" for table, n in counts.items()))
 
 # Loaders for specific tables
-def load_audio_features(conn):
-    load_table_if_empty(conn, "audio_features", AUDIO_FEATURES_PATH, "Audio Features")
+# Each is timed as its own span, with the rows inserted and the size of the CSV read
+def load_audio_features(conn, bulk=False, chunksize=None):
+    with span("load_audio_features") as s:
+        rows = load_table_if_empty(conn, "audio_features", AUDIO_FEATURES_PATH, "Audio Features", bulk, chunksize)
+        if rows:
+            s.record_read(AUDIO_FEATURES_PATH, rows=rows).record_write(rows=rows)
+
+def load_charts(conn, bulk=False, chunksize=None):
+    with span("load_charts") as s:
+        rows = load_table_if_empty(conn, "charts", CHARTS_PATH, "Charts", bulk, chunksize)
+        if rows:
+            s.record_read(CHARTS_PATH, rows=rows).record_write(rows=rows)
+
+def load_country_utils(conn, bulk=False, chunksize=None):
+    with span("load_country_utils") as s:
+        rows = load_table_if_empty(conn, "country_utils", COUNTRY_UTILS_PATH, "Country Utils", bulk, chunksize)
+        if rows:
+            s.record_read(COUNTRY_UTILS_PATH, rows=rows).record_write(rows=rows)
 
-def load_charts(conn):
-    load_table_if_empty(conn, "charts", CHARTS_PATH, "Charts")
+def load_lang_detect(conn, bulk=False, chunksize=None):
+    with span("load_lang_detect") as s:
+        rows = load_table_if_empty(conn, "lang_detect", LANG_DETECT_PATH, "Language Detection", bulk, chunksize)
+        if rows:
+            s.record_read(LANG_DETECT_PATH, rows=rows).record_write(rows=rows)
 
-def load_country_utils(conn):
-    load_table_if_empty(conn, "country_utils", COUNTRY_UTILS_PATH, "Country Utils")
+# Returns {(region, chart): latest loaded date}, seeding the marks from the charts table on first use
+def load_high_water_marks(conn):
+    if conn.execute("SELECT COUNT(*) FROM chart_high_water").fetchone()[0] == 0:
+        conn.execute("""
+            INSERT INTO chart_high_water (region, chart, max_date, updated_at)
+            SELECT region, COALESCE(chart, ''), MAX(date), datetime('now')
+            FROM charts
+            WHERE region IS NOT NULL AND date IS NOT NULL
+            GROUP BY region, COALESCE(chart, '')
+        """)
+        conn.commit()
+    rows = conn.execute("SELECT region, chart, max_date FROM chart_high_water")
+    return {(region, chart): max_date for region, chart, max_date in rows}
 
-def load_lang_detect(conn):
-    load_table_if_empty(conn, "lang_detect", LANG_DETECT_PATH, "Language Detection")
+# Appends a chart delivery (e.g. one new day) to an existing database without rebuilding it
+# Only rows dated after the high-water mark of their region and chart are staged; ingest_charts.sql
+# then drops duplicate (date, region, chart, position) entries, appends the rest to the raw and
+# fact tables and advances the marks in one transaction. The aggregates are refreshed for the
+# touched (year, region) partitions only. Returns the number of chart entries added.
+def ingest_charts(conn, csv_path, chunksize=None):
+    if not os.path.exists(csv_path):
+        print(f"Missing file: {csv_path}")
+        return 0
+    try:
+        has_facts = conn.execute("SELECT 1 FROM fact_chart_entry LIMIT 1").fetchone() is not None
+    except sqlite3.OperationalError:
+        raise RuntimeError(f"{DB_PATH} has no star schema yet; run a full build first")
+
+    start = time.perf_counter()
+    create_tables(conn)
+    if has_facts and conn.execute("SELECT 1 FROM track_key_map LIMIT 1").fetchone() is None:
+        raise RuntimeError(f"{DB_PATH} was built before canonical track keys; rebuild it with a full build first")
+    marks = load_high_water_marks(conn)
+
+    table_columns = [row[1] for row in conn.execute("PRAGMA table_info(charts)")]
+    csv_columns = pd.read_csv(csv_path, nrows=0).columns.tolist()
+    columns = [name for name in table_columns if name in csv_columns]
+    missing = {"date", "region"} - set(columns)
+    if missing:
+        raise ValueError(f"{csv_path} is missing required columns: {', '.join(sorted(missing))}")
+    text_columns = ["track_id", "track_name", "artist_name", "date", "region", "chart", "trend"]
+
+    conn.execute("DROP TABLE IF EXISTS temp.charts_staging")
+    conn.execute("CREATE TEMP TABLE charts_staging AS SELECT * FROM charts WHERE 0")
+    insert_sql = (f"INSERT INTO charts_staging ({', '.join(columns)}) "
+                  f"VALUES ({', '.join('?' for _ in columns)})")
+
+    read, staged = 0, 0
+    for chunk in pd.read_csv(csv_path, usecols=columns, chunksize=chunksize or BULK_CHUNK_SIZE,
+                             dtype={c: str for c in text_columns if c in columns}):
+        read += len(chunk)
+        # Normalize dates to YYYY-MM-DD so they compare correctly with the stored marks
+        chunk["date"] = pd.to_datetime(chunk["date"], errors="coerce").dt.strftime("%Y-%m-%d")
+        chart = chunk["chart"].fillna("") if "chart" in chunk.columns else pd.Series("", index=chunk.index)
+        mark = pd.Series([marks.get(key, "") for key in zip(chunk["region"], chart)], index=chunk.index)
+        chunk = chunk[chunk["date"].notna() & chunk["region"].notna() & (chunk["date"] > mark)]
+        if chunk.empty:
+            continue
+        chunk = chunk[columns]
+        conn.executemany(insert_sql, chunk.astype(object).where(chunk.notna(), None).itertuples(index=False, name=None))
+        staged += len(chunk)
+    conn.commit()
+    resolve_track_keys(conn, "SELECT track_name, artist_name FROM charts_staging")
+
+    last_entry_id = conn.execute("SELECT COALESCE(MAX(entry_id), 0) FROM fact_chart_entry").fetchone()[0]
+    with open(os.path.join(SQL_FOLDER, "ingest_charts.sql"), "r", encoding="utf-8") as f:
+        conn.executescript(f.read())
+
+    added = conn.execute("SELECT COUNT(*) FROM temp.charts_new").fetchone()[0]
+    partitions = conn.execute(
+        "SELECT DISTINCT year, region_key FROM fact_chart_entry WHERE entry_id > ?", (last_entry_id,)
+    ).fetchall()
+    print(f"Ingested {added:,} new chart entries from {csv_path} ({read:,} rows read, {staged:,} past the "
+          f"high-water marks, {staged - added:,} duplicates dropped) in {time.perf_counter() - start:.1f}s")
+
+    if partitions:
+        date_range = conn.execute("SELECT MIN(date), MAX(date) FROM temp.charts_new").fetchone()
+        regions = conn.execute("SELECT COUNT(DISTINCT region) FROM temp.charts_new").fetchone()[0]
+        print(f"New entries span {date_range[0]} to {date_range[1]} across {regions} regions")
+        refresh_aggregates(conn, partitions=partitions)
+    return added
 
 # Apply all SQL view scripts from the /sql folder
 def apply_sql_views(conn):
     print("📄 Applying SQL view scripts from /sql ...")
+
+    # Older builds created top_moods_by_country as a one-off table; it is now a view
+    # over a refreshed aggregate, so the stale table has to go first
+    legacy = conn.execute(
+        "SELECT type FROM sqlite_master WHERE name = 'top_moods_by_country'"
+    ).fetchone()
+    if legacy and legacy[0] == "table":
+        conn.execute("DROP TABLE top_moods_by_country")
+        conn.commit()
+        print("Dropped legacy top_moods_by_country table")
+
     sql_files = [
+        "materialized_aggregates.sql",
         "artist_origin_map.sql",
         "languages.sql",
         "top_genres_by_year.sql",
@@ -139,17 +441,92 @@ def apply_sql_views(conn):
         else:
             print(f"File not found: {file}")
 
+# Recompute the materialized aggregates behind the views, creating any aggregate table that is missing
+# Only (year, region) partitions touched by chart entries appended since the last refresh are rebuilt,
+# plus any partitions passed in explicitly; full=True rebuilds every partition
+# (needed after dimension changes such as re-running language detection)
+def refresh_aggregates(conn, full=False, partitions=None):
+    start = time.perf_counter()
+
+    # The aggregate tables are all CREATE TABLE IF NOT EXISTS, so applying them first lets refresh and
+    # ingest upgrade a database built before an aggregate was added. Every aggregate whose table is
+    # created here starts again from last_entry_id 0, so this refresh fills all of its partitions.
+    existing = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    with open(os.path.join(SQL_FOLDER, "materialized_aggregates.sql"), "r", encoding="utf-8") as f:
+        conn.executescript(f.read())
+    created = [(name,) for (name,) in conn.execute("SELECT aggregate FROM mv_refresh_state") if name not in existing]
+    conn.executemany("UPDATE mv_refresh_state SET last_entry_id = 0 WHERE aggregate = ?", created)
+
+    if full:
+        conn.execute("""
+            INSERT OR IGNORE INTO mv_dirty_partitions (year, region_key)
+            SELECT DISTINCT year, region_key FROM fact_chart_entry
+        """)
+    if partitions:
+        conn.executemany(
+            "INSERT OR IGNORE INTO mv_dirty_partitions (year, region_key) VALUES (?, ?)",
+            partitions
+        )
+    conn.commit()
+
+    with open(os.path.join(SQL_FOLDER, "refresh_aggregates.sql"), "r", encoding="utf-8") as f:
+        conn.executescript(f.read())
+
+    refreshed = conn.execute("SELECT MAX(partitions_refreshed) FROM mv_refresh_state").fetchone()[0] or 0
+    print(f"Refreshed {refreshed} (year, region) partitions of the materialized aggregates "
+          f"in {time.perf_counter() - start:.1f}s")
+
+# Parses command line options for the database build
+def parse_args():
+    parser = argparse.ArgumentParser(description="Build and populate data/music.db from the cleaned CSVs.")
+    parser.add_argument("command", nargs="?", default="build", choices=["build", "refresh", "ingest"],
+                        help="build: load tables, schema and views (default); refresh: update the aggregates only; "
+                             "ingest: append new chart dates from a CSV")
+    parser.add_argument("csv", nargs="?", default=CHARTS_PATH,
+                        help="With ingest: chart CSV to append (default: the cleaned charts file)")
+    parser.add_argument("--full", action="store_true",
+                        help="With refresh: recompute every partition instead of only the changed ones")
+    parser.add_argument("--bulk", action="store_true",
+                        help="Stream CSVs in chunks with executemany and loader PRAGMAs (for large files)")
+    parser.add_argument("--chunksize", type=int, default=BULK_CHUNK_SIZE,
+                        help="Rows per CSV chunk in bulk mode and when ingesting")
+    return parser.parse_args()
+
 # Run the entire database setup process
 if __name__ == "__main__":
+    args = parse_args()
+    stage = start_stage("populate_db" if args.command == "build" else f"populate_db_{args.command}")
     try:
         conn = connect_db()
+        if args.command == "refresh":
+            with span("refresh_aggregates"):
+                refresh_aggregates(conn, full=args.full)
+            conn.close()
+            sys.exit(0)
+        if args.command == "ingest":
+            with span("ingest_charts") as s:
+                added = ingest_charts(conn, args.csv, args.chunksize)
+                s.record_read(args.csv).record_write(rows=added)
+            conn.close()
+            sys.exit(0)
+
         create_tables(conn)
-        load_audio_features(conn)
-        load_charts(conn)
-        load_country_utils(conn)
-        load_lang_detect(conn)
-        apply_sql_views(conn)
+        load_audio_features(conn, args.bulk, args.chunksize)
+        load_charts(conn, args.bulk, args.chunksize)
+        load_country_utils(conn, args.bulk, args.chunksize)
+        load_lang_detect(conn, args.bulk, args.chunksize)
+        with span("create_indexes"):
+            create_indexes(conn)
+        with span("build_star_schema"):
+            build_star_schema(conn)
+        with span("apply_sql_views"):
+            apply_sql_views(conn)
+        with span("refresh_aggregates"):
+            refresh_aggregates(conn)
         conn.close()
         print("Database built and populated successfully with views.")
     except Exception as e:
-        print(f"Error during execution: {e}")
\ No newline at end of file
+        stage.fail(e)
+        print(f"Error during execution: {e}")
+        # A non-zero exit status makes run_pipeline.py record the build as failed rather than current
+        sys.exit(1)
\ No newline at end of file
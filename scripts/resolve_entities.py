@@ -0,0 +1,57 @@
+# scripts/resolve_entities.py
+
+import pandas as pd
+import sys, os
+
+# Add the project root to the system path to allow importing from the utils folder
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from utils.data_utils import load_charts, load_audio_features, CHARTS_PARQUET_PATH, AUDIO_PARQUET_PATH
+from utils.entity_utils import TRACK_KEYS_PATH, assign_track_keys, build_key_map
+from utils.metrics_utils import start_stage, span
+
+LANG_PATH = os.path.join("data", "lang_detect.csv")
+
+# Share of the chart rows whose track also appears in another source, matching on the raw
+# (track_name, artist_name) strings and on the canonical track key
+def match_rates(charts, other):
+    raw = pd.MultiIndex.from_frame(charts[["track_name", "artist_name"]].astype(object))
+    other_raw = pd.MultiIndex.from_frame(other[["track_name", "artist_name"]].astype(object))
+    by_raw = raw.isin(other_raw).mean()
+    by_key = charts["track_key"].isin(other["track_key"].dropna()).mean()
+    return by_raw, by_key
+
+if __name__ == "__main__":
+    start_stage("resolve_entities")
+
+    # Only the name columns are needed; repeated titles and artists come back as categoricals,
+    # so each distinct spelling is normalized once
+    with span("read") as s:
+        charts = load_charts(columns=["track_name", "artist_name"])
+        audio = load_audio_features(columns=["track_name", "artist_name"])
+        lang = pd.read_csv(LANG_PATH, usecols=["name", "artist_name"]).rename(columns={"name": "track_name"})
+        s.record_read(CHARTS_PARQUET_PATH, rows=len(charts)).record_read(AUDIO_PARQUET_PATH, rows=len(audio))
+        s.record_read(LANG_PATH, rows=len(lang))
+
+    # One row per raw spelling across all three sources, with its canonical track and artist keys
+    with span("resolve") as s:
+        pairs = pd.concat([df[["track_name", "artist_name"]].astype(object) for df in (charts, audio, lang)],
+                          ignore_index=True)
+        s.record_read(rows=len(pairs))
+        key_map = build_key_map(pairs)
+        s.record_write(rows=len(key_map))
+
+    with span("write") as s:
+        os.makedirs(os.path.dirname(TRACK_KEYS_PATH), exist_ok=True)
+        key_map.to_parquet(TRACK_KEYS_PATH, index=False)
+        s.record_write(TRACK_KEYS_PATH, rows=len(key_map))
+
+    print(f"Resolved {len(key_map):,} title/artist spellings to {key_map['track_key'].nunique():,} tracks "
+          f"and {key_map['artist_key'].nunique():,} artists; saved to {TRACK_KEYS_PATH}")
+
+    # How many more chart rows the canonical keys match than the raw strings did
+    with span("match_rates"):
+        for df in (charts, audio, lang):
+            df["track_key"] = assign_track_keys(df)
+        for name, other in (("lang_detect", lang), ("audio_features", audio)):
+            by_raw, by_key = match_rates(charts, other)
+            print(f"Chart rows matched to {name}: {by_raw:.1%} by raw title/artist, {by_key:.1%} by track key")
@@ -0,0 +1,312 @@
+# scripts/run_pipeline.py
+
+import argparse
+import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+# Add the project root to the system path to allow importing from the utils folder
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from utils.pipeline_utils import load_state, save_state, fingerprint_stage, is_stage_current
+from utils.metrics_utils import start_stage, span
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+STATE_PATH = os.path.join("data", ".pipeline_state.json")
+
+# Code every stage script imports, fingerprinted for every stage in addition to its own "code"
+SHARED_CODE = ["utils/metrics_utils.py"]
+
+# Dependency graph of the batch pipeline
+# Each stage lists the files it reads, the files it writes, the code it depends on,
+# and optionally the command line arguments its script is run with.
+# "optional_inputs" are fingerprinted like inputs but may be absent (e.g. the crawled data/tracks
+# partitions, which replace the tracks_2020.csv sample once a crawl has run).
+# Edges are derived automatically: a stage depends on whichever stage produces one of its inputs.
+STAGES = [
+    {
+        "name": "clean_audio_features",
+        "script": "scripts/clean_audio_features.py",
+        "inputs": ["data/audio_features_kaggle.csv"],
+        "outputs": ["data/audio_features_cleaned.csv"],
+    },
+    {
+        "name": "convert_audio_features_to_parquet",
+        "script": "scripts/convert_to_parquet.py",
+        "args": ["audio_features"],
+        "inputs": ["data/audio_features_cleaned.csv"],
+        "outputs": ["data/audio_features_cleaned.parquet"],
+        "code": ["utils/data_utils.py", "utils/schema_utils.py"],
+    },
+    {
+        "name": "convert_charts_to_parquet",
+        "script": "scripts/convert_to_parquet.py",
+        "args": ["charts"],
+        "inputs": ["data/charts_2017_2023_clean.csv"],
+        "outputs": ["data/charts_2017_2023_clean.parquet"],
+        "code": ["utils/data_utils.py", "utils/schema_utils.py"],
+    },
+    {
+        "name": "lang_detect",
+        "script": "scripts/lang_detect.py",
+        "inputs": [],
+        "optional_inputs": ["data/tracks", "data/tracks_2020.csv"],
+        "outputs": ["data/lang_detect.csv"],
+        "code": ["utils/lang_utils.py", "utils/data_utils.py", "utils/schema_utils.py"],
+    },
+    {
+        "name": "generate_mood_by_genre",
+        "script": "scripts/generate_mood_by_genre.py",
+        "inputs": ["data/audio_features_cleaned.parquet"],
+        "outputs": ["data/mood_by_genre.csv", "data/partials/mood_by_genre_moments.parquet"],
+        "code": ["utils/data_utils.py", "utils/schema_utils.py", "utils/aggregate_utils.py"],
+    },
+    {
+        "name": "generate_genre_trends",
+        "script": "scripts/generate_genre_trends.py",
+        "inputs": ["data/audio_features_cleaned.parquet"],
+        "optional_inputs": ["data/tracks", "data/tracks_2020.csv"],
+        "outputs": ["data/genre_trends.csv", "data/partials/year_genre_counts.parquet"],
+        "code": ["utils/data_utils.py", "utils/schema_utils.py", "utils/aggregate_utils.py"],
+    },
+    {
+        "name": "generate_genre_clusters",
+        "script": "scripts/generate_genre_clusters.py",
+        "inputs": ["data/mood_by_genre.csv"],
+        "outputs": ["data/genre_clusters.csv"],
+    },
+    {
+        "name": "train_mood_cluster_classifier",
+        "script": "scripts/train_mood_cluster_classifier.py",
+        "inputs": ["data/genre_clusters.csv"],
+        "outputs": ["models/mood_cluster_classifier.pkl"],
+    },
+    {
+        "name": "score_mood_clusters",
+        "script": "scripts/score_mood_clusters.py",
+        "inputs": ["data/audio_features_cleaned.parquet", "models/mood_cluster_classifier.pkl"],
+        "outputs": ["data/mood_cluster_scores.parquet"],
+        "code": ["utils/model_utils.py"],
+    },
+    {
+        "name": "build_similarity_index",
+        "script": "scripts/similar_tracks.py",
+        "args": ["build"],
+        "inputs": ["data/audio_features_cleaned.parquet"],
+        "outputs": ["models/similarity_index"],
+        "code": ["utils/similarity_utils.py", "utils/model_utils.py", "utils/data_utils.py", "utils/schema_utils.py"],
+    },
+    {
+        "name": "resolve_entities",
+        "script": "scripts/resolve_entities.py",
+        "inputs": ["data/charts_2017_2023_clean.parquet", "data/audio_features_cleaned.parquet",
+                   "data/lang_detect.csv"],
+        "outputs": ["data/track_keys.parquet"],
+        "code": ["utils/entity_utils.py", "utils/data_utils.py", "utils/schema_utils.py"],
+    },
+    {
+        "name": "generate_language_entropy",
+        "script": "scripts/generate_language_entropy.py",
+        "inputs": ["data/charts_2017_2023_clean.parquet", "data/lang_detect.csv"],
+        "outputs": ["data/language_entropy.csv"],
+        "code": ["utils/entity_utils.py", "utils/parallel_utils.py", "utils/data_utils.py", "utils/schema_utils.py"],
+    },
+    {
+        "name": "generate_rolling_popularity",
+        "script": "scripts/generate_rolling_popularity.py",
+        "inputs": ["data/charts_2017_2023_clean.parquet", "data/audio_features_cleaned.parquet", "data/lang_detect.csv"],
+        "outputs": ["data/rolling_popularity.parquet"],
+        "code": ["utils/rolling_utils.py", "utils/entity_utils.py", "utils/data_utils.py", "utils/schema_utils.py"],
+    },
+    {
+        "name": "generate_artist_counts_by_country",
+        "script": "scripts/generate_artist_counts_by_country.py",
+        "inputs": ["data/charts_2017_2023_clean.parquet", "data/country_utils.csv"],
+        "outputs": ["data/artist_counts_by_country.csv"],
+        "code": ["utils/parallel_utils.py", "utils/data_utils.py", "utils/schema_utils.py"],
+    },
+    {
+        "name": "generate_country_genre_trends",
+        "script": "scripts/generate_country_genre_trends.py",
+        "inputs": ["data/charts_2017_2023_clean.parquet"],
+        "outputs": ["data/genre_trends_by_region.csv"],
+        "code": ["utils/trend_utils.py", "utils/parallel_utils.py", "utils/data_utils.py", "utils/schema_utils.py"],
+    },
+]
+
+# Serializes console output from concurrently running stages
+PRINT_LOCK = threading.Lock()
+
+# Prints a message without interleaving it with output from other stages
+def log(message):
+    with PRINT_LOCK:
+        print(message, flush=True)
+
+# Returns the names of the stages that produce the inputs of the given stage
+def upstream_stages(stage, stages):
+    producers = {path: s["name"] for s in stages for path in s["outputs"]}
+    paths = stage["inputs"] + stage.get("optional_inputs", [])
+    return {producers[path] for path in paths if path in producers}
+
+# Orders stages so that every stage comes after the stages it depends on
+# Raises an error if the graph contains a cycle
+def topological_order(stages):
+    deps = {s["name"]: upstream_stages(s, stages) for s in stages}
+    ordered, done = [], set()
+    while len(ordered) < len(stages):
+        ready = [s for s in stages if s["name"] not in done and deps[s["name"]] <= done]
+        if not ready:
+            raise ValueError("Pipeline graph contains a dependency cycle")
+        for s in ready:
+            ordered.append(s)
+            done.add(s["name"])
+    return ordered
+
+# Runs the pipeline, executing independent stages concurrently in separate worker processes
+# Stages whose inputs and code are unchanged since their last successful run are skipped
+class PipelineRunner:
+    def __init__(self, stages, jobs=None, force=False, dry_run=False):
+        self.stages = topological_order(stages)
+        self.deps = {s["name"]: upstream_stages(s, self.stages) for s in self.stages}
+        self.jobs = jobs or os.cpu_count() or 1
+        self.force = force
+        self.dry_run = dry_run
+        self.state = load_state(STATE_PATH)
+        self.lock = threading.Lock()
+        self.results = {}
+
+    # Checks one stage and runs it if needed
+    # Returns one of: "current", "ran", "would-run", "missing-input", "failed", "blocked"
+    def process_stage(self, stage):
+        name = stage["name"]
+
+        # A failed or blocked upstream stage means our inputs can't be trusted
+        if any(self.results.get(dep) in ("failed", "blocked") for dep in self.deps[name]):
+            log(f"[{name}] blocked by a failed upstream stage")
+            return "blocked"
+
+        # In a dry run, anything downstream of a stage that would run must also run
+        if self.dry_run and any(self.results.get(dep) == "would-run" for dep in self.deps[name]):
+            log(f"[{name}] would run (upstream changed)")
+            return "would-run"
+
+        missing = [path for path in stage["inputs"] if not os.path.exists(path)]
+        if missing:
+            log(f"[{name}] skipped, missing input: {', '.join(missing)}")
+            return "missing-input"
+
+        code = [stage["script"]] + SHARED_CODE + stage.get("code", [])
+        args = stage.get("args", [])
+        inputs = stage["inputs"] + stage.get("optional_inputs", [])
+        # Hash into a private copy of the file cache: other stages save the state while this one hashes,
+        # and the shared cache must not change size while it is being serialized
+        with self.lock:
+            file_cache = dict(self.state["files"])
+        fingerprint = fingerprint_stage(inputs, code, file_cache, args)
+        with self.lock:
+            self.state["files"].update(file_cache)
+
+        if not self.force and is_stage_current(name, fingerprint, stage["outputs"], self.state):
+            log(f"[{name}] up to date")
+            return "current"
+
+        if self.dry_run:
+            log(f"[{name}] would run")
+            return "would-run"
+
+        log(f"[{name}] running {stage['script']} ...")
+        start = time.perf_counter()
+        # The script records its own detailed metrics; this span times it from the runner's side
+        # (CPU time of concurrently running stages is attributed to whichever finishes first)
+        with span(name) as s:
+            proc = subprocess.run(
+                [sys.executable, stage["script"]] + args,
+                cwd=PROJECT_ROOT,
+                capture_output=True,
+                text=True
+            )
+            if proc.returncode != 0:
+                s.fail(RuntimeError(f"exit code {proc.returncode}"))
+            for path in stage["outputs"]:
+                s.record_write(path)
+        elapsed = time.perf_counter() - start
+
+        # Print the stage's own output as one block so parallel stages don't interleave
+        output = (proc.stdout + proc.stderr).strip()
+        if output:
+            log("\n".join(f"[{name}]   {line}" for line in output.splitlines()))
+
+        missing_outputs = [path for path in stage["outputs"] if not os.path.exists(path)]
+        if proc.returncode != 0 or missing_outputs:
+            log(f"[{name}] FAILED after {elapsed:.1f}s (exit code {proc.returncode})")
+            return "failed"
+
+        with self.lock:
+            self.state["stages"][name] = {
+                "fingerprint": fingerprint,
+                "finished_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "seconds": round(elapsed, 3)
+            }
+            save_state(STATE_PATH, self.state)
+
+        log(f"[{name}] done in {elapsed:.1f}s")
+        return "ran"
+
+    # Schedules stages as soon as all their upstream stages have finished
+    def run(self):
+        pending = list(self.stages)
+        running = {}
+
+        with ThreadPoolExecutor(max_workers=self.jobs) as pool:
+            while pending or running:
+                finished = set(self.results)
+                ready = [s for s in pending if self.deps[s["name"]] <= finished]
+                for stage in ready:
+                    pending.remove(stage)
+                    running[pool.submit(self.process_stage, stage)] = stage["name"]
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    self.results[running.pop(future)] = future.result()
+
+        if not self.dry_run:
+            with self.lock:
+                save_state(STATE_PATH, self.state)
+        return self.results
+
+# Parses command line options for the pipeline runner
+def parse_args():
+    parser = argparse.ArgumentParser(description="Rebuild the data/ artifacts, skipping stages that are up to date.")
+    parser.add_argument("stages", nargs="*", help="Only run these stages (default: all)")
+    parser.add_argument("--jobs", "-j", type=int, default=None, help="Maximum number of stages to run in parallel")
+    parser.add_argument("--force", action="store_true", help="Rebuild stages even if their outputs are current")
+    parser.add_argument("--dry-run", action="store_true", help="Only report which stages would run")
+    return parser.parse_args()
+
+# Entry point: run the whole pipeline (or the selected stages) and report a summary
+if __name__ == "__main__":
+    args = parse_args()
+    os.chdir(PROJECT_ROOT)
+
+    # Stages inherit the run ID, so their metrics can be grouped by pipeline run
+    if not args.dry_run:
+        os.environ["PIPELINE_RUN_ID"] = start_stage("run_pipeline").run_id
+
+    stages = STAGES
+    if args.stages:
+        unknown = set(args.stages) - {s["name"] for s in STAGES}
+        if unknown:
+            sys.exit(f"Unknown stage(s): {', '.join(sorted(unknown))}")
+        stages = [s for s in STAGES if s["name"] in args.stages]
+
+    results = PipelineRunner(stages, jobs=args.jobs, force=args.force, dry_run=args.dry_run).run()
+
+    counts = {}
+    for status in results.values():
+        counts[status] = counts.get(status, 0) + 1
+    print("Pipeline finished: " + ", ".join(f"{n} {status}" for status, n in sorted(counts.items())))
+
+    if "failed" in counts:
+        sys.exit(1)
@@ -0,0 +1,133 @@
+# scripts/score_mood_clusters.py
+
+import sys, os
+
+# Add the project root to the system path to allow importing from the utils folder
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import argparse
+import time
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from utils.data_utils import AUDIO_PARQUET_PATH
+from utils.model_utils import MODEL_PATH, MOOD_FEATURES, load_mood_model, score_mood_clusters
+from utils.metrics_utils import start_stage, span
+
+# Default output: one row per input track with its cluster label and probabilities
+OUTPUT_PATH = os.path.join("data", "mood_cluster_scores.parquet")
+
+# Rows scored per model call; large chunks keep every core busy and amortize per-call overhead
+CHUNK_SIZE = 200_000
+
+# Identifier columns copied from the input to the output when present
+KEEP_COLUMNS = ["track_id", "track_name", "artist_name", "track_genre"]
+
+# Yields DataFrame chunks of an input CSV or Parquet file, reading only the columns needed
+def iter_chunks(path, columns, chunk_size=CHUNK_SIZE):
+    if path.endswith(".parquet"):
+        parquet_file = pq.ParquetFile(path)
+        available = [c for c in columns if c in parquet_file.schema_arrow.names]
+        for batch in parquet_file.iter_batches(batch_size=chunk_size, columns=available):
+            yield batch.to_pandas()
+    else:
+        header = pd.read_csv(path, nrows=0).columns
+        available = [c for c in columns if c in header]
+        yield from pd.read_csv(path, usecols=available, chunksize=chunk_size)
+
+# Writes scored chunks to CSV or Parquet (chosen by the output extension) as they arrive
+class ScoreWriter:
+    def __init__(self, path):
+        self.path = path
+        self.tmp_path = path + ".tmp"
+        self.parquet = path.endswith(".parquet")
+        self.writer = None
+        self.wrote_header = False
+
+    def write(self, df):
+        if self.parquet:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if self.writer is None:
+                self.writer = pq.ParquetWriter(self.tmp_path, table.schema, compression="zstd")
+            else:
+                # A chunk whose column is entirely empty infers a null type; align it with the first chunk
+                table = table.cast(self.writer.schema)
+            self.writer.write_table(table)
+        else:
+            df.to_csv(self.tmp_path, mode="a" if self.wrote_header else "w",
+                      header=not self.wrote_header, index=False)
+            self.wrote_header = True
+
+    # Moves the finished file into place; with success=False the partial file is discarded,
+    # so a failed run never leaves partial scores behind
+    def close(self, success=True):
+        if self.writer is not None:
+            self.writer.close()
+        if not os.path.exists(self.tmp_path):
+            return
+        if success:
+            os.replace(self.tmp_path, self.path)
+        else:
+            os.remove(self.tmp_path)
+
+# Streams a track file through the mood cluster classifier chunk by chunk
+# Each chunk is scored in one vectorized predict_proba call spread over n_jobs cores,
+# and written out before the next chunk is read, so memory stays bounded by the chunk size.
+# Returns a summary with the number of rows scored, rows skipped (missing features) and rows per second.
+def score_file(input_path, output_path=OUTPUT_PATH, model_path=MODEL_PATH,
+               chunk_size=CHUNK_SIZE, n_jobs=-1, keep_columns=KEEP_COLUMNS):
+    with span("load_model") as s:
+        model = load_mood_model(model_path, n_jobs=n_jobs)
+        s.record_read(model_path)
+    writer = ScoreWriter(output_path)
+    scored, skipped = 0, 0
+    start = time.perf_counter()
+
+    with span("score") as s:
+        try:
+            for number, chunk in enumerate(iter_chunks(input_path, keep_columns + MOOD_FEATURES, chunk_size), start=1):
+                chunk_start = time.perf_counter()
+                scores = score_mood_clusters(model, chunk)
+                kept = [c for c in keep_columns if c in chunk.columns]
+                writer.write(pd.concat([chunk[kept].reset_index(drop=True), scores.reset_index(drop=True)], axis=1))
+
+                missing = int(scores["cluster"].isna().sum())
+                scored += len(chunk) - missing
+                skipped += missing
+                elapsed = time.perf_counter() - chunk_start
+                print(f"Chunk {number}: {len(chunk):,} rows in {elapsed:.2f}s ({len(chunk) / max(elapsed, 1e-9):,.0f} rows/s)")
+        except BaseException:
+            writer.close(success=False)
+            raise
+        writer.close()
+        s.record_read(input_path, rows=scored + skipped).record_write(output_path, rows=scored + skipped)
+
+    elapsed = time.perf_counter() - start
+    summary = {
+        "rows_scored": scored,
+        "rows_skipped": skipped,
+        "seconds": round(elapsed, 3),
+        "rows_per_second": round((scored + skipped) / max(elapsed, 1e-9)),
+    }
+    print(f"Scored {scored:,} tracks ({skipped:,} skipped for missing features) in {elapsed:.1f}s "
+          f"— {summary['rows_per_second']:,} rows/s → {output_path}")
+    return summary
+
+# Parses command line options for batch scoring
+def parse_args():
+    parser = argparse.ArgumentParser(description="Label a CSV or Parquet file of tracks with mood clusters.")
+    parser.add_argument("input", nargs="?", default=AUDIO_PARQUET_PATH,
+                        help="Tracks with the eight mood features (.csv or .parquet)")
+    parser.add_argument("-o", "--output", default=OUTPUT_PATH, help="Output file (.csv or .parquet)")
+    parser.add_argument("--model", default=MODEL_PATH, help="Trained classifier")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="Rows scored per model call")
+    parser.add_argument("--jobs", "-j", type=int, default=-1, help="Cores used for prediction (-1 = all)")
+    return parser.parse_args()
+
+# Entry point: score the whole file and report throughput
+if __name__ == "__main__":
+    args = parse_args()
+    if not os.path.exists(args.input):
+        sys.exit(f"Missing input file: {args.input}")
+    start_stage("score_mood_clusters")
+    score_file(args.input, args.output, args.model, args.chunk_size, args.jobs)
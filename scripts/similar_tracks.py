@@ -0,0 +1,75 @@
+# scripts/similar_tracks.py
+
+import sys, os
+
+# Add the project root to the system path to allow importing from the utils folder
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import argparse
+import time
+import pandas as pd
+from utils.data_utils import load_audio_features, AUDIO_PARQUET_PATH
+from utils.model_utils import MOOD_FEATURES
+from utils.similarity_utils import INDEX_DIR, TRACK_COLUMNS, SimilarityIndex
+from utils.metrics_utils import start_stage, span
+
+# Default output of batch queries
+OUTPUT_PATH = os.path.join("data", "similar_tracks.csv")
+
+# Builds the "sounds like" index from the cleaned audio features and saves it to disk
+def build_index(index_dir=INDEX_DIR):
+    start = time.perf_counter()
+    with span("read") as s:
+        df = load_audio_features(columns=TRACK_COLUMNS + MOOD_FEATURES)
+        s.record_read(AUDIO_PARQUET_PATH, rows=len(df))
+    with span("build") as s:
+        index = SimilarityIndex.build(df)
+        s.record_read(rows=len(df)).record_write(rows=len(index.tracks))
+    with span("write") as s:
+        index.save(index_dir)
+        s.record_write(index_dir, rows=len(index.tracks))
+    print(f"Indexed {len(index.tracks):,} tracks and {len(index.genre_centroids):,} genres "
+          f"in {time.perf_counter() - start:.1f}s → {index_dir}")
+
+# Finds the top-k similar tracks for every track ID in a CSV (track_id column) or for all indexed tracks
+def query_batch(track_file=None, output_path=OUTPUT_PATH, k=10, workers=None, index_dir=INDEX_DIR):
+    with span("read") as s:
+        index = SimilarityIndex.load(index_dir)
+        if track_file:
+            track_ids = pd.read_csv(track_file, usecols=["track_id"], dtype=str)["track_id"].dropna().tolist()
+            s.record_read(track_file, rows=len(track_ids))
+        else:
+            track_ids = index.tracks["track_id"].tolist()
+
+    start = time.perf_counter()
+    with span("query") as s:
+        result = index.similar_tracks_batch(track_ids, k=k, workers=workers)
+        s.record_read(rows=len(track_ids)).record_write(rows=len(result))
+    elapsed = time.perf_counter() - start
+    with span("write") as s:
+        result.to_csv(output_path, index=False)
+        s.record_write(output_path, rows=len(result))
+
+    queried = result["query_track_id"].nunique()
+    print(f"Found {k} similar tracks for {queried:,} of {len(track_ids):,} tracks in {elapsed:.1f}s "
+          f"({queried / max(elapsed, 1e-9):,.0f} queries/s) → {output_path}")
+
+# Parses command line options for building and querying the index
+def parse_args():
+    parser = argparse.ArgumentParser(description="Build and query the nearest-neighbour \"sounds like\" index.")
+    parser.add_argument("command", nargs="?", default="build", choices=["build", "query"],
+                        help="build: index data/audio_features_cleaned (default); query: batch similar-track lookup")
+    parser.add_argument("--tracks", help="With query: CSV with a track_id column (default: every indexed track)")
+    parser.add_argument("-o", "--output", default=OUTPUT_PATH, help="With query: output CSV")
+    parser.add_argument("-k", type=int, default=10, help="Neighbours per track")
+    parser.add_argument("--workers", type=int, default=None, help="Query threads (default: one per CPU core)")
+    return parser.parse_args()
+
+# Entry point: build the index or answer a batch of queries
+if __name__ == "__main__":
+    args = parse_args()
+    start_stage(f"similar_tracks_{args.command}")
+    if args.command == "build":
+        build_index()
+    else:
+        query_batch(args.tracks, args.output, args.k, args.workers)
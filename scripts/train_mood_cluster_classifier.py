@@ -2,9 +2,21 @@ import pandas as pd
 from sklearn.model_selection import train_test_split
 from sklearn.ensemble import RandomForestClassifier
 import joblib
+import sys, os
+
+# Add the project root to the system path to allow importing from the utils folder
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from utils.metrics_utils import start_stage, span
+
+INPUT_PATH = "data/genre_clusters.csv"
+MODEL_PATH = "models/mood_cluster_classifier.pkl"
+
+start_stage("train_mood_cluster_classifier")
 
 # Load dataset containing genre mood clusters and audio features
-df = pd.read_csv("data/genre_clusters.csv")
+with span("read") as s:
+    df = pd.read_csv(INPUT_PATH)
+    s.record_read(INPUT_PATH, rows=len(df))
 
 # Select audio-related features used for predicting the cluster
 X = df[[
@@ -24,8 +36,12 @@ X_train, X_test, y_train, y_test = train_test_split(
 clf = RandomForestClassifier(n_estimators=100, random_state=42)
 
 # Train the model on the training data
-clf.fit(X_train, y_train)
+with span("fit") as s:
+    clf.fit(X_train, y_train)
+    s.record_read(rows=len(X_train))
 
 # Save the trained model to disk for use in the Streamlit dashboard
-joblib.dump(clf, "models/mood_cluster_classifier.pkl")
-print("Saved model to models/mood_cluster_classifier.pkl")
\ No newline at end of file
+with span("write") as s:
+    joblib.dump(clf, MODEL_PATH)
+    s.record_write(MODEL_PATH)
+print(f"Saved model to {MODEL_PATH}")
@@ -0,0 +1,76 @@
+-- Append-only ingestion of new chart entries
+-- Expects the temp table charts_staging to hold the rows of a delivery that are newer than the
+-- high-water marks (filled by populate_db.ingest_charts), whose title/artist spellings have already been
+-- added to track_key_map. Everything below runs in one transaction,
+-- so the dashboard keeps reading the previous data until the new day is fully in place.
+
+BEGIN;
+
+-- Keep one row per (date, region, chart, position): the first occurrence within the delivery,
+-- and only if that entry isn't already loaded
+DROP TABLE IF EXISTS temp.charts_new;
+CREATE TEMP TABLE charts_new AS
+SELECT s.*
+FROM charts_staging s
+WHERE s.rowid IN (
+    SELECT MIN(rowid) FROM charts_staging GROUP BY date, region, chart, position
+)
+AND NOT EXISTS (
+    SELECT 1 FROM charts c
+    WHERE c.date = s.date
+      AND c.region = s.region
+      AND c.chart IS s.chart
+      AND c.position IS s.position
+);
+
+INSERT INTO charts (track_id, track_name, artist_name, date, region, chart, trend, streams, position)
+SELECT track_id, track_name, artist_name, date, region, chart, trend, streams, position
+FROM charts_new;
+
+-- Extend the dimensions with artists, regions and tracks seen for the first time
+INSERT OR IGNORE INTO dim_artist (artist_key, artist_name)
+SELECT k.artist_key, MIN(k.artist_name)
+FROM charts_new c
+JOIN track_key_map k ON k.track_name = c.track_name AND k.artist_name = c.artist_name
+GROUP BY k.artist_key;
+
+INSERT OR IGNORE INTO dim_region (region_name, latitude, longitude)
+SELECT r.region, cu.latitude, cu.longitude
+FROM (SELECT DISTINCT region FROM charts_new WHERE region IS NOT NULL) r
+LEFT JOIN country_utils cu
+    ON LOWER(TRIM(r.region)) = LOWER(TRIM(cu.country_name));
+
+INSERT OR IGNORE INTO dim_track (track_key, track_name, artist_key)
+SELECT k.track_key, MIN(k.track_name), MIN(k.artist_key)
+FROM charts_new c
+JOIN track_key_map k ON k.track_name = c.track_name AND k.artist_name = c.artist_name
+GROUP BY k.track_key;
+
+-- Append the fact rows (entry_id keeps increasing, so the refresh sees them as new)
+INSERT INTO fact_chart_entry (date, year, track_key, region_key, chart, trend, streams, position)
+SELECT
+    c.date,
+    CAST(strftime('%Y', c.date) AS INTEGER),
+    k.track_key,
+    r.region_key,
+    c.chart,
+    c.trend,
+    c.streams,
+    c.position
+FROM charts_new c
+JOIN track_key_map k ON k.track_name = c.track_name AND k.artist_name = c.artist_name
+JOIN dim_region r    ON r.region_name = c.region;
+
+-- Advance the high-water marks
+INSERT INTO chart_high_water (region, chart, max_date, updated_at)
+SELECT region, COALESCE(chart, ''), MAX(date), datetime('now')
+FROM charts_new
+WHERE region IS NOT NULL AND date IS NOT NULL
+GROUP BY region, COALESCE(chart, '')
+ON CONFLICT (region, chart) DO UPDATE
+SET max_date   = MAX(max_date, excluded.max_date),
+    updated_at = excluded.updated_at;
+
+DELETE FROM charts_staging;
+
+COMMIT;
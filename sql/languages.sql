@@ -3,15 +3,13 @@ DROP VIEW IF EXISTS languages;
 
 -- Create a view that summarizes how many tracks appear in each language,
 -- by region and year, based on chart performance data
+-- Reads the materialized mv_language_counts table, which is already at this grain
 CREATE VIEW languages AS
 SELECT
-    ld.language AS language,               -- Detected language of the track
-    c.region AS region,                    -- Country or region where the track charted
-    strftime('%Y', c.date) AS year,        -- Extract the year from the chart date for trend analysis
-    COUNT(*) AS track_count                -- Count of tracks matching this language-region-year combo
-FROM charts c
-JOIN lang_detect ld
-    -- Join on both track name and artist name to accurately match language detection results
-    ON c.track_name = ld.name AND c.artist_name = ld.artist_name
-WHERE ld.language IS NOT NULL              -- Exclude rows with undetected or null language values
-GROUP BY ld.language, c.region, year;      -- Aggregate results by language, region, and year
\ No newline at end of file
+    m.language AS language,                -- Detected language of the track
+    r.region_name AS region,               -- Country or region where the track charted
+    m.year AS year,                        -- Chart year for trend analysis
+    m.track_count AS track_count           -- Count of tracks matching this language-region-year combo
+FROM mv_language_counts m
+JOIN dim_region r
+    ON r.region_key = m.region_key;
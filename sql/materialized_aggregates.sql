@@ -0,0 +1,134 @@
+-- Materialized aggregate tables behind the dashboard views
+-- Every aggregate is partitioned by (year, region_key), so appending new chart dates
+-- only requires recomputing the partitions those dates fall into (see refresh_aggregates.sql)
+
+-- Chart entries per genre, partitioned by year and region
+CREATE TABLE IF NOT EXISTS mv_genre_counts (
+    year        INTEGER NOT NULL,
+    region_key  INTEGER NOT NULL,
+    genre_key   INTEGER NOT NULL,
+    track_count INTEGER NOT NULL,
+    PRIMARY KEY (year, region_key, genre_key)
+) WITHOUT ROWID;
+
+-- Chart entries per detected language, partitioned by year and region
+CREATE TABLE IF NOT EXISTS mv_language_counts (
+    year        INTEGER NOT NULL,
+    region_key  INTEGER NOT NULL,
+    language    TEXT NOT NULL,
+    track_count INTEGER NOT NULL,
+    PRIMARY KEY (year, region_key, language)
+) WITHOUT ROWID;
+
+-- Distinct charting artists per year and region
+-- (distinct counts can't be summed, so the set itself is materialized; it is far smaller than the fact table)
+CREATE TABLE IF NOT EXISTS mv_region_artists (
+    year       INTEGER NOT NULL,
+    region_key INTEGER NOT NULL,
+    artist_key INTEGER NOT NULL,
+    PRIMARY KEY (region_key, year, artist_key)
+) WITHOUT ROWID;
+
+-- Average mood features per year and region
+CREATE TABLE IF NOT EXISTS mv_moods_by_country (
+    year                 INTEGER NOT NULL,
+    region_key           INTEGER NOT NULL,
+    avg_valence          REAL,
+    avg_energy           REAL,
+    avg_danceability     REAL,
+    avg_tempo            REAL,
+    avg_acousticness     REAL,
+    avg_instrumentalness REAL,
+    avg_liveness         REAL,
+    avg_speechiness      REAL,
+    total_tracks         INTEGER NOT NULL,
+    PRIMARY KEY (year, region_key)
+) WITHOUT ROWID;
+
+-- Mood feature sums per genre, partitioned by year and region
+-- Sums (not averages) are stored so any slice of years and regions can be averaged exactly;
+-- only tracks with all eight features are counted, so every sum shares the same entry_count
+CREATE TABLE IF NOT EXISTS mv_genre_moods (
+    year                 INTEGER NOT NULL,
+    region_key           INTEGER NOT NULL,
+    genre_key            INTEGER NOT NULL,
+    sum_valence          REAL NOT NULL,
+    sum_energy           REAL NOT NULL,
+    sum_danceability     REAL NOT NULL,
+    sum_tempo            REAL NOT NULL,
+    sum_acousticness     REAL NOT NULL,
+    sum_instrumentalness REAL NOT NULL,
+    sum_liveness         REAL NOT NULL,
+    sum_speechiness      REAL NOT NULL,
+    entry_count          INTEGER NOT NULL,
+    PRIMARY KEY (year, region_key, genre_key)
+) WITHOUT ROWID;
+
+-- Daily streams per region, genre, detected language and artist, partitioned by year and region
+-- The inputs of the dashboard's rolling 7/28/90-day popularity (utils/rolling_utils.py): summed per day
+-- here, so a window of any length is a cumulative sum over a few rows per day instead of a fact scan.
+-- mv_daily_region_streams holds every entry's streams once, the share denominator (a track can have several genres).
+CREATE TABLE IF NOT EXISTS mv_daily_region_streams (
+    year       INTEGER NOT NULL,
+    region_key INTEGER NOT NULL,
+    date       TEXT NOT NULL,
+    streams    INTEGER NOT NULL,
+    PRIMARY KEY (year, region_key, date)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS mv_daily_genre_streams (
+    year       INTEGER NOT NULL,
+    region_key INTEGER NOT NULL,
+    genre_key  INTEGER NOT NULL,
+    date       TEXT NOT NULL,
+    streams    INTEGER NOT NULL,
+    PRIMARY KEY (year, region_key, genre_key, date)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS mv_daily_language_streams (
+    year       INTEGER NOT NULL,
+    region_key INTEGER NOT NULL,
+    language   TEXT NOT NULL,
+    date       TEXT NOT NULL,
+    streams    INTEGER NOT NULL,
+    PRIMARY KEY (year, region_key, language, date)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS mv_daily_artist_streams (
+    year       INTEGER NOT NULL,
+    region_key INTEGER NOT NULL,
+    artist_key INTEGER NOT NULL,
+    date       TEXT NOT NULL,
+    streams    INTEGER NOT NULL,
+    PRIMARY KEY (year, region_key, artist_key, date)
+) WITHOUT ROWID;
+
+-- Year-first lookups for the dashboard's year-range filter
+-- (the primary key of mv_region_artists leads with region_key)
+CREATE INDEX IF NOT EXISTS idx_mv_region_artists_year ON mv_region_artists (year, region_key);
+
+-- Partitions waiting to be recomputed by the next refresh
+CREATE TABLE IF NOT EXISTS mv_dirty_partitions (
+    year       INTEGER NOT NULL,
+    region_key INTEGER NOT NULL,
+    PRIMARY KEY (year, region_key)
+) WITHOUT ROWID;
+
+-- Refresh bookkeeping: the last fact row folded into each aggregate, and when that happened
+CREATE TABLE IF NOT EXISTS mv_refresh_state (
+    aggregate            TEXT PRIMARY KEY,
+    last_entry_id        INTEGER NOT NULL DEFAULT 0,
+    refreshed_at         TEXT,
+    partitions_refreshed INTEGER
+);
+
+INSERT OR IGNORE INTO mv_refresh_state (aggregate) VALUES
+    ('mv_genre_counts'),
+    ('mv_language_counts'),
+    ('mv_region_artists'),
+    ('mv_moods_by_country'),
+    ('mv_genre_moods'),
+    ('mv_daily_region_streams'),
+    ('mv_daily_genre_streams'),
+    ('mv_daily_language_streams'),
+    ('mv_daily_artist_streams');
@@ -0,0 +1,156 @@
+-- Incremental refresh of the materialized aggregates
+-- Recomputes only the (year, region) partitions listed in mv_dirty_partitions,
+-- after adding the partitions touched by fact rows appended since the last refresh
+
+BEGIN;
+
+-- Mark partitions that received new chart entries (entry_id is the rowid, so this is a range scan)
+INSERT OR IGNORE INTO mv_dirty_partitions (year, region_key)
+SELECT DISTINCT year, region_key
+FROM fact_chart_entry
+WHERE entry_id > (SELECT COALESCE(MIN(last_entry_id), 0) FROM mv_refresh_state);
+
+-- Genre counts
+DELETE FROM mv_genre_counts
+WHERE (year, region_key) IN (SELECT year, region_key FROM mv_dirty_partitions);
+
+INSERT INTO mv_genre_counts (year, region_key, genre_key, track_count)
+SELECT f.year, f.region_key, tg.genre_key, COUNT(*)
+FROM mv_dirty_partitions d
+JOIN fact_chart_entry f ON f.region_key = d.region_key AND f.year = d.year
+JOIN track_genre tg     ON tg.track_key = f.track_key
+GROUP BY f.year, f.region_key, tg.genre_key;
+
+-- Language counts
+DELETE FROM mv_language_counts
+WHERE (year, region_key) IN (SELECT year, region_key FROM mv_dirty_partitions);
+
+INSERT INTO mv_language_counts (year, region_key, language, track_count)
+SELECT f.year, f.region_key, t.language, COUNT(*)
+FROM mv_dirty_partitions d
+JOIN fact_chart_entry f ON f.region_key = d.region_key AND f.year = d.year
+JOIN dim_track t        ON t.track_key = f.track_key
+WHERE t.language IS NOT NULL
+GROUP BY f.year, f.region_key, t.language;
+
+-- Distinct artists
+DELETE FROM mv_region_artists
+WHERE (year, region_key) IN (SELECT year, region_key FROM mv_dirty_partitions);
+
+INSERT INTO mv_region_artists (year, region_key, artist_key)
+SELECT DISTINCT f.year, f.region_key, t.artist_key
+FROM mv_dirty_partitions d
+JOIN fact_chart_entry f ON f.region_key = d.region_key AND f.year = d.year
+JOIN dim_track t        ON t.track_key = f.track_key;
+
+-- Mood averages
+DELETE FROM mv_moods_by_country
+WHERE (year, region_key) IN (SELECT year, region_key FROM mv_dirty_partitions);
+
+INSERT INTO mv_moods_by_country
+SELECT
+    f.year,
+    f.region_key,
+    AVG(af.valence),
+    AVG(af.energy),
+    AVG(af.danceability),
+    AVG(af.tempo),
+    AVG(af.acousticness),
+    AVG(af.instrumentalness),
+    AVG(af.liveness),
+    AVG(af.speechiness),
+    COUNT(*)
+FROM mv_dirty_partitions d
+JOIN fact_chart_entry f        ON f.region_key = d.region_key AND f.year = d.year
+JOIN track_audio_features af   ON af.track_key = f.track_key
+WHERE af.valence IS NOT NULL
+  AND af.energy IS NOT NULL
+  AND af.danceability IS NOT NULL
+  AND af.tempo IS NOT NULL
+GROUP BY f.year, f.region_key;
+
+-- Mood sums per genre
+DELETE FROM mv_genre_moods
+WHERE (year, region_key) IN (SELECT year, region_key FROM mv_dirty_partitions);
+
+INSERT INTO mv_genre_moods
+SELECT
+    f.year,
+    f.region_key,
+    tg.genre_key,
+    SUM(af.valence),
+    SUM(af.energy),
+    SUM(af.danceability),
+    SUM(af.tempo),
+    SUM(af.acousticness),
+    SUM(af.instrumentalness),
+    SUM(af.liveness),
+    SUM(af.speechiness),
+    COUNT(*)
+FROM mv_dirty_partitions d
+JOIN fact_chart_entry f        ON f.region_key = d.region_key AND f.year = d.year
+JOIN track_genre tg            ON tg.track_key = f.track_key
+JOIN track_audio_features af   ON af.track_key = f.track_key
+WHERE af.valence IS NOT NULL
+  AND af.energy IS NOT NULL
+  AND af.danceability IS NOT NULL
+  AND af.tempo IS NOT NULL
+  AND af.acousticness IS NOT NULL
+  AND af.instrumentalness IS NOT NULL
+  AND af.liveness IS NOT NULL
+  AND af.speechiness IS NOT NULL
+GROUP BY f.year, f.region_key, tg.genre_key;
+
+-- Daily streams per region
+DELETE FROM mv_daily_region_streams
+WHERE (year, region_key) IN (SELECT year, region_key FROM mv_dirty_partitions);
+
+INSERT INTO mv_daily_region_streams (year, region_key, date, streams)
+SELECT f.year, f.region_key, f.date, SUM(COALESCE(f.streams, 0))
+FROM mv_dirty_partitions d
+JOIN fact_chart_entry f ON f.region_key = d.region_key AND f.year = d.year
+GROUP BY f.year, f.region_key, f.date;
+
+-- Daily streams per genre
+DELETE FROM mv_daily_genre_streams
+WHERE (year, region_key) IN (SELECT year, region_key FROM mv_dirty_partitions);
+
+INSERT INTO mv_daily_genre_streams (year, region_key, genre_key, date, streams)
+SELECT f.year, f.region_key, tg.genre_key, f.date, SUM(COALESCE(f.streams, 0))
+FROM mv_dirty_partitions d
+JOIN fact_chart_entry f ON f.region_key = d.region_key AND f.year = d.year
+JOIN track_genre tg     ON tg.track_key = f.track_key
+GROUP BY f.year, f.region_key, tg.genre_key, f.date;
+
+-- Daily streams per language
+DELETE FROM mv_daily_language_streams
+WHERE (year, region_key) IN (SELECT year, region_key FROM mv_dirty_partitions);
+
+INSERT INTO mv_daily_language_streams (year, region_key, language, date, streams)
+SELECT f.year, f.region_key, t.language, f.date, SUM(COALESCE(f.streams, 0))
+FROM mv_dirty_partitions d
+JOIN fact_chart_entry f ON f.region_key = d.region_key AND f.year = d.year
+JOIN dim_track t        ON t.track_key = f.track_key
+WHERE t.language IS NOT NULL
+GROUP BY f.year, f.region_key, t.language, f.date;
+
+-- Daily streams per artist
+DELETE FROM mv_daily_artist_streams
+WHERE (year, region_key) IN (SELECT year, region_key FROM mv_dirty_partitions);
+
+INSERT INTO mv_daily_artist_streams (year, region_key, artist_key, date, streams)
+SELECT f.year, f.region_key, t.artist_key, f.date, SUM(COALESCE(f.streams, 0))
+FROM mv_dirty_partitions d
+JOIN fact_chart_entry f ON f.region_key = d.region_key AND f.year = d.year
+JOIN dim_track t        ON t.track_key = f.track_key
+GROUP BY f.year, f.region_key, t.artist_key, f.date;
+
+-- Record what was refreshed and clear the queue
+UPDATE mv_refresh_state
+SET last_entry_id        = (SELECT COALESCE(MAX(entry_id), 0) FROM fact_chart_entry),
+    refreshed_at         = datetime('now'),
+    partitions_refreshed = (SELECT COUNT(*) FROM mv_dirty_partitions);
+
+DELETE FROM mv_dirty_partitions;
+
+COMMIT;
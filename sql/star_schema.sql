@@ -0,0 +1,139 @@
+-- Star schema: integer-keyed dimensions and a chart-entry fact table
+-- Built once from the raw staging tables (charts, audio_features, lang_detect, country_utils)
+-- so that the views join on small integer keys instead of (track_name, artist_name) text.
+-- Tracks and artists use the canonical keys in track_key_map (filled by populate_db.py from
+-- utils/entity_utils.py): every raw spelling of a title and artist maps to one normalized, hashed key,
+-- so case, spacing and featured-artist differences between the sources no longer drop matches.
+
+-- Artist dimension: one row per canonical (primary) artist, named after one of its raw spellings
+CREATE TABLE IF NOT EXISTS dim_artist (
+    artist_key  INTEGER PRIMARY KEY,
+    artist_name TEXT NOT NULL UNIQUE
+);
+
+-- Genre dimension: one row per distinct genre label from the audio features
+CREATE TABLE IF NOT EXISTS dim_genre (
+    genre_key  INTEGER PRIMARY KEY,
+    genre_name TEXT NOT NULL UNIQUE
+);
+
+-- Region dimension: chart regions with their map coordinates resolved once
+CREATE TABLE IF NOT EXISTS dim_region (
+    region_key  INTEGER PRIMARY KEY,
+    region_name TEXT NOT NULL UNIQUE,
+    latitude    REAL,
+    longitude   REAL
+);
+
+-- Track dimension: a track is identified by its normalized title and primary artist (track_key_map)
+CREATE TABLE IF NOT EXISTS dim_track (
+    track_key  INTEGER PRIMARY KEY,
+    track_name TEXT NOT NULL,
+    artist_key INTEGER NOT NULL REFERENCES dim_artist (artist_key),
+    language   TEXT,                     -- Detected language of the title (from lang_detect)
+    UNIQUE (track_name, artist_key)
+);
+
+-- Bridge between tracks and genres (a track can carry several genre labels in the source data)
+CREATE TABLE IF NOT EXISTS track_genre (
+    track_key INTEGER NOT NULL REFERENCES dim_track (track_key),
+    genre_key INTEGER NOT NULL REFERENCES dim_genre (genre_key),
+    PRIMARY KEY (track_key, genre_key)
+) WITHOUT ROWID;
+
+-- Mood-related audio features per track, averaged over duplicate source rows
+CREATE TABLE IF NOT EXISTS track_audio_features (
+    track_key        INTEGER PRIMARY KEY REFERENCES dim_track (track_key),
+    valence          REAL,
+    energy           REAL,
+    danceability     REAL,
+    tempo            REAL,
+    acousticness     REAL,
+    instrumentalness REAL,
+    liveness         REAL,
+    speechiness      REAL
+);
+
+-- Fact table: one row per chart entry, referencing the dimensions by integer key
+CREATE TABLE IF NOT EXISTS fact_chart_entry (
+    entry_id   INTEGER PRIMARY KEY,
+    date       TEXT NOT NULL,
+    year       INTEGER NOT NULL,
+    track_key  INTEGER NOT NULL REFERENCES dim_track (track_key),
+    region_key INTEGER NOT NULL REFERENCES dim_region (region_key),
+    chart      TEXT,
+    trend      TEXT,
+    streams    INTEGER,
+    position   INTEGER
+);
+
+-- Populate the dimensions from every source that mentions an artist, region, genre or track
+-- (track_key_map already holds every title/artist spelling found in charts, audio_features and lang_detect)
+INSERT OR IGNORE INTO dim_artist (artist_key, artist_name)
+SELECT artist_key, MIN(artist_name)
+FROM track_key_map
+GROUP BY artist_key;
+
+INSERT OR IGNORE INTO dim_genre (genre_name)
+SELECT DISTINCT track_genre FROM audio_features WHERE track_genre IS NOT NULL;
+
+INSERT OR IGNORE INTO dim_region (region_name, latitude, longitude)
+SELECT r.region, cu.latitude, cu.longitude
+FROM (SELECT DISTINCT region FROM charts WHERE region IS NOT NULL) r
+LEFT JOIN country_utils cu
+    -- Normalize country names (trim + lowercase) to ensure matching despite case or extra spaces
+    ON LOWER(TRIM(r.region)) = LOWER(TRIM(cu.country_name));
+
+INSERT OR IGNORE INTO dim_track (track_key, track_name, artist_key)
+SELECT track_key, MIN(track_name), MIN(artist_key)
+FROM track_key_map
+GROUP BY track_key;
+
+-- Attach the detected language to each track (one value per track)
+UPDATE dim_track
+SET language = l.language
+FROM (
+    SELECT k.track_key, MIN(ld.language) AS language
+    FROM lang_detect ld
+    JOIN track_key_map k ON k.track_name = ld.name AND k.artist_name = ld.artist_name
+    WHERE ld.language IS NOT NULL
+    GROUP BY k.track_key
+) l
+WHERE dim_track.track_key = l.track_key;
+
+INSERT OR IGNORE INTO track_genre (track_key, genre_key)
+SELECT DISTINCT k.track_key, g.genre_key
+FROM audio_features af
+JOIN track_key_map k ON k.track_name = af.track_name AND k.artist_name = af.artist_name
+JOIN dim_genre g     ON g.genre_name = af.track_genre;
+
+INSERT OR REPLACE INTO track_audio_features
+SELECT
+    k.track_key,
+    AVG(af.valence), AVG(af.energy), AVG(af.danceability), AVG(af.tempo),
+    AVG(af.acousticness), AVG(af.instrumentalness), AVG(af.liveness), AVG(af.speechiness)
+FROM audio_features af
+JOIN track_key_map k ON k.track_name = af.track_name AND k.artist_name = af.artist_name
+GROUP BY k.track_key;
+
+-- Resolve every chart entry to its integer keys (the only text-keyed join, done once at build time
+-- through the track_key_map primary key)
+INSERT INTO fact_chart_entry (date, year, track_key, region_key, chart, trend, streams, position)
+SELECT
+    c.date,
+    CAST(strftime('%Y', c.date) AS INTEGER),
+    k.track_key,
+    r.region_key,
+    c.chart,
+    c.trend,
+    c.streams,
+    c.position
+FROM charts c
+JOIN track_key_map k ON k.track_name = c.track_name AND k.artist_name = c.artist_name
+JOIN dim_region r    ON r.region_name = c.region;
+
+-- Covering indexes, created after the data is loaded
+-- top_genres_by_year scans (year, track_key) and probes the track_genre primary key
+CREATE INDEX IF NOT EXISTS idx_fact_year_track ON fact_chart_entry (year, track_key);
+-- languages, artist_origin_map and top_moods_by_country group by region and year
+CREATE INDEX IF NOT EXISTS idx_fact_region_year_track ON fact_chart_entry (region_key, year, track_key);
@@ -0,0 +1,161 @@
+import os
+import sys
+import threading
+import time
+from functools import wraps
+from contextlib import nullcontext
+import pandas as pd
+import streamlit as st
+
+# Add the project root to the system path to allow importing from the utils folder
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from utils.metrics_utils import open_span, close_span, current_span, span
+
+# Profiling is opt-in: open the dashboard with ?profile=1, or start it with DASHBOARD_PROFILE=1
+PROFILE_ENV = "DASHBOARD_PROFILE"
+
+# When set, every profiled rerun is also appended to this JSON-lines file, in the same format as the
+# pipeline metrics (summarize it with: python utils/metrics_utils.py data/dashboard_metrics.jsonl)
+PROFILE_PATH = os.environ.get("DASHBOARD_PROFILE_PATH", "")
+
+# The rerun being profiled by the current script thread (each Streamlit session reruns in its own thread)
+_local = threading.local()
+
+# True when this rerun should be profiled
+def profiling_enabled():
+    if os.environ.get(PROFILE_ENV, "") not in ("", "0"):
+        return True
+    try:
+        return st.query_params.get("profile", "") not in ("", "0")
+    except Exception:
+        return False
+
+# The open rerun span of this thread, or None when the rerun isn't being profiled
+def current_rerun():
+    root = getattr(_local, "rerun", None)
+    return root if root is not None and root.record is None else None
+
+# Starts profiling a rerun; call at the top of the app script, before any chart is drawn
+def begin_rerun():
+    stale = current_rerun()
+    if stale is not None:
+        close_span(stale)
+    _local.rerun = open_span("dashboard_rerun", metrics_path=PROFILE_PATH) if profiling_enabled() else None
+    return _local.rerun
+
+# Rows and in-memory size of a loader result
+def payload_size(obj):
+    if isinstance(obj, pd.DataFrame):
+        return len(obj), int(obj.memory_usage(deep=True).sum())
+    if isinstance(obj, tuple):
+        sizes = [payload_size(item) for item in obj]
+        return sum(r for r, _ in sizes), sum(b for _, b in sizes)
+    return 0, sys.getsizeof(obj)
+
+# Drop-in replacement for @st.cache_data that reports every call of the loader while profiling:
+# its time, whether it was served from the cache, and the rows and bytes it returned.
+# The loader body only runs on a cache miss, so it marks the call as a miss itself.
+def profiled_cache_data(func):
+    def compute(*args, **kwargs):
+        if current_rerun() is not None:
+            current_span().attrs["cache"] = "miss"
+        return func(*args, **kwargs)
+
+    cached = st.cache_data(wraps(func)(compute))
+
+    @wraps(func)
+    def call(*args, **kwargs):
+        if current_rerun() is None:
+            return cached(*args, **kwargs)
+        with span(func.__name__) as s:
+            s.attrs.update(kind="loader", cache="hit")
+            result = cached(*args, **kwargs)
+            rows, nbytes = payload_size(result)
+            s.rows_out = rows
+            s.bytes_read = nbytes
+        return result
+
+    call.clear = cached.clear
+    return call
+
+# Times a whole plot_* function while profiling; the steps inside it become its children
+def profiled_chart(func):
+    @wraps(func)
+    def draw(*args, **kwargs):
+        if current_rerun() is None:
+            return func(*args, **kwargs)
+        with span(func.__name__.removeprefix("plot_")) as s:
+            s.attrs["kind"] = "chart"
+            return func(*args, **kwargs)
+    return draw
+
+# Times one step of a chart ("load", "transform") while profiling
+def profile_step(name):
+    return span(name) if current_rerun() is not None else nullcontext()
+
+# Draws an Altair chart. While profiling, the spec is first built and serialized on its own
+# ("spec", which is where Altair validates the chart and inlines its data, so its size estimates
+# the payload sent to the browser), then handed to Streamlit ("render").
+def render_chart(chart, **kwargs):
+    if current_rerun() is None:
+        st.altair_chart(chart, **kwargs)
+        return
+    with span("spec") as s:
+        s.bytes_written = len(chart.to_json().encode("utf-8"))
+    with span("render"):
+        st.altair_chart(chart, **kwargs)
+
+# Flattens the finished rerun into one row per chart and one row per loader call
+def profile_tables(root):
+    charts, loaders = [], []
+
+    def visit(s, chart):
+        for child in s.children:
+            kind = child.attrs.get("kind")
+            if kind == "chart":
+                row = {"chart": child.name, "total ms": child.record["wall_seconds"] * 1000}
+                for step in ("load", "transform", "spec", "render"):
+                    row[f"{step} ms"] = sum(c.record["wall_seconds"] for c in child.children if c.name == step) * 1000
+                row["data KB"] = child.record["bytes_read"] / 1024
+                row["payload KB"] = child.record["bytes_written"] / 1024
+                charts.append(row)
+                visit(child, child.name)
+            elif kind == "loader":
+                loaders.append({
+                    "loader": child.name,
+                    "chart": chart or "",
+                    "cache": child.attrs["cache"],
+                    "ms": child.record["wall_seconds"] * 1000,
+                    "rows": child.record["rows_out"],
+                    "KB": child.record["bytes_read"] / 1024,
+                })
+            else:
+                visit(child, chart)
+
+    visit(root, None)
+    return pd.DataFrame(charts), pd.DataFrame(loaders)
+
+# Finishes the profiled rerun and shows its numbers in a collapsible panel; call at the end of the app script
+def show_profile_panel():
+    root = current_rerun()
+    if root is None:
+        return
+    record = close_span(root)
+    charts, loaders = profile_tables(root)
+
+    with st.expander(f"Render profile: {record['wall_seconds'] * 1000:.0f} ms", expanded=False):
+        hits = int((loaders["cache"] == "hit").sum()) if not loaders.empty else 0
+        st.markdown(f"Rerun at {time.strftime('%H:%M:%S')} · {len(charts)} charts · "
+                    f"{hits} of {len(loaders)} loader calls served from the cache")
+        if not charts.empty:
+            st.markdown("**Charts** (spec = Altair spec build and serialization, payload = serialized spec size)")
+            st.dataframe(charts.sort_values("total ms", ascending=False), hide_index=True,
+                         column_config={c: st.column_config.NumberColumn(format="%.1f")
+                                        for c in charts.columns if c != "chart"})
+        if not loaders.empty:
+            st.markdown("**Cached loaders**")
+            st.dataframe(loaders, hide_index=True,
+                         column_config={"ms": st.column_config.NumberColumn(format="%.1f"),
+                                        "KB": st.column_config.NumberColumn(format="%.1f")})
+        if PROFILE_PATH:
+            st.caption(f"Appended to {PROFILE_PATH}")
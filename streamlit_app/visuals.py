@@ -1,64 +1,287 @@
 import os
+import sys
+import queue
 import pandas as pd
+import numpy as np
 import streamlit as st
 import altair as alt
 import sqlite3
+from collections import namedtuple
+from contextlib import contextmanager
+from urllib.request import pathname2url
+import joblib
+
+# Add the project root to the system path to allow importing from the utils folder
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from utils.model_utils import MODEL_PATH, GENRE_CLUSTERS_PATH, MoodClusterPredictor, build_cluster_genre_index
+from utils.similarity_utils import INDEX_DIR as SIMILARITY_INDEX_DIR, META_FILE, SimilarityIndex
+from utils.schema_utils import compact_frame
+from utils.rolling_utils import ROLLING_WINDOWS, rolling_popularity
+from streamlit_app.profiler import profiled_cache_data, profiled_chart, profile_step, render_chart
+
+DATA_DIR = os.path.join("data")
+DB_PATH = os.path.join(DATA_DIR, "music.db")
+
+# Number of read-only connections shared by all dashboard sessions
+DB_POOL_SIZE = 8
+
+# Mood-related audio features shown per genre
+MOOD_FEATURES = [
+    "valence", "energy", "danceability", "tempo", "acousticness",
+    "instrumentalness", "liveness", "speechiness"
+]
+
+# Dimensions of the rolling popularity chart: daily streams aggregate, its entity key, and the join and
+# column that name the entity
+ROLLING_DIMENSIONS = {
+    "genre": ("mv_daily_genre_streams", "m.genre_key", "JOIN dim_genre e ON e.genre_key = s.entity_key", "e.genre_name"),
+    "artist": ("mv_daily_artist_streams", "m.artist_key", "JOIN dim_artist e ON e.artist_key = s.entity_key", "e.artist_name"),
+    "language": ("mv_daily_language_streams", "m.language", "", "s.entity_key"),
+}
+
+# The dashboard-wide filter selection: an inclusive year range and the selected region names
+# (an empty tuple means every region). It is hashable, so it can key the cached loaders.
+ChartFilters = namedtuple("ChartFilters", ["start_year", "end_year", "regions"])
 
 # Establishes a connection to the SQLite database used across the app.
 # This is useful for reading views or tables directly into pandas DataFrames.
 def connect_db():
-    return sqlite3.connect("data/music.db")
+    return sqlite3.connect(DB_PATH)
 
-DATA_DIR = os.path.join("data")
+# Switches the database to write-ahead logging if it isn't already
+# WAL is stored in the database file, so this only writes once; afterwards readers never block
+# an ingest job that is writing, and the writer never blocks readers
+def enable_wal(db_path=DB_PATH):
+    conn = sqlite3.connect(db_path)
+    try:
+        if conn.execute("PRAGMA journal_mode").fetchone()[0].lower() != "wal":
+            conn.execute("PRAGMA journal_mode = WAL")
+    except sqlite3.OperationalError:
+        # Another process holds a write lock; readers still work in the current journal mode
+        pass
+    finally:
+        conn.close()
 
-# Reads a CSV file containing aggregated genre popularity by year.
-# The CSV is generated from SQL queries or offline processing to optimize speed.
-# Caching ensures Streamlit doesn’t reload this on every interaction, saving performance.
+# A fixed set of read-only SQLite connections handed out to one query at a time
+# Connections are opened once and reused, so a chart rerun costs a query, not a connect
+class ReadOnlyConnectionPool:
+    def __init__(self, db_path=DB_PATH, size=DB_POOL_SIZE):
+        self.db_path = db_path
+        enable_wal(db_path)
+        self.connections = queue.Queue()
+        for _ in range(size):
+            self.connections.put(self._open())
+
+    # Opens the database in read-only mode; query_only also rejects writes through ATTACH or pragmas
+    def _open(self):
+        uri = f"file:{pathname2url(os.path.abspath(self.db_path))}?mode=ro"
+        conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        conn.execute("PRAGMA query_only = ON")
+        return conn
+
+    # Borrows a connection for the duration of the block (waits if all are in use)
+    @contextmanager
+    def connection(self):
+        conn = self.connections.get()
+        try:
+            yield conn
+        finally:
+            self.connections.put(conn)
+
+# One pool per server process, shared by every Streamlit session
+@st.cache_resource
+def get_db_pool():
+    return ReadOnlyConnectionPool()
+
+# Tables the dashboard queries that only scripts/populate_db.py creates
+# (other scripts, e.g. lang_detect.py, also write to music.db, so the file alone doesn't mean it has been built)
+REQUIRED_TABLES = ("fact_chart_entry", "mv_refresh_state")
+
+# Whether the database file has every required table, checked once per version of the file
+# (its modification times, including the write-ahead log's, key the cache)
 @st.cache_data
-def load_genre_trends():
-    path = os.path.join(DATA_DIR, "genre_trends.csv")
-    return pd.read_csv(path)
+def has_required_tables(db_path=DB_PATH, file_version=None):
+    uri = f"file:{pathname2url(os.path.abspath(db_path))}?mode=ro"
+    try:
+        conn = sqlite3.connect(uri, uri=True)
+        try:
+            placeholders = ", ".join("?" for _ in REQUIRED_TABLES)
+            found = conn.execute(f"SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name IN ({placeholders})",
+                                 REQUIRED_TABLES).fetchone()[0]
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        return False
+    return found == len(REQUIRED_TABLES)
+
+# True once scripts/populate_db.py has built the database
+# Until then the loaders below fall back to the CSV exports in data/
+def database_available():
+    if not os.path.exists(DB_PATH):
+        return False
+    wal_path = DB_PATH + "-wal"
+    file_version = (os.stat(DB_PATH).st_mtime_ns, os.stat(wal_path).st_mtime_ns if os.path.exists(wal_path) else None)
+    return has_required_tables(DB_PATH, file_version)
+
+# Runs a parameterized SQL query against music.db and returns the result as a DataFrame
+# Values are always passed as params (never formatted into the SQL string)
+# Repeated names (regions, genres, languages) come back as categoricals, so cached results stay small;
+# numbers keep full precision for tooltips
+def run_query(sql, params=()):
+    with get_db_pool().connection() as conn:
+        return compact_frame(pd.read_sql_query(sql, conn, params=params), downcast=False)
+
+# Returns a value that changes whenever the materialized aggregates are refreshed
+# Cached loaders take it as an argument, so they reload after an ingest instead of serving
+# whatever was cached when the app started
+def get_data_version():
+    if not database_available():
+        return None
+    with get_db_pool().connection() as conn:
+        return conn.execute("SELECT MAX(refreshed_at) FROM mv_refresh_state").fetchone()[0]
+
+# Builds the SQL condition and parameters that restrict a materialized aggregate (aliased `alias`)
+# to the selected years and regions. The aggregates are keyed by (year, region_key), so SQLite
+# seeks straight to the selected partitions instead of scanning the whole table.
+def filter_clause(filters, alias="m"):
+    if filters is None:
+        return "1 = 1", []
+
+    clause = f"{alias}.year BETWEEN ? AND ?"
+    params = [filters.start_year, filters.end_year]
+    if filters.regions:
+        placeholders = ", ".join("?" for _ in filters.regions)
+        clause += (f" AND {alias}.region_key IN "
+                   f"(SELECT region_key FROM dim_region WHERE region_name IN ({placeholders}))")
+        params += list(filters.regions)
+    return clause, params
+
+# Reads the chart years and region names available for filtering
+@profiled_cache_data
+def get_filter_options(data_version=None):
+    years = run_query("SELECT MIN(year) AS first_year, MAX(year) AS last_year FROM mv_genre_counts")
+    regions = run_query("SELECT region_name FROM dim_region ORDER BY region_name")
+    first_year, last_year = years.iloc[0]
+    return first_year, last_year, regions["region_name"].tolist()
+
+# Draws the global year-range and region filters in the sidebar and returns the selection.
+# Every plot_* function accepts the result, so one selection slices the whole dashboard.
+# Returns None (no filtering) when music.db hasn't been built, since the CSV exports are pre-aggregated.
+def sidebar_filters():
+    st.sidebar.header("Filters")
+    if not database_available():
+        st.sidebar.info("Build data/music.db with scripts/populate_db.py to filter charts by year and region.")
+        return None
+
+    first_year, last_year, regions = get_filter_options(get_data_version())
+    if pd.isna(first_year):
+        st.sidebar.info("The database has no chart entries yet.")
+        return None
+    first_year, last_year = int(first_year), int(last_year)
+
+    if first_year < last_year:
+        start_year, end_year = st.sidebar.slider("Chart years", first_year, last_year, (first_year, last_year))
+    else:
+        start_year, end_year = first_year, last_year
+
+    selected = st.sidebar.multiselect("Regions", regions, placeholder="All regions")
+    return ChartFilters(start_year, end_year, tuple(selected))
+
+# Reads yearly chart counts for the top genres within the selected years and regions.
+# The top genres are ranked in SQL over the same slice, so only their rows are returned.
+# Falls back to the CSV generated by offline processing when the database hasn't been built
+# (that file counts catalogue tracks per release year rather than chart entries per chart year).
+# Caching ensures Streamlit doesn’t reload this on every interaction, saving performance.
+@profiled_cache_data
+def load_genre_trends(data_version=None, filters=None, top_n=10):
+    if not database_available():
+        df = pd.read_csv(os.path.join(DATA_DIR, "genre_trends.csv"))
+        top_genres = df.groupby("track_genre")["track_count"].sum().nlargest(top_n).index
+        return df[df["track_genre"].isin(top_genres)]
+
+    clause, params = filter_clause(filters)
+    return run_query(f"""
+        WITH slice AS (
+            SELECT m.year, m.genre_key, SUM(m.track_count) AS track_count
+            FROM mv_genre_counts m
+            WHERE {clause}
+            GROUP BY m.year, m.genre_key
+        ),
+        top_genres AS (
+            SELECT genre_key
+            FROM slice
+            GROUP BY genre_key
+            ORDER BY SUM(track_count) DESC
+            LIMIT ?
+        )
+        SELECT s.year, g.genre_name AS track_genre, s.track_count
+        FROM slice s
+        JOIN top_genres t ON t.genre_key = s.genre_key
+        JOIN dim_genre g  ON g.genre_key = s.genre_key
+        ORDER BY s.year, track_genre
+    """, params + [top_n])
 
 # Visualizes the popularity trends of the top 10 music genres over time.
-# The top 10 are determined based on their total appearance count across all years.
+# The top 10 are determined based on their total appearance count across the selected years.
 # It uses a line chart to help users visually compare rise and fall of genres annually.
-def plot_genre_over_time():
+# The database counts chart entries per chart year; the CSV fallback counts catalogue tracks per
+# release year, so the axes are labelled with whichever of the two is shown.
+@profiled_chart
+def plot_genre_over_time(filters=None):
     try:
-        df = load_genre_trends()
-        top_genres = df.groupby("track_genre")["track_count"].sum().nlargest(10).index
-        df = df[df["track_genre"].isin(top_genres)]
+        with profile_step("load"):
+            df = load_genre_trends(get_data_version(), filters)
+
+        if database_available():
+            x_title, y_title = "Chart year", "Chart entries"
+        else:
+            x_title, y_title = "Release year", "Tracks released"
+            st.caption("Chart data unavailable: showing catalogue tracks per release year (genre_trends.csv).")
 
         chart = alt.Chart(df).mark_line(point=True).encode(
-            x="year:O",  # Ordinal year value on x-axis
-            y="track_count:Q",  # Quantitative count of songs
+            x=alt.X("year:O", title=x_title),  # Ordinal year value on x-axis
+            y=alt.Y("track_count:Q", title=y_title),  # Quantitative count of songs
             color="track_genre:N",  # Color-coded by genre
             tooltip=["year", "track_genre", "track_count"]
         ).properties(
-            title="Top 10 Genres Over Time (Based on Release Dates)",
+            title="Top 10 Genres Over Time",
             width=700,
             height=400
         )
-        st.altair_chart(chart)
+        render_chart(chart)
     except Exception as e:
         st.error(f"Error loading genre trends: {e}")
 
-# Loads a CSV that contains average values of audio mood features per genre.
+# Loads average values of audio mood features per genre.
 # These features include emotional and structural qualities like energy and tempo.
-@st.cache_data
-def load_mood_by_genre():
-    path = os.path.join(DATA_DIR, "mood_by_genre.csv")
-    return pd.read_csv(path)
+# From the database, averages are taken over the chart entries in the selected years and regions
+# (exact, because the aggregate stores sums); otherwise the catalogue-wide CSV is used.
+@profiled_cache_data
+def load_mood_by_genre(data_version=None, filters=None):
+    if not database_available():
+        return pd.read_csv(os.path.join(DATA_DIR, "mood_by_genre.csv"))
+
+    clause, params = filter_clause(filters)
+    averages = ",\n".join(f"SUM(m.sum_{f}) / SUM(m.entry_count) AS {f}" for f in MOOD_FEATURES)
+    return run_query(f"""
+        SELECT g.genre_name AS track_genre,
+        {averages}
+        FROM mv_genre_moods m
+        JOIN dim_genre g ON g.genre_key = m.genre_key
+        WHERE {clause}
+        GROUP BY m.genre_key
+        ORDER BY track_genre
+    """, params)
 
 # Lets users select a mood-related audio feature and displays a horizontal bar chart
 # comparing the average value of that feature across different music genres.
 # This helps illustrate which genres tend to be more energetic, acoustic, etc.
-def plot_mood_heatmap():
+@profiled_chart
+def plot_mood_heatmap(filters=None):
     try:
-        df = load_mood_by_genre()
-        metric = st.selectbox("Select Mood Metric", [
-            "valence", "energy", "danceability", "tempo", "acousticness",
-            "instrumentalness", "liveness", "speechiness"
-        ])
+        with profile_step("load"):
+            df = load_mood_by_genre(get_data_version(), filters)
+        metric = st.selectbox("Select Mood Metric", MOOD_FEATURES)
 
         chart = alt.Chart(df).mark_bar().encode(
             x=alt.X("track_genre:N", sort="-y"),
@@ -69,23 +292,34 @@ def plot_mood_heatmap():
             width=800,
             height=400
         )
-        st.altair_chart(chart)
+        render_chart(chart)
     except Exception as e:
         st.error(f"Error loading mood data: {e}")
 
-# Reads a language detection file where each track has an associated language code.
-# Groups the tracks by language to compute the frequency distribution.
-@st.cache_data
-def get_language_distribution():
-    path = os.path.join(DATA_DIR, "lang_detect.csv")
-    df = pd.read_csv(path)
-    return df.groupby("language").size().reset_index(name="count").sort_values("count", ascending=False)
+# Counts charted tracks per detected language within the selected years and regions.
+# Without the database, groups the language detection file by language instead.
+@profiled_cache_data
+def get_language_distribution(data_version=None, filters=None):
+    if not database_available():
+        df = pd.read_csv(os.path.join(DATA_DIR, "lang_detect.csv"))
+        return df.groupby("language").size().reset_index(name="count").sort_values("count", ascending=False)
+
+    clause, params = filter_clause(filters)
+    return run_query(f"""
+        SELECT m.language, SUM(m.track_count) AS count
+        FROM mv_language_counts m
+        WHERE {clause}
+        GROUP BY m.language
+        ORDER BY count DESC
+    """, params)
 
 # Visualizes the most common detected languages in the music dataset.
 # Shows a bar chart of the top 15 languages and their corresponding track counts.
-def plot_language_distribution():
+@profiled_chart
+def plot_language_distribution(filters=None):
     try:
-        df = get_language_distribution()
+        with profile_step("load"):
+            df = get_language_distribution(get_data_version(), filters)
         chart = alt.Chart(df.head(15)).mark_bar().encode(
             x=alt.X("language:N", sort="-y"),
             y="count:Q",
@@ -95,23 +329,39 @@ def plot_language_distribution():
             width=700,
             height=400
         )
-        st.altair_chart(chart)
+        render_chart(chart)
     except Exception as e:
         st.error(f"Error loading language data: {e}")
 
-# Loads a precomputed CSV that maps countries to artist counts and coordinates.
+# Loads unique artist counts and coordinates per country within the selected years and regions.
 # The coordinates are used for both plotting and geographic clustering.
-@st.cache_data
-def get_artist_origin_data():
-    path = os.path.join(DATA_DIR, "artist_counts_by_country.csv")
-    return pd.read_csv(path)
+@profiled_cache_data
+def get_artist_origin_data(data_version=None, filters=None):
+    if not database_available():
+        return pd.read_csv(os.path.join(DATA_DIR, "artist_counts_by_country.csv"))
+
+    clause, params = filter_clause(filters)
+    return run_query(f"""
+        SELECT r.region_name AS country,
+               COUNT(DISTINCT m.artist_key) AS artist_count,
+               r.latitude,
+               r.longitude
+        FROM mv_region_artists m
+        JOIN dim_region r ON r.region_key = m.region_key
+        WHERE {clause}
+          AND r.latitude IS NOT NULL AND r.longitude IS NOT NULL
+        GROUP BY m.region_key
+    """, params)
 
 # Displays artist origin data using both a geographic map and a bubble chart.
 # This allows users to visually identify regions that produce a high volume of unique artists.
-def plot_artist_map():
+@profiled_chart
+def plot_artist_map(filters=None):
     try:
-        df = get_artist_origin_data()
-        st.map(df[["latitude", "longitude"]])  # Basic map overlay
+        with profile_step("load"):
+            df = get_artist_origin_data(get_data_version(), filters)
+        with profile_step("render"):
+            st.map(df[["latitude", "longitude"]])  # Basic map overlay
 
         chart = alt.Chart(df).mark_circle(opacity=0.7).encode(
             longitude="longitude:Q",
@@ -124,16 +374,18 @@ def plot_artist_map():
             height=400
         )
 
-        st.altair_chart(chart)
+        render_chart(chart)
     except Exception as e:
         st.error(f"Error loading artist origin map: {e}")
 
 # Plots a scatterplot to examine how upbeat and danceable different genres are.
 # Valence and danceability are both continuous audio features ranging from 0 to 1.
 # This helps explain how genres differ in mood and physical engagement.
-def plot_valence_vs_danceability():
+@profiled_chart
+def plot_valence_vs_danceability(filters=None):
     try:
-        df = load_mood_by_genre()
+        with profile_step("load"):
+            df = load_mood_by_genre(get_data_version(), filters)
 
         chart = alt.Chart(df).mark_circle(size=100, opacity=0.6).encode(
             x=alt.X("valence:Q", title="Valence (positivity)"),
@@ -145,7 +397,7 @@ def plot_valence_vs_danceability():
             width=700,
             height=400
         )
-        st.altair_chart(chart)
+        render_chart(chart)
         st.markdown("*Genres in the upper-right are both happy and easy to dance to.*")
     except Exception as e:
         st.error(f"Error loading scatterplot: {e}")
@@ -161,10 +413,13 @@ LANGUAGE_MAP = {
 
 # Enhanced language distribution chart that shows full language names in tooltips.
 # Useful for users unfamiliar with language codes.
-def plot_language_distribution_expanded():
+@profiled_chart
+def plot_language_distribution_expanded(filters=None):
     try:
-        df = get_language_distribution()
-        df["language_full"] = df["language"].apply(lambda x: LANGUAGE_MAP.get(x, x))
+        with profile_step("load"):
+            df = get_language_distribution(get_data_version(), filters)
+        with profile_step("transform"):
+            df["language_full"] = df["language"].apply(lambda x: LANGUAGE_MAP.get(x, x))
 
         chart = alt.Chart(df.head(15)).mark_bar().encode(
             x=alt.X("language:N", sort="-y", title="Language Code"),
@@ -175,17 +430,20 @@ def plot_language_distribution_expanded():
             width=700,
             height=400
         )
-        st.altair_chart(chart)
+        render_chart(chart)
         st.markdown("*Hover over each bar to see the full language name.*")
     except Exception as e:
         st.error(f"Error loading language bar chart: {e}")
 
 # Uses artist origin data to plot a bar chart of the top 15 countries by unique artist count.
 # Helpful for understanding which countries contribute the most to global music trends.
-def plot_top_artist_countries():
+@profiled_chart
+def plot_top_artist_countries(filters=None):
     try:
-        df = get_artist_origin_data()
-        df_sorted = df.sort_values("artist_count", ascending=False).head(15)
+        with profile_step("load"):
+            df = get_artist_origin_data(get_data_version(), filters)
+        with profile_step("transform"):
+            df_sorted = df.sort_values("artist_count", ascending=False).head(15)
 
         chart = alt.Chart(df_sorted).mark_bar().encode(
             x=alt.X("country:N", sort="-y"),
@@ -196,22 +454,36 @@ def plot_top_artist_countries():
             width=700,
             height=400
         )
-        st.altair_chart(chart)
+        render_chart(chart)
         st.markdown("*Which countries are launching the most artists onto the global charts?*")
     except Exception as e:
         st.error(f"Error loading country artist chart: {e}")
 
 # Loads a pre-labeled genre cluster file.
 # Each row maps a genre to a mood-based cluster determined by unsupervised learning (e.g. KMeans).
-@st.cache_data
-def load_genre_clusters():
-    return pd.read_csv("data/genre_clusters.csv")
+# With filters, only genres that charted in the selected years and regions are kept.
+@profiled_cache_data
+def load_genre_clusters(data_version=None, filters=None):
+    df = pd.read_csv(GENRE_CLUSTERS_PATH)
+    if filters is None or not database_available():
+        return df
+
+    clause, params = filter_clause(filters)
+    charted = run_query(f"""
+        SELECT DISTINCT g.genre_name
+        FROM mv_genre_counts m
+        JOIN dim_genre g ON g.genre_key = m.genre_key
+        WHERE {clause}
+    """, params)
+    return df[df["track_genre"].isin(charted["genre_name"])]
 
 # Visualizes mood-based clusters of genres using a scatterplot.
 # The chart shows how genres group based on similarity in valence and danceability.
-def plot_genre_clusters():
+@profiled_chart
+def plot_genre_clusters(filters=None):
     try:
-        df = load_genre_clusters()
+        with profile_step("load"):
+            df = load_genre_clusters(get_data_version(), filters)
 
         chart = alt.Chart(df).mark_circle(size=100, opacity=0.6).encode(
             x="valence:Q",
@@ -223,23 +495,49 @@ def plot_genre_clusters():
             width=700,
             height=400
         )
-        st.altair_chart(chart, use_container_width=True)
+        render_chart(chart, use_container_width=True)
         st.markdown("*Each genre is plotted individually. Clusters group them by mood similarity.*")
     except Exception as e:
         st.error(f"Error loading genre clusters: {e}")
 
-# Loads a file containing entropy scores by region.
+# Computes Shannon entropy of the language mix per region from charted-track counts
+# (same definition as scripts/generate_language_entropy.py, but from pre-aggregated counts)
+def language_entropy_from_counts(counts):
+    counts = counts[counts["track_count"] > 0]
+    totals = counts.groupby("region", observed=True)["track_count"].transform("sum")
+    p = counts["track_count"] / totals
+    entropy = (-p * np.log2(p)).groupby(counts["region"], observed=True).sum()
+
+    return pd.DataFrame({
+        "entropy_score": entropy,
+        "total_tracks": counts.groupby("region", observed=True)["track_count"].sum(),
+        "unique_languages": counts.groupby("region", observed=True)["language"].nunique()
+    }).reset_index().sort_values("entropy_score", ascending=False)
+
+# Loads entropy scores by region for the selected years and regions.
 # Entropy here is a measure of linguistic diversity: higher means more balanced variety of languages.
-@st.cache_data
-def load_language_entropy():
-    path = os.path.join(DATA_DIR, "language_entropy.csv")
-    return pd.read_csv(path)
+@profiled_cache_data
+def load_language_entropy(data_version=None, filters=None):
+    if not database_available():
+        return pd.read_csv(os.path.join(DATA_DIR, "language_entropy.csv"))
+
+    clause, params = filter_clause(filters)
+    counts = run_query(f"""
+        SELECT r.region_name AS region, m.language, SUM(m.track_count) AS track_count
+        FROM mv_language_counts m
+        JOIN dim_region r ON r.region_key = m.region_key
+        WHERE {clause}
+        GROUP BY m.region_key, m.language
+    """, params)
+    return language_entropy_from_counts(counts)
 
 # Plots a bar chart of the top regions with the most balanced language representation.
 # Tooltip includes supporting details like number of languages and tracks used.
-def plot_language_entropy():
+@profiled_chart
+def plot_language_entropy(filters=None):
     try:
-        df = load_language_entropy()
+        with profile_step("load"):
+            df = load_language_entropy(get_data_version(), filters)
         chart = alt.Chart(df.head(20)).mark_bar().encode(
             x=alt.X("region:N", sort="-y"),
             y="entropy_score:Q",
@@ -249,15 +547,156 @@ def plot_language_entropy():
             width=800,
             height=400
         )
-        st.altair_chart(chart)
+        render_chart(chart)
         st.markdown("*Entropy measures how balanced the language distribution is — higher means more equal representation of multiple languages.*")
     except Exception as e:
         st.error(f"Error loading language entropy chart: {e}")
 
-import joblib
+# Loads the rolling streams-weighted popularity of the top genres, artists or languages over the
+# selected years and regions: each entity's streams over the trailing `window` days as a share of all
+# streams in the selection over the same days. SQL only sums the daily aggregates across the selected
+# regions; the windows are then one cumulative sum per entity (utils/rolling_utils.py), evaluated on
+# every chart day. The year before the selection is read too, so windows at its start are complete.
+@profiled_cache_data
+def load_rolling_popularity(data_version=None, filters=None, dimension="genre", window=28, top_n=8, max_points=500):
+    table, key, join, label = ROLLING_DIMENSIONS[dimension]
+    history = None if filters is None else filters._replace(start_year=filters.start_year - 1)
+    start_date = "" if filters is None else f"{filters.start_year}-01-01"
+    clause, params = filter_clause(history)
+
+    totals = run_query(f"""
+        SELECT m.date, SUM(m.streams) AS streams
+        FROM mv_daily_region_streams m
+        WHERE {clause}
+        GROUP BY m.date
+    """, params)
+    daily = run_query(f"""
+        WITH slice AS (
+            SELECT m.date, {key} AS entity_key, SUM(m.streams) AS streams
+            FROM {table} m
+            WHERE {clause}
+            GROUP BY m.date, {key}
+        ),
+        top_entities AS (
+            SELECT entity_key
+            FROM slice
+            WHERE date >= ?
+            GROUP BY entity_key
+            ORDER BY SUM(streams) DESC
+            LIMIT ?
+        )
+        SELECT s.date, {label} AS entity, s.streams
+        FROM slice s
+        JOIN top_entities t ON t.entity_key = s.entity_key
+        {join}
+    """, params + [start_date, top_n])
+
+    # Each line is evaluated on at most max_points evenly spaced chart days (always including the last),
+    # which keeps the spec small; every point is still an exact window sum, not a resampled one
+    dates = totals.loc[totals["date"] >= start_date, "date"].sort_values().to_numpy()
+    step = max(1, -(-len(dates) // max_points))
+    dates = dates[::-1][::step][::-1]
+    df = rolling_popularity(daily, "entity", windows=(window,), group_totals=totals, dates=dates)
+    return df.rename(columns={f"streams_{window}d": "streams", f"share_{window}d": "share"})
+
+# Plots the rolling share of streams of the top genres, artists or languages as lines over time.
+# Short windows show weekly spikes such as releases; the 90-day window shows sustained popularity.
+@profiled_chart
+def plot_rolling_popularity(filters=None):
+    if not database_available():
+        st.info("Build data/music.db with scripts/populate_db.py to see rolling popularity "
+                "(scripts/generate_rolling_popularity.py writes it per region to data/rolling_popularity.parquet).")
+        return
+    try:
+        col1, col2 = st.columns(2)
+        dimension = col1.selectbox("Popularity of", list(ROLLING_DIMENSIONS), format_func=lambda d: f"{d.title()}s",
+                                   key="rolling_dimension")
+        window = col2.radio("Trailing window", ROLLING_WINDOWS, index=1, format_func=lambda w: f"{w} days",
+                            horizontal=True, key="rolling_window")
+        with profile_step("load"):
+            df = load_rolling_popularity(get_data_version(), filters, dimension, window)
+
+        chart = alt.Chart(df).mark_line().encode(
+            x=alt.X("date:T", title=None),
+            y=alt.Y("share:Q", title=f"Share of streams, trailing {window} days", axis=alt.Axis(format="%")),
+            color=alt.Color("entity:N", title=dimension.title()),
+            tooltip=["date:T", "entity:N", alt.Tooltip("share:Q", format=".1%"), alt.Tooltip("streams:Q", format=",.0f")]
+        ).properties(
+            title=f"Top {dimension.title()}s by Rolling {window}-Day Share of Streams",
+            height=400
+        )
+        render_chart(chart, use_container_width=True)
+    except Exception as e:
+        st.error(f"Error loading rolling popularity: {e}")
+
+# Identifies the current model and genre cluster files by modification time
+# Retraining or regenerating clusters changes it, so the cached predictor is rebuilt once
+def get_model_version():
+    return tuple(
+        os.stat(path).st_mtime_ns if os.path.exists(path) else None
+        for path in (MODEL_PATH, GENRE_CLUSTERS_PATH)
+    )
 
 # Loads a trained clustering model that predicts a genre group based on mood features.
 # The model is used in an interactive form within the Streamlit app.
 @st.cache_resource
-def load_mood_cluster_model():
-    return joblib.load("models/mood_cluster_classifier.pkl")
\ No newline at end of file
+def load_mood_cluster_model(model_version=None):
+    return joblib.load(MODEL_PATH)
+
+# Builds the predictor behind the dashboard form once per model version and shares it across sessions:
+# the model stays warm and the cluster → sorted genres index is computed up front,
+# so a submit never touches the disk
+@st.cache_resource
+def load_mood_predictor(model_version=None):
+    genres_by_cluster = build_cluster_genre_index(pd.read_csv(GENRE_CLUSTERS_PATH))
+    return MoodClusterPredictor(load_mood_cluster_model(model_version), genres_by_cluster)
+
+# Returns the cached predictor for the current model and cluster files
+# predict(valence=..., energy=..., ...) returns the cluster, its probability and its genres in one call
+def get_mood_predictor():
+    return load_mood_predictor(get_model_version())
+
+# Loads the "sounds like" index built by scripts/similar_tracks.py once per build, shared by all sessions
+# The KD-tree is memory-mapped, so loading is fast and the OS shares its pages between processes
+@st.cache_resource
+def load_similarity_index(index_version=None):
+    return SimilarityIndex.load(SIMILARITY_INDEX_DIR)
+
+# Lets users search for a track and lists the tracks and genres that sound most like it
+@profiled_chart
+def plot_similar_tracks():
+    try:
+        meta_path = os.path.join(SIMILARITY_INDEX_DIR, META_FILE)
+        if not os.path.exists(meta_path):
+            st.info("Build the similarity index first: python scripts/similar_tracks.py build")
+            return
+        with profile_step("load"):
+            index = load_similarity_index(os.stat(meta_path).st_mtime_ns)
+
+        query = st.text_input("Search for a track by title", placeholder="e.g. Blinding Lights")
+        if not query:
+            return
+
+        tracks = index.tracks
+        with profile_step("transform"):
+            matches = tracks[tracks["track_name"].str.contains(query, case=False, na=False, regex=False)].head(50)
+        if matches.empty:
+            st.warning("No indexed track matches that title.")
+            return
+
+        # Index metadata may hold categoricals (see compact_frame), so the label parts are joined as strings
+        labels = dict(zip(matches["track_id"],
+                          matches["track_name"].astype(str) + " — " + matches["artist_name"].astype(str)))
+        track_id = st.selectbox("Track", list(labels), format_func=labels.get)
+        k = st.slider("Number of similar tracks", 5, 50, 10)
+
+        with profile_step("transform"):
+            similar = index.similar_tracks(track_id, k=k)
+        st.dataframe(similar, hide_index=True)
+
+        genre = tracks.loc[index.row_by_id[track_id], "track_genre"]
+        if pd.notna(genre) and genre in index.genre_centroids.index:
+            st.markdown(f"Genres that sound most like **{genre}**:")
+            st.dataframe(index.similar_genres(genre, k=5), hide_index=True)
+    except Exception as e:
+        st.error(f"Error loading similar tracks: {e}")
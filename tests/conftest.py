@@ -0,0 +1,37 @@
+# tests/conftest.py
+
+import os
+import shutil
+import subprocess
+import sys
+import pytest
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(PROJECT_ROOT)
+from benchmarks.synthetic_data import generate
+
+# Chart rows in the synthetic test database: enough for several years and regions, quick to build
+TEST_CHART_ROWS = 5_000
+
+# Runs a project script with the workspace as its working directory (the scripts read and write data/ there)
+def run_script(workspace, script, *args):
+    return subprocess.run(
+        [sys.executable, os.path.join(PROJECT_ROOT, "scripts", script), *args],
+        cwd=workspace, capture_output=True, text=True
+    )
+
+# A workspace with synthetic data and a database built from it, created once per test session
+@pytest.fixture(scope="session")
+def built_workspace(tmp_path_factory):
+    workspace = str(tmp_path_factory.mktemp("built"))
+    generate(workspace, TEST_CHART_ROWS)
+    for script, args in [("clean_audio_features.py", []), ("populate_db.py", ["--bulk"])]:
+        result = run_script(workspace, script, *args)
+        assert result.returncode == 0, result.stdout + result.stderr
+    return workspace
+
+# A private copy of the built workspace, so a test can change its database freely
+@pytest.fixture
+def workspace(built_workspace, tmp_path):
+    shutil.copytree(os.path.join(built_workspace, "data"), tmp_path / "data")
+    return str(tmp_path)
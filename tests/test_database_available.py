@@ -0,0 +1,32 @@
+# tests/test_database_available.py
+
+import os
+import sys
+import sqlite3
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from streamlit_app import visuals
+
+def create_tables(path, tables):
+    conn = sqlite3.connect(path)
+    for table in tables:
+        conn.execute(f"CREATE TABLE {table} (id INTEGER)")
+    conn.commit()
+    conn.close()
+
+def test_missing_file_falls_back(tmp_path, monkeypatch):
+    monkeypatch.setattr(visuals, "DB_PATH", str(tmp_path / "music.db"))
+    assert not visuals.database_available()
+
+# lang_detect.py writes its table to music.db before populate_db.py has built the schema
+def test_lang_detect_only_database_falls_back(tmp_path, monkeypatch):
+    path = str(tmp_path / "music.db")
+    create_tables(path, ["lang_detect"])
+    monkeypatch.setattr(visuals, "DB_PATH", path)
+    assert not visuals.database_available()
+
+def test_built_database_is_used(tmp_path, monkeypatch):
+    path = str(tmp_path / "music.db")
+    create_tables(path, ["lang_detect", *visuals.REQUIRED_TABLES])
+    monkeypatch.setattr(visuals, "DB_PATH", path)
+    assert visuals.database_available()
@@ -0,0 +1,93 @@
+# tests/test_fetch_audio_features.py
+
+import json
+import os
+import subprocess
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+import pandas as pd
+import pytest
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SCRIPT = os.path.join(PROJECT_ROOT, "scripts", "fetch_audio_features.py")
+TOKEN = "stub-token"
+
+# A stand-in for the audio features endpoint: the first request is rate limited, the second fails
+# with a server error, and every later one returns features for the requested IDs
+class StubHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            number = len(server.requests)
+            ids = parse_qs(urlparse(self.path).query)["ids"][0].split(",")
+            server.requests.append({"ids": ids, "authorization": self.headers.get("Authorization")})
+
+        if number == 0:
+            self.respond(429, {"error": "rate limited"}, {"Retry-After": "0"})
+        elif number == 1:
+            self.respond(503, {"error": "unavailable"})
+        else:
+            self.respond(200, {"audio_features": [{"id": tid, "energy": 0.5} for tid in ids]})
+
+    def respond(self, status, body, headers=None):
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def stub_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.lock = threading.Lock()
+    server.requests = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+def run_fetcher(workspace, server, track_ids):
+    pd.DataFrame({"track_id": track_ids}).to_csv(os.path.join(workspace, "data", "tracks_2020.csv"), index=False)
+    return subprocess.run(
+        [sys.executable, SCRIPT, "--workers", "1", "--token", TOKEN,
+         "--base-url", f"http://127.0.0.1:{server.server_port}/v1/audio-features"],
+        cwd=workspace, capture_output=True, text=True, timeout=120
+    )
+
+def test_fetch_retries_and_resumes(tmp_path, stub_server):
+    os.makedirs(tmp_path / "data")
+    first_ids = [f"track{i:03d}" for i in range(150)]
+
+    result = run_fetcher(tmp_path, stub_server, first_ids)
+    assert result.returncode == 0, result.stdout + result.stderr
+
+    # Two batches, the first of which was sent three times (429, then 503, then 200)
+    requests = stub_server.requests
+    assert len(requests) == 4
+    assert requests[0]["ids"] == requests[1]["ids"] == requests[2]["ids"]
+    assert all(r["authorization"] == f"Bearer {TOKEN}" for r in requests)
+
+    with open(tmp_path / "data" / "audio_features.jsonl", encoding="utf-8") as f:
+        rows = [json.loads(line) for line in f]
+    assert sorted(row["id"] for row in rows) == first_ids
+    with open(tmp_path / "data" / "audio_features.checkpoint", encoding="utf-8") as f:
+        assert sorted(line.strip() for line in f) == first_ids
+
+    # A second run with more tracks only requests the ones the checkpoint doesn't list
+    new_ids = [f"track{i:03d}" for i in range(150, 180)]
+    result = run_fetcher(tmp_path, stub_server, first_ids + new_ids)
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert len(stub_server.requests) == 5
+    assert stub_server.requests[-1]["ids"] == new_ids
+
+    audio = pd.read_csv(tmp_path / "data" / "audio_features.csv")
+    assert sorted(audio["id"]) == first_ids + new_ids
@@ -0,0 +1,21 @@
+# tests/test_lang_utils.py
+
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from utils.lang_utils import detect_language, detect_languages
+
+TITLES = ["I miss you, I’m sorry", "Armed & Dangerous", "Blinding Lights", "Dákiti", "Mood (feat. iann dior)"]
+
+# Batch detection matches detecting each original title on its own
+def test_detects_original_spelling(tmp_path):
+    expected = [detect_language(t) for t in TITLES]
+    assert detect_languages(TITLES, workers=1, cache_path=str(tmp_path / "cache.db")) == expected
+
+# Spellings that normalize to the same title share one detection, and later runs reuse the cache
+def test_normalized_title_is_the_cache_key(tmp_path):
+    cache_path = str(tmp_path / "cache.db")
+    first = detect_languages(["Blinding Lights", "BLINDING  lights"], workers=1, cache_path=cache_path)
+    assert first[0] == first[1] == detect_language("Blinding Lights")
+    assert detect_languages(["blinding lights"], workers=1, cache_path=cache_path) == first[:1]
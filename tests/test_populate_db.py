@@ -0,0 +1,101 @@
+# tests/test_populate_db.py
+
+import importlib.util
+import os
+import sqlite3
+import pandas as pd
+from conftest import PROJECT_ROOT, run_script
+
+spec = importlib.util.spec_from_file_location("populate_db", os.path.join(PROJECT_ROOT, "scripts", "populate_db.py"))
+populate_db = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(populate_db)
+
+DAILY_AGGREGATES = ["mv_daily_region_streams", "mv_daily_genre_streams",
+                    "mv_daily_language_streams", "mv_daily_artist_streams"]
+
+def connect(workspace):
+    return sqlite3.connect(os.path.join(workspace, "data", "music.db"))
+
+# Streams per (year, region, date) as the fact table has them
+def daily_region_streams(conn):
+    return conn.execute("""
+        SELECT year, region_key, date, SUM(COALESCE(streams, 0)) FROM fact_chart_entry
+        GROUP BY year, region_key, date ORDER BY year, region_key, date
+    """).fetchall()
+
+# A database built before the daily streams aggregates existed gets them on its next refresh
+def test_refresh_upgrades_previous_schema(workspace):
+    with connect(workspace) as conn:
+        for table in DAILY_AGGREGATES:
+            conn.execute(f"DROP TABLE {table}")
+        conn.execute(f"DELETE FROM mv_refresh_state WHERE aggregate IN ({', '.join('?' * len(DAILY_AGGREGATES))})",
+                     DAILY_AGGREGATES)
+    conn.close()
+
+    result = run_script(workspace, "populate_db.py", "refresh")
+    assert result.returncode == 0, result.stdout + result.stderr
+
+    conn = connect(workspace)
+    for table in DAILY_AGGREGATES:
+        assert conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] > 0
+    assert conn.execute(
+        "SELECT year, region_key, date, streams FROM mv_daily_region_streams ORDER BY year, region_key, date"
+    ).fetchall() == daily_region_streams(conn)
+    conn.close()
+
+def table_rows(conn, table):
+    return conn.execute(f"SELECT * FROM {table} ORDER BY 1, 2, 3, 4").fetchall()
+
+# Re-delivering charts that are already loaded adds nothing and refreshes nothing
+def test_ingest_same_csv_adds_nothing(workspace):
+    conn = connect(workspace)
+    entries = conn.execute("SELECT COUNT(*) FROM fact_chart_entry").fetchone()[0]
+    before = table_rows(conn, "mv_genre_counts")
+
+    added = populate_db.ingest_charts(conn, os.path.join(workspace, "data", "charts_2017_2023_clean.csv"))
+
+    assert added == 0
+    assert conn.execute("SELECT COUNT(*) FROM fact_chart_entry").fetchone()[0] == entries
+    assert table_rows(conn, "mv_genre_counts") == before
+    conn.close()
+
+# New chart dates are appended once, and only the (year, region) partitions they fall into are refreshed
+def test_ingest_new_dates_refreshes_their_partitions(workspace):
+    charts = pd.read_csv(os.path.join(workspace, "data", "charts_2017_2023_clean.csv"))
+    regions = charts["region"].value_counts().index[:2].tolist()
+    # Each region's latest chart day, re-dated into the new year
+    latest = charts.groupby("region")["date"].transform("max")
+    last_day = charts[charts["region"].isin(regions) & (charts["date"] == latest)]
+    new_days = pd.concat([last_day.assign(date=date, year=2024) for date in ["2024-01-01", "2024-01-02"]])
+    # The delivery also repeats days that are already loaded, and lists every new entry twice;
+    # both must be dropped
+    delivery = pd.concat([last_day, new_days, new_days])
+    delivery_path = os.path.join(workspace, "data", "delivery.csv")
+    delivery.to_csv(delivery_path, index=False)
+
+    conn = connect(workspace)
+    entries = conn.execute("SELECT COUNT(*) FROM fact_chart_entry").fetchone()[0]
+    untouched = conn.execute("SELECT * FROM mv_genre_counts WHERE year < 2024 ORDER BY 1, 2, 3").fetchall()
+
+    added = populate_db.ingest_charts(conn, delivery_path)
+
+    new_rows = len(new_days)
+    assert added == new_rows
+    assert conn.execute("SELECT COUNT(*) FROM fact_chart_entry").fetchone()[0] == entries + new_rows
+    assert conn.execute("SELECT MAX(partitions_refreshed) FROM mv_refresh_state").fetchone()[0] == len(regions)
+    assert conn.execute("SELECT COUNT(*) FROM mv_dirty_partitions").fetchone()[0] == 0
+
+    # Older partitions are unchanged, the new ones are filled, and the daily streams match the facts
+    assert conn.execute("SELECT * FROM mv_genre_counts WHERE year < 2024 ORDER BY 1, 2, 3").fetchall() == untouched
+    refreshed = conn.execute("""
+        SELECT r.region_name FROM mv_genre_counts m JOIN dim_region r ON r.region_key = m.region_key
+        WHERE m.year = 2024 GROUP BY r.region_name ORDER BY r.region_name
+    """).fetchall()
+    assert [name for (name,) in refreshed] == sorted(regions)
+    assert conn.execute(
+        "SELECT year, region_key, date, streams FROM mv_daily_region_streams ORDER BY year, region_key, date"
+    ).fetchall() == daily_region_streams(conn)
+
+    # Delivering the same file again adds nothing
+    assert populate_db.ingest_charts(conn, delivery_path) == 0
+    conn.close()
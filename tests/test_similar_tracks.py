@@ -0,0 +1,49 @@
+# tests/test_similar_tracks.py
+
+import os
+import sys
+import numpy as np
+import pandas as pd
+from streamlit.testing.v1 import AppTest
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(PROJECT_ROOT)
+from utils.model_utils import MOOD_FEATURES
+from utils.schema_utils import compact_frame
+from utils.similarity_utils import INDEX_DIR, SimilarityIndex
+
+# The "Sounds Like" tab on its own, run the way the dashboard runs it
+# (AppTest runs the function's source as a script, so the project root is passed in)
+def similar_tracks_app(project_root):
+    import sys
+    sys.path.append(project_root)
+    from streamlit_app.visuals import plot_similar_tracks
+    plot_similar_tracks()
+
+# Audio features as load_audio_features returns them: compacted, so repeated names are categoricals
+def compact_audio_features(n_tracks=200, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "track_id": [f"t{i}" for i in range(n_tracks)],
+        "track_name": rng.choice(["Blinding Lights", "Levitating", "Peaches", "Stay"], n_tracks),
+        "artist_name": rng.choice(["The Weeknd", "Dua Lipa", "Justin Bieber"], n_tracks),
+        "track_genre": rng.choice(["pop", "dance", "r-n-b"], n_tracks),
+        **{f: rng.random(n_tracks) for f in MOOD_FEATURES},
+    })
+    return compact_frame(df)
+
+def test_search_shows_similar_tracks(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    audio = compact_audio_features()
+    assert isinstance(audio["artist_name"].dtype, pd.CategoricalDtype)
+    SimilarityIndex.build(audio).save(INDEX_DIR)
+
+    at = AppTest.from_function(similar_tracks_app, args=(PROJECT_ROOT,), default_timeout=60)
+    at.run()
+    at.text_input[0].input("lights").run()
+
+    assert not at.exception
+    assert not at.error
+    assert at.selectbox[0].options[0].startswith("Blinding Lights — ")
+    assert len(at.dataframe) >= 1
+    assert len(at.dataframe[0].value) == 10
@@ -0,0 +1,57 @@
+# tests/test_trend_utils.py
+
+import os
+import sys
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import stats
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from utils.trend_utils import compute_trend_slopes
+
+YEARS = list(range(2018, 2024))
+
+# Yearly counts per (region, genre) pair, expanded to one row per observation
+COUNTS = {
+    ("Brazil", "samba"): [3, 5, 4, 8, 9, 12],
+    ("Brazil", "pop"): [20, 14, 15, 9, 0, 6],
+    ("Japan", "j-pop"): [5, 5, 5, 5, 5, 5],   # constant count: flat line, nothing to explain
+    ("Japan", "rock"): [1, 0, 2, 0, 1, 0],    # below min_count
+}
+
+def observations():
+    rows = [(region, genre, year)
+            for (region, genre), counts in COUNTS.items()
+            for year, count in zip(YEARS, counts)
+            for _ in range(count)]
+    # Rows outside the year range are ignored
+    rows += [("Brazil", "samba", 2017)] * 50
+    return pd.DataFrame(rows, columns=["region", "genre", "year"])
+
+def test_matches_linregress():
+    result = compute_trend_slopes(observations(), ["region", "genre"], min_count=10)
+
+    assert len(result) == 3
+    assert ("Japan", "rock") not in set(zip(result["region"], result["genre"]))
+
+    for row in result.itertuples(index=False):
+        counts = COUNTS[(row.region, row.genre)]
+        expected = stats.linregress(YEARS, counts)
+        assert row.total_count == sum(counts)
+        assert row.slope == pytest.approx(expected.slope, abs=1e-9)
+        assert row.intercept == pytest.approx(expected.intercept, rel=1e-9)
+        if len(set(counts)) == 1:
+            # linregress leaves r and p undefined for a constant count (see test_constant_count_is_flat)
+            continue
+        assert row.r2 == pytest.approx(expected.rvalue ** 2, abs=1e-9)
+        assert row.p_value == pytest.approx(expected.pvalue, abs=1e-9)
+
+def test_constant_count_is_flat():
+    result = compute_trend_slopes(observations(), ["region", "genre"], min_count=10)
+    flat = result[result["genre"] == "j-pop"].iloc[0]
+    assert flat["slope"] == 0
+    assert flat["intercept"] == pytest.approx(5)
+    assert flat["r2"] == 0
+    assert flat["p_value"] == 1
+    assert np.isfinite(result[["slope", "intercept", "r2", "p_value"]].to_numpy()).all()
@@ -0,0 +1,109 @@
+# utils/aggregate_utils.py
+
+import os
+import numpy as np
+import pandas as pd
+
+# Partial aggregates written by the generate_* scripts, reusable by other scripts without rereading the inputs
+PARTIALS_DIR = os.path.join("data", "partials")
+
+# Mergeable per-group moments of numeric features: count, sum and sum of squares
+# Built chunk by chunk with update(), combined across files or processes with merge(),
+# and turned into means, variances or standard deviations without another pass over the data.
+# Counts are kept per feature, so missing values are skipped exactly like pandas' mean().
+class FeatureMoments:
+    def __init__(self, features, group_name="group", count=None, total=None, total_sq=None):
+        self.features = list(features)
+        self.group_name = group_name
+        empty = pd.DataFrame(columns=self.features, dtype="float64")
+        empty.index.name = group_name
+        self.count = empty.copy() if count is None else count
+        self.total = empty.copy() if total is None else total
+        self.total_sq = empty.copy() if total_sq is None else total_sq
+
+    # Adds one chunk of rows, grouped by the given column
+    def update(self, df, group_col):
+        values = df[self.features].astype("float64")
+        keys = df[group_col]
+        self._add(
+            values.groupby(keys, observed=True).count(),
+            values.groupby(keys, observed=True).sum(),
+            (values * values).groupby(keys, observed=True).sum()
+        )
+        return self
+
+    # Adds another set of moments over the same features (e.g. from a different chunk, file or process)
+    def merge(self, other):
+        self._add(other.count, other.total, other.total_sq)
+        return self
+
+    def _add(self, count, total, total_sq):
+        self.count = self.count.add(count, fill_value=0)
+        self.total = self.total.add(total, fill_value=0)
+        self.total_sq = self.total_sq.add(total_sq, fill_value=0)
+        self.count.index.name = self.total.index.name = self.total_sq.index.name = self.group_name
+
+    # Per-group means (NaN where a group has no values for a feature)
+    def mean(self):
+        return self.total / self.count.where(self.count > 0)
+
+    # Per-group variances; ddof=1 gives the sample variance, matching pandas' var()
+    def variance(self, ddof=1):
+        n = self.count.where(self.count > ddof)
+        centered = self.total_sq - self.total * self.total / n
+        return (centered / (n - ddof)).clip(lower=0)
+
+    # Per-group standard deviations, matching pandas' std() for ddof=1
+    def std(self, ddof=1):
+        return np.sqrt(self.variance(ddof))
+
+    # Saves the moments as one Parquet row per group (count_<f>, sum_<f>, sumsq_<f> columns)
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        frames = [self.count.add_prefix("count_"), self.total.add_prefix("sum_"), self.total_sq.add_prefix("sumsq_")]
+        pd.concat(frames, axis=1).reset_index().to_parquet(path, index=False)
+
+    # Loads moments written by save()
+    @classmethod
+    def load(cls, path):
+        df = pd.read_parquet(path)
+        group_name = df.columns[0]
+        df = df.set_index(group_name)
+        features = [c[len("count_"):] for c in df.columns if c.startswith("count_")]
+
+        def part(prefix):
+            return df[[prefix + f for f in features]].set_axis(features, axis=1)
+
+        return cls(features, group_name, part("count_"), part("sum_"), part("sumsq_"))
+
+# Mergeable row counts per combination of key columns (e.g. year × genre)
+class GroupCounts:
+    def __init__(self, keys, counts=None):
+        self.keys = list(keys)
+        if counts is None:
+            index = pd.MultiIndex.from_tuples([], names=self.keys) if len(self.keys) > 1 else pd.Index([], name=self.keys[0])
+            counts = pd.Series(dtype="int64", index=index)
+        self.counts = counts
+
+    # Counts one chunk of rows; rows with a missing key are skipped, as in groupby().size()
+    def update(self, df):
+        self.counts = self.counts.add(df.groupby(self.keys, observed=True).size(), fill_value=0).astype("int64")
+        return self
+
+    def merge(self, other):
+        self.counts = self.counts.add(other.counts, fill_value=0).astype("int64")
+        return self
+
+    # Returns the counts as a DataFrame with the key columns and a count column
+    def to_frame(self, name="count"):
+        return self.counts.rename(name).reset_index()
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.to_frame().to_parquet(path, index=False)
+
+    @classmethod
+    def load(cls, path):
+        df = pd.read_parquet(path)
+        keys = [c for c in df.columns if c != "count"]
+        return cls(keys, df.set_index(keys)["count"])
@@ -1,6 +1,7 @@
+import argparse
+import os
 import pandas as pd
 import sqlite3
-from geopy.geocoders import Nominatim
 import pycountry
 import time
 
@@ -8,6 +9,20 @@ import time
 DB_PATH = "data/music.db"
 CSV_PATH = "data/country_utils.csv"
 
+# Bundled country centroids keyed by ISO 3166 alpha-2 code (iso_alpha2, country_name, latitude, longitude)
+# Resolving against this table needs no network access, so the output can be rebuilt offline
+CENTROIDS_PATH = "data/country_centroids.csv"
+
+# Coordinates for regions the centroid table doesn't cover (e.g. "Global"), kept between runs
+# New entries are only added by the optional remote geocoder
+GEOCODE_CACHE_PATH = "data/geocode_cache.csv"
+
+# Chart region names that pycountry can't look up directly
+REGION_ALIASES = {
+    "Russia": "RU",
+    "Turkey": "TR",
+}
+
 # Try to resolve region names to full country names using pycountry
 # This improves compatibility with geolocation services that expect official names
 def resolve_country_name(region):
@@ -18,51 +33,118 @@ def resolve_country_name(region):
         # If lookup fails, return the original input as a fallback
         return region
 
-# Main function: fetch geographic coordinates for each country in the 'charts' table
-def fetch_and_save_country_coords():
+# Resolves a region name to its ISO alpha-2 code, or None if it isn't a recognized country
+def resolve_country_code(region):
+    if region in REGION_ALIASES:
+        return REGION_ALIASES[region]
+    try:
+        return pycountry.countries.lookup(region).alpha_2
+    except LookupError:
+        return None
+
+# Loads the bundled centroid table as {alpha-2 code: (latitude, longitude)}
+def load_centroids(path=CENTROIDS_PATH):
+    df = pd.read_csv(path, keep_default_na=False)
+    return {row.iso_alpha2: (row.latitude, row.longitude) for row in df.itertuples()}
+
+# Loads the persistent geocode cache as {region: (latitude, longitude)}
+def load_geocode_cache(path=GEOCODE_CACHE_PATH):
+    if not os.path.exists(path):
+        return {}
+    df = pd.read_csv(path)
+    return {row.region: (row.latitude, row.longitude) for row in df.itertuples()}
+
+# Writes the geocode cache back to disk, sorted so the file diffs cleanly
+def save_geocode_cache(cache, path=GEOCODE_CACHE_PATH):
+    df = pd.DataFrame(
+        [(region, lat, lon) for region, (lat, lon) in sorted(cache.items())],
+        columns=["region", "latitude", "longitude"]
+    )
+    df.to_csv(path, index=False)
+
+# Looks up one place name with Nominatim (network access required)
+# Only used as a fallback for regions missing from both the centroid table and the cache
+def geocode_remote(name):
+    from geopy.geocoders import Nominatim
+
+    geolocator = Nominatim(user_agent="geoapi")
+    location = geolocator.geocode(name, language="en")
+    return (location.latitude, location.longitude) if location else None
+
+# Resolves coordinates for a list of region names
+# Order of lookup: bundled centroid table (via the ISO code) → persistent cache → Nominatim if remote=True.
+# Remote results are added to the cache, so each region is geocoded over the network at most once.
+# Returns a DataFrame with country_name, latitude and longitude for every region that was resolved.
+def resolve_coordinates(regions, remote=False, centroids_path=CENTROIDS_PATH, cache_path=GEOCODE_CACHE_PATH):
+    centroids = load_centroids(centroids_path)
+    cache = load_geocode_cache(cache_path)
+    cache_changed = False
+    records = []
+
+    for region in regions:
+        code = resolve_country_code(region)
+        coords = centroids.get(code) if code else None
+        if coords is None:
+            coords = cache.get(region)
+
+        if coords is None and remote:
+            lookup_name = resolve_country_name(region)
+            try:
+                coords = geocode_remote(lookup_name)
+            except Exception as e:
+                # Handle unexpected geocoding errors gracefully
+                print(f"Error for {region}: {e}")
+            if coords:
+                cache[region] = coords
+                cache_changed = True
+                print(f"{region} → {lookup_name} (geocoded)")
+
+            # Pause between requests to avoid getting rate-limited by the API
+            time.sleep(1)
+
+        if coords is None:
+            print(f"No coordinates for: {region}" + ("" if remote else " (run with --remote to geocode it)"))
+            continue
+
+        records.append({
+            "country_name": region,      # Use original name for compatibility with chart data
+            "latitude": coords[0],
+            "longitude": coords[1]
+        })
+
+    if cache_changed:
+        save_geocode_cache(cache, cache_path)
+
+    return pd.DataFrame(records, columns=["country_name", "latitude", "longitude"])
+
+# Main function: look up geographic coordinates for each country in the 'charts' table
+def fetch_and_save_country_coords(remote=False):
     # Connect to the SQLite database and retrieve unique region names from the charts table
     conn = sqlite3.connect(DB_PATH)
     countries = pd.read_sql("SELECT DISTINCT region FROM charts", conn)
     conn.close()
 
-    # Set up the geolocation service
-    geolocator = Nominatim(user_agent="geoapi")
-
-    records = []
+    # Clean region names and resolve them to coordinates
+    regions = list(dict.fromkeys(r.strip() for r in countries["region"].dropna()))
+    df = resolve_coordinates(regions, remote=remote)
 
-    # Iterate through each unique region name
-    for region in countries["region"].dropna().unique():
-        # Clean and attempt to resolve region name to a recognized country
-        lookup_name = resolve_country_name(region.strip())
-
-        try:
-            # Use the geocoder to get latitude and longitude
-            location = geolocator.geocode(lookup_name, language="en")
-            if location:
-                records.append({
-                    "country_name": region.strip(),      # Use original name for compatibility with chart data
-                    "latitude": location.latitude,
-                    "longitude": location.longitude
-                })
-                print(f"{region} → {lookup_name}")
-            else:
-                print(f"No geocode result: {region} → {lookup_name}")
-        except Exception as e:
-            # Handle unexpected geocoding errors gracefully
-            print(f"Error for {region}: {e}")
-
-        # Pause between requests to avoid getting rate-limited by the API
-        time.sleep(1)
-
-    # Convert results into a DataFrame and save to CSV
-    df = pd.DataFrame(records)
+    # Save the results to CSV
     df.to_csv(CSV_PATH, index=False)
+    print(f"Saved coordinates for {len(df)} of {len(regions)} regions to {CSV_PATH}")
 
     # Also save the results to the 'country_utils' table in the database
     conn = sqlite3.connect(DB_PATH)
     df.to_sql("country_utils", conn, if_exists="replace", index=False)
     conn.close()
 
+# Parses command line options for the coordinate lookup
+def parse_args():
+    parser = argparse.ArgumentParser(description="Build data/country_utils.csv from the bundled country centroids.")
+    parser.add_argument("--remote", action="store_true",
+                        help="Geocode regions missing from the centroid table and cache with Nominatim")
+    return parser.parse_args()
+
 # Run the function when this script is executed directly
 if __name__ == "__main__":
-    fetch_and_save_country_coords()
\ No newline at end of file
+    args = parse_args()
+    fetch_and_save_country_coords(remote=args.remote)
@@ -0,0 +1,194 @@
+# utils/data_utils.py
+
+import os
+import glob
+import operator
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from utils.schema_utils import category_columns, compact_frame
+
+# Cleaned source datasets (CSV) and their columnar copies written by scripts/convert_to_parquet.py
+CHARTS_CSV_PATH = os.path.join("data", "charts_2017_2023_clean.csv")
+CHARTS_PARQUET_PATH = os.path.join("data", "charts_2017_2023_clean.parquet")
+AUDIO_CSV_PATH = os.path.join("data", "audio_features_cleaned.csv")
+AUDIO_PARQUET_PATH = os.path.join("data", "audio_features_cleaned.parquet")
+
+# Spotify track metadata: the partitioned output of scripts/crawl_spotify.py
+# (tracks/year=YYYY/market=XX.csv), or the single-page sample from scripts/fetch_spotify.py
+TRACKS_CRAWL_DIR = "tracks"
+TRACKS_SAMPLE_FILE = "tracks_2020.csv"
+
+# Rows per chunk when streaming a dataset with iter_dataset
+DEFAULT_CHUNK_SIZE = 250_000
+
+# Column types used when writing Parquet
+# Columns not listed here are stored as strings
+CHARTS_SCHEMA = {
+    "track_id": pa.string(),
+    "track_name": pa.string(),
+    "artist_name": pa.string(),
+    "date": pa.date32(),
+    "region": pa.string(),
+    "chart": pa.string(),
+    "trend": pa.string(),
+    "streams": pa.int64(),
+    "position": pa.int16(),
+    "year": pa.int16(),
+    "track_genre": pa.string(),
+}
+
+AUDIO_FEATURES_SCHEMA = {
+    "track_id": pa.string(),
+    "track_name": pa.string(),
+    "artist_name": pa.string(),
+    "popularity": pa.int16(),
+    "duration_ms": pa.int32(),
+    "explicit": pa.bool_(),
+    "danceability": pa.float64(),
+    "energy": pa.float64(),
+    "key": pa.int8(),
+    "loudness": pa.float64(),
+    "mode": pa.int8(),
+    "speechiness": pa.float64(),
+    "acousticness": pa.float64(),
+    "instrumentalness": pa.float64(),
+    "liveness": pa.float64(),
+    "valence": pa.float64(),
+    "tempo": pa.float64(),
+    "time_signature": pa.int8(),
+    "track_genre": pa.string(),
+}
+
+# Comparison operators supported in row filters, using the same names as pyarrow
+FILTER_OPERATORS = {
+    "==": operator.eq,
+    "=": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+}
+
+# Builds a row filter that keeps years in an inclusive range, e.g. year_between(2018, 2023)
+def year_between(start, end, column="year"):
+    return [(column, ">=", start), (column, "<=", end)]
+
+# Builds the full pyarrow schema for a set of CSV columns
+def arrow_schema(columns, schema):
+    return pa.schema([(col, schema.get(col, pa.string())) for col in columns])
+
+# Applies (column, op, value) filters to a DataFrame in pandas
+# Used when reading from CSV, where filters can't be pushed down to the file reader
+def apply_filters(df, filters):
+    mask = pd.Series(True, index=df.index)
+    for column, op, value in filters or []:
+        if op == "in":
+            mask &= df[column].isin(value)
+        elif op == "not in":
+            mask &= ~df[column].isin(value)
+        else:
+            mask &= FILTER_OPERATORS[op](df[column], value)
+    return df[mask]
+
+# Text dtypes for reading a CSV: registered categorical columns are parsed straight into categoricals
+def csv_dtypes(schema, compact=True):
+    string_columns = [c for c, t in schema.items() if pa.types.is_string(t)]
+    categorical = set(category_columns(string_columns)) if compact else set()
+    return {c: "category" if c in categorical else str for c in string_columns}
+
+# Reads a dataset with column projection and row filters
+# Prefers the Parquet copy (only the requested columns are decoded, and filters skip whole row groups);
+# falls back to the CSV so scripts keep working before the conversion stage has run.
+# With compact=True (the default) the frame uses the in-memory schema from utils/schema_utils.py:
+# repeated strings come back as categoricals (decoded from Parquet dictionaries without building
+# a Python string per row) and numeric columns are downcast.
+def load_dataset(parquet_path, csv_path, schema, columns=None, filters=None, compact=True):
+    if os.path.exists(parquet_path):
+        read_columns = columns if columns is not None else pq.read_schema(parquet_path).names
+        table = pq.read_table(parquet_path, columns=columns, filters=filters,
+                              read_dictionary=category_columns(read_columns) if compact else None)
+        df = table.to_pandas(date_as_object=False)
+        return compact_frame(df) if compact else df
+
+    filter_columns = [f[0] for f in filters or []]
+    usecols = None if columns is None else list(dict.fromkeys(list(columns) + filter_columns))
+    date_columns = [c for c, t in schema.items() if pa.types.is_date(t)]
+
+    df = pd.read_csv(
+        csv_path,
+        usecols=usecols,
+        dtype=csv_dtypes(schema, compact),
+        low_memory=False
+    )
+    for col in date_columns:
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col], errors="coerce")
+
+    df = apply_filters(df, filters).reset_index(drop=True)
+    if columns is not None:
+        df = df[list(columns)]
+    return compact_frame(df) if compact else df
+
+# Reads a dataset in chunks of at most chunk_size rows, with the same projection and filters as load_dataset
+# Memory use is bounded by the chunk size, so aggregations can stream through files larger than RAM
+# (each chunk is compacted on its own, so a column's categories can differ from chunk to chunk)
+def iter_dataset(parquet_path, csv_path, schema, columns=None, filters=None, chunk_size=DEFAULT_CHUNK_SIZE,
+                 compact=True):
+    if os.path.exists(parquet_path):
+        dataset = ds.dataset(parquet_path, format="parquet")
+        expression = pq.filters_to_expression(filters) if filters else None
+        for batch in dataset.to_batches(columns=columns, filter=expression, batch_size=chunk_size):
+            if batch.num_rows:
+                chunk = batch.to_pandas(date_as_object=False)
+                yield compact_frame(chunk) if compact else chunk
+        return
+
+    filter_columns = [f[0] for f in filters or []]
+    usecols = None if columns is None else list(dict.fromkeys(list(columns) + filter_columns))
+    date_columns = [c for c, t in schema.items() if pa.types.is_date(t)]
+
+    reader = pd.read_csv(csv_path, usecols=usecols, dtype=csv_dtypes(schema, compact), chunksize=chunk_size)
+    for chunk in reader:
+        for col in date_columns:
+            if col in chunk.columns:
+                chunk[col] = pd.to_datetime(chunk[col], errors="coerce")
+        chunk = apply_filters(chunk, filters)
+        chunk = chunk if columns is None else chunk[list(columns)]
+        yield compact_frame(chunk) if compact else chunk
+
+# Loads the cleaned charts dataset, e.g.
+# load_charts(columns=["region", "track_genre", "year"], filters=year_between(2018, 2023))
+def load_charts(columns=None, filters=None, compact=True):
+    return load_dataset(CHARTS_PARQUET_PATH, CHARTS_CSV_PATH, CHARTS_SCHEMA, columns, filters, compact)
+
+# Loads the cleaned audio features dataset with optional column projection and filters
+def load_audio_features(columns=None, filters=None, compact=True):
+    return load_dataset(AUDIO_PARQUET_PATH, AUDIO_CSV_PATH, AUDIO_FEATURES_SCHEMA, columns, filters, compact)
+
+# Streams the cleaned charts dataset in chunks (see iter_dataset)
+def iter_charts(columns=None, filters=None, chunk_size=DEFAULT_CHUNK_SIZE, compact=True):
+    return iter_dataset(CHARTS_PARQUET_PATH, CHARTS_CSV_PATH, CHARTS_SCHEMA, columns, filters, chunk_size, compact)
+
+# Streams the cleaned audio features dataset in chunks (see iter_dataset)
+def iter_audio_features(columns=None, filters=None, chunk_size=DEFAULT_CHUNK_SIZE, compact=True):
+    return iter_dataset(AUDIO_PARQUET_PATH, AUDIO_CSV_PATH, AUDIO_FEATURES_SCHEMA, columns, filters, chunk_size,
+                        compact)
+
+# Loads Spotify track metadata (track_id, name, artist_id, artist_name, release_date, ...)
+# Combines all crawl partitions if a crawl exists, otherwise reads the single-year sample file;
+# each track appears once even if it was found in several markets
+def load_tracks(columns=None, data_dir="data", compact=True):
+    partitions = sorted(glob.glob(os.path.join(data_dir, TRACKS_CRAWL_DIR, "year=*", "market=*.csv")))
+    paths = partitions or [os.path.join(data_dir, TRACKS_SAMPLE_FILE)]
+    usecols = None if columns is None else list(dict.fromkeys(["track_id"] + list(columns)))
+
+    df = pd.concat(
+        [pd.read_csv(path, usecols=usecols, dtype=str) for path in paths],
+        ignore_index=True
+    )
+    df = df.drop_duplicates(subset="track_id").reset_index(drop=True)
+    df = df if columns is None else df[list(columns)]
+    return compact_frame(df) if compact else df
@@ -0,0 +1,106 @@
+# utils/entity_utils.py
+
+import os
+import re
+import hashlib
+import unicodedata
+import numpy as np
+import pandas as pd
+
+# Mapping from every raw (track_name, artist_name) spelling seen in the sources to its canonical keys,
+# written by scripts/resolve_entities.py (populate_db.py keeps the same mapping in track_key_map)
+TRACK_KEYS_PATH = os.path.join("data", "track_keys.parquet")
+
+# Typographic variants folded to one form before comparing names
+PUNCTUATION_MAP = str.maketrans({
+    "‘": "'", "’": "'", "‛": "'", "´": "'", "`": "'",
+    "“": '"', "”": '"',
+    "‐": "-", "‑": "-", "‒": "-", "–": "-", "—": "-",
+})
+
+# Featured-artist credits in a title: "Song (feat. X)", "Song [ft. X]", "Song (with X)", "Song - feat. X"
+TITLE_FEATURE_PATTERN = re.compile(
+    r"\s*[\(\[]\s*(?:feat\.?|ft\.?|featuring|with)\s[^\)\]]*[\)\]]"
+    r"|\s+-?\s*(?:feat\.|ft\.|featuring)\s.*$",
+    re.IGNORECASE
+)
+
+# Separators between the primary artist and the artists featured with them
+# ("A feat. B", "A ft. B", "A, B", "A & B", "A; B"); only the primary artist identifies a track
+ARTIST_SEPARATOR_PATTERN = re.compile(r"\s*(?:,|;|\s&\s|\s(?:feat\.?|ft\.?|featuring|with)\s)\s*")
+
+# Unicode NFKC form, unified quotes and dashes, case-folded, whitespace collapsed
+def normalize_text(text):
+    if not isinstance(text, str):
+        return ""
+    text = unicodedata.normalize("NFKC", text).translate(PUNCTUATION_MAP)
+    return re.sub(r"\s+", " ", text).strip().casefold()
+
+# Canonical form of a title: featured-artist credits are dropped, as they are spelled differently per source
+def normalize_title(title):
+    if not isinstance(title, str):
+        return ""
+    title = unicodedata.normalize("NFKC", title).translate(PUNCTUATION_MAP)
+    return normalize_text(TITLE_FEATURE_PATTERN.sub("", title)) or normalize_text(title)
+
+# Canonical form of an artist credit: the primary artist only
+def normalize_artist(artist):
+    text = normalize_text(artist)
+    return ARTIST_SEPARATOR_PATTERN.split(text, maxsplit=1)[0] if text else ""
+
+# A stable 63-bit integer for a tuple of normalized strings (the same on every machine and run,
+# unlike Python's hash(); fits a signed SQLite INTEGER and an int64 column)
+def stable_key(*parts):
+    digest = hashlib.blake2b("\x1f".join(parts).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") >> 1
+
+# Canonical key of an artist, or None for a missing name
+def artist_key(artist):
+    name = normalize_artist(artist)
+    return stable_key("artist", name) if name else None
+
+# Canonical key of a track (its normalized title and primary artist), or None if either is missing
+def track_key(title, artist):
+    title, artist = normalize_title(title), normalize_artist(artist)
+    return stable_key("track", title, artist) if title and artist else None
+
+# Integer codes of a column, reusing a categorical's codes instead of hashing every string again
+def _codes(series):
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series.cat.codes.to_numpy(dtype=np.int64), series.cat.categories
+    codes, uniques = pd.factorize(series)
+    return codes.astype(np.int64), uniques
+
+# Canonical track keys for every row of a frame (nullable Int64, <NA> where title or artist is missing)
+# Each distinct (title, artist) pair is normalized and hashed once, however many rows repeat it
+def assign_track_keys(df, title_col="track_name", artist_col="artist_name"):
+    title_codes, titles = _codes(df[title_col])
+    artist_codes, artists = _codes(df[artist_col])
+    # One integer per (title, artist) combination; codes are shifted by one so missing values (-1) fit
+    width = len(artists) + 1
+    pair_codes, pairs = pd.factorize((title_codes + 1) * width + artist_codes + 1)
+
+    keys = []
+    for pair in pairs:
+        t, a = divmod(int(pair), width)
+        keys.append(track_key(titles[t - 1] if t else None, artists[a - 1] if a else None))
+    keys = pd.array(keys, dtype="Int64")
+    return pd.Series(keys.take(pair_codes), index=df.index, name="track_key")
+
+# Canonical artist keys for a column (nullable Int64), hashing each distinct name once
+def assign_artist_keys(series):
+    codes, names = _codes(series)
+    keys = pd.array([artist_key(name) for name in names], dtype="Int64")
+    return pd.Series(keys.take(codes, allow_fill=True), index=series.index, name="artist_key")
+
+# The mapping table for a set of raw (track_name, artist_name) pairs: one row per distinct spelling
+# with its normalized title and artist and both canonical keys; pairs that can't be keyed are dropped
+def build_key_map(pairs):
+    pairs = pairs.dropna().drop_duplicates().reset_index(drop=True)
+    key_map = pairs.assign(
+        norm_title=pairs["track_name"].map(normalize_title),
+        norm_artist=pairs["artist_name"].map(normalize_artist),
+        track_key=assign_track_keys(pairs),
+        artist_key=assign_artist_keys(pairs["artist_name"]),
+    )
+    return key_map.dropna(subset=["track_key", "artist_key"]).reset_index(drop=True)
@@ -0,0 +1,92 @@
+# utils/http_utils.py
+
+import random
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+
+# Creates a requests Session whose connection pool can serve `pool_size` concurrent requests,
+# so worker threads reuse open HTTPS connections instead of reconnecting for every call
+def make_session(pool_size=10):
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+# Shared gate for all threads talking to one API
+# - pause(seconds) blocks every caller until the server's Retry-After window has passed
+# - rate (requests per second), if set, spaces requests evenly across all threads
+class Throttle:
+    def __init__(self, rate=None):
+        self.min_interval = 1.0 / rate if rate else 0.0
+        self.lock = threading.Lock()
+        self.paused_until = 0.0
+        self.next_slot = 0.0
+
+    # Blocks until the caller may send its next request
+    def wait(self):
+        with self.lock:
+            now = time.monotonic()
+            start = max(now, self.paused_until, self.next_slot)
+            self.next_slot = start + self.min_interval
+        delay = start - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+    # Holds back every caller for the given number of seconds
+    def pause(self, seconds):
+        with self.lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+# Reads the Retry-After header (in seconds) of a 429 response, if present
+def retry_after_seconds(response):
+    value = response.headers.get("Retry-After")
+    try:
+        return max(float(value), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+# Sends a GET request, retrying on rate limits and transient failures
+# - 429: waits for Retry-After (or exponential backoff if missing), pausing all threads sharing the throttle
+# - 5xx and connection errors: exponential backoff with jitter
+# headers may be a dict or a callable returning one (re-evaluated on every attempt, e.g. for fresh tokens).
+# Returns the final response; raises the last connection error if no response was ever received.
+def get_with_retry(session, url, params=None, headers=None, throttle=None,
+                   max_retries=5, backoff=1.0, timeout=30):
+    last_error = None
+    response = None
+
+    for attempt in range(max_retries + 1):
+        if throttle:
+            throttle.wait()
+
+        try:
+            response = session.get(
+                url,
+                params=params,
+                headers=headers() if callable(headers) else headers,
+                timeout=timeout
+            )
+        except requests.RequestException as e:
+            last_error = e
+            delay = backoff * 2 ** attempt
+        else:
+            if response.status_code == 429:
+                delay = retry_after_seconds(response)
+                if delay is None:
+                    delay = backoff * 2 ** attempt
+                if throttle:
+                    throttle.pause(delay)
+            elif response.status_code >= 500:
+                delay = backoff * 2 ** attempt
+            else:
+                return response
+
+        if attempt < max_retries:
+            time.sleep(delay + random.uniform(0, backoff / 2))
+
+    if response is None:
+        raise last_error
+    return response
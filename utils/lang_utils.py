@@ -1,6 +1,28 @@
 # utils/lang_utils.py
 
-from langdetect import detect
+import os
+import re
+import sqlite3
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+from langdetect import detect, DetectorFactory
+
+# langdetect is randomized internally; a fixed seed makes every detection reproducible,
+# including in worker processes (they import this module, so the seed is set there too)
+DetectorFactory.seed = 0
+
+# Persistent cache of detected languages, keyed by normalized title
+LANG_CACHE_PATH = os.path.join("data", "lang_cache.db")
+
+# Cache table; earlier caches (table lang_cache) hold detections of the normalized titles rather than
+# the original spellings, so they are not reused
+CACHE_TABLE = "lang_cache_v2"
+
+# Below this many uncached titles, detection runs in-process (starting a pool costs more than it saves)
+MIN_TITLES_FOR_POOL = 500
+
+# SQLite limits the number of bound parameters per statement, so cache lookups are batched
+CACHE_LOOKUP_BATCH = 500
 
 # Attempts to detect the language of a given text string using langdetect
 # Returns "unknown" if detection fails or text is invalid
@@ -8,4 +30,69 @@ def detect_language(text):
     try:
         return detect(text)
     except:
-        return "unknown"
\ No newline at end of file
+        return "unknown"
+
+# Normalizes a title so trivially different spellings share one cache entry and one detection:
+# Unicode NFKC form, collapsed whitespace, and case-folded
+def normalize_title(text):
+    if not isinstance(text, str):
+        return ""
+    text = unicodedata.normalize("NFKC", text)
+    return re.sub(r"\s+", " ", text).strip().casefold()
+
+# Opens the on-disk cache, creating its table on first use
+def open_cache(cache_path=LANG_CACHE_PATH):
+    os.makedirs(os.path.dirname(cache_path) or ".", exist_ok=True)
+    conn = sqlite3.connect(cache_path)
+    conn.execute(f"CREATE TABLE IF NOT EXISTS {CACHE_TABLE} (title TEXT PRIMARY KEY, language TEXT NOT NULL)")
+    return conn
+
+# Looks up already-detected titles in the cache
+def read_cache(conn, titles):
+    found = {}
+    for i in range(0, len(titles), CACHE_LOOKUP_BATCH):
+        batch = titles[i:i + CACHE_LOOKUP_BATCH]
+        placeholders = ", ".join("?" for _ in batch)
+        rows = conn.execute(f"SELECT title, language FROM {CACHE_TABLE} WHERE title IN ({placeholders})", batch)
+        found.update(rows)
+    return found
+
+# Detects the language of many titles at once
+# Titles are deduplicated and cached by their normalized form, previously seen titles come from the
+# on-disk cache, and only new titles are detected, spread across a process pool.
+# Detection runs on the original spelling (the first one seen for each normalized title), since
+# case and punctuation carry signal for langdetect; the result is stored under the normalized title.
+# Returns a list of language codes aligned with the input.
+def detect_languages(texts, workers=None, cache_path=LANG_CACHE_PATH, chunksize=256):
+    keys = [normalize_title(t) for t in texts]
+    originals = {}
+    for key, text in zip(keys, texts):
+        if key:
+            originals.setdefault(key, text)
+    unique_titles = sorted(originals)
+
+    conn = open_cache(cache_path) if cache_path else None
+    languages = read_cache(conn, unique_titles) if conn else {}
+    missing = [title for title in unique_titles if title not in languages]
+
+    if missing:
+        if workers == 1 or len(missing) < MIN_TITLES_FOR_POOL:
+            detected = [detect_language(originals[title]) for title in missing]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                detected = list(pool.map(detect_language, [originals[title] for title in missing],
+                                         chunksize=chunksize))
+
+        new_entries = dict(zip(missing, detected))
+        languages.update(new_entries)
+        if conn:
+            with conn:
+                conn.executemany(f"INSERT OR REPLACE INTO {CACHE_TABLE} (title, language) VALUES (?, ?)",
+                                 new_entries.items())
+
+    if conn:
+        conn.close()
+
+    print(f"Language detection: {len(keys):,} titles, {len(unique_titles):,} unique, "
+          f"{len(unique_titles) - len(missing):,} from cache, {len(missing):,} detected")
+    return [languages.get(k, "unknown") for k in keys]
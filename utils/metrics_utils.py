@@ -0,0 +1,284 @@
+# utils/metrics_utils.py
+
+import argparse
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows: peak RSS is not reported
+    resource = None
+
+# Every finished span is appended to this JSON-lines file (one object per line)
+# PIPELINE_METRICS_PATH overrides the location; setting it to an empty string disables recording
+METRICS_PATH = os.environ.get("PIPELINE_METRICS_PATH", os.path.join("data", "metrics.jsonl"))
+
+# Set PIPELINE_METRICS_SUMMARY=1 to print a timing tree when a stage finishes
+# (run_pipeline.py also sets PIPELINE_RUN_ID, so the stages of one pipeline run can be grouped)
+PRINT_SUMMARY = os.environ.get("PIPELINE_METRICS_SUMMARY", "") not in ("", "0")
+
+# Peak resident memory of this process so far, in MB (ru_maxrss is KiB on Linux, bytes on macOS)
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (2**20 if sys.platform == "darwin" else 2**10), 2)
+
+# CPU time of this process plus any child processes it has waited for (e.g. process pool workers)
+def cpu_seconds():
+    t = os.times()
+    return t.user + t.system + t.children_user + t.children_system
+
+# Size in bytes of a file, or of every file below a directory
+def path_size(path):
+    if os.path.isdir(path):
+        return sum(os.path.getsize(os.path.join(root, f)) for root, _, files in os.walk(path) for f in files)
+    return os.path.getsize(path) if os.path.exists(path) else 0
+
+# One timed step. Spans nest: a span opened inside another becomes its child, and its record
+# carries the full path (e.g. generate_language_entropy/merge). Rows and bytes are added by the
+# code being measured through record_read / record_write; extra fields can be put in attrs.
+# metrics_path overrides METRICS_PATH for the span and its children.
+class Span:
+    def __init__(self, name, parent=None, run_id=None, metrics_path=None):
+        self.name = name
+        self.parent = parent
+        self.path = name if parent is None else f"{parent.path}/{name}"
+        self.depth = 0 if parent is None else parent.depth + 1
+        self.run_id = run_id or (parent.run_id if parent else uuid.uuid4().hex[:12])
+        self.metrics_path = parent.metrics_path if parent is not None and metrics_path is None else metrics_path
+        self.children = []
+        self.attrs = {}
+        self.rows_in = 0
+        self.rows_out = 0
+        self.bytes_read = 0
+        self.bytes_written = 0
+        # Rows read from / written to files, including those of child spans
+        self.file_rows_in = 0
+        self.file_rows_out = 0
+        self.status = "ok"
+        self.error = None
+        self.record = None
+        self.started_at = time.time()
+        self._wall = time.perf_counter()
+        self._cpu = cpu_seconds()
+        if parent is not None:
+            parent.children.append(self)
+
+    # Records input rows and the size of the file(s) they were read from
+    def record_read(self, path=None, rows=None):
+        if rows is not None:
+            self.rows_in += int(rows)
+            if path is not None:
+                self.file_rows_in += int(rows)
+        if path is not None:
+            self.bytes_read += path_size(path)
+        return self
+
+    # Records output rows and the size of the file(s) they were written to (call after writing)
+    def record_write(self, path=None, rows=None):
+        if rows is not None:
+            self.rows_out += int(rows)
+            if path is not None:
+                self.file_rows_out += int(rows)
+        if path is not None:
+            self.bytes_written += path_size(path)
+        return self
+
+    def fail(self, error):
+        self.status = "failed"
+        self.error = f"{type(error).__name__}: {error}"
+
+    # Stops the clocks and appends the span's record to the metrics file
+    def finish(self):
+        if self.record is not None:
+            return self.record
+        self.record = {
+            "run_id": self.run_id,
+            "span": self.path,
+            "name": self.name,
+            "parent": self.parent.path if self.parent else None,
+            "depth": self.depth,
+            "pid": os.getpid(),
+            "started_at": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started_at)),
+            "status": self.status,
+            "wall_seconds": round(time.perf_counter() - self._wall, 4),
+            "cpu_seconds": round(cpu_seconds() - self._cpu, 4),
+            "peak_rss_mb": peak_rss_mb(),
+            "rows_in": self.rows_in or self.file_rows_in,
+            "rows_out": self.rows_out or self.file_rows_out,
+            "bytes_read": self.bytes_read,
+            "bytes_written": self.bytes_written,
+        }
+        if self.parent is None and os.environ.get("PIPELINE_RUN_ID"):
+            self.record["pipeline_run"] = os.environ["PIPELINE_RUN_ID"]
+        if self.error:
+            self.record["error"] = self.error
+        self.record.update(self.attrs)
+        write_record(self.record, self.metrics_path)
+        return self.record
+
+# Appends one record as a single write, so stages running in parallel never interleave lines
+def write_record(record, path=None):
+    path = METRICS_PATH if path is None else path
+    if not path:
+        return
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    line = (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+    try:
+        os.write(fd, line)
+    finally:
+        os.close(fd)
+
+# The stage (root span) of this process and the stack of open spans per thread
+_stage = None
+_local = threading.local()
+
+def _stack():
+    if not hasattr(_local, "spans"):
+        _local.spans = []
+    return _local.spans
+
+# The innermost open span of the current thread (falling back to the stage)
+def current_span():
+    stack = _stack()
+    return stack[-1] if stack else _stage
+
+# Starts the stage span for this script. It is finished automatically when the process exits,
+# marked as failed if the script dies with an uncaught exception, and optionally summarized.
+# Call it once near the top of a script; later calls return the same stage.
+def start_stage(name, summary=None):
+    global _stage
+    if _stage is not None:
+        return _stage
+    _stage = Span(name)
+    show_summary = PRINT_SUMMARY if summary is None else summary
+
+    previous_hook = sys.excepthook
+
+    def excepthook(exc_type, exc, tb):
+        for open_span in reversed(_stack()):
+            open_span.fail(exc)
+        _stage.fail(exc)
+        previous_hook(exc_type, exc, tb)
+
+    def finish_stage():
+        for open_span in reversed(_stack()):
+            open_span.finish()
+        _stage.finish()
+        if show_summary:
+            print(format_summary(_stage))
+
+    sys.excepthook = excepthook
+    atexit.register(finish_stage)
+    return _stage
+
+# Opens a root span for work that isn't a whole process or a single with-block (e.g. one
+# dashboard rerun); spans opened in this thread nest below it until close_span is called
+def open_span(name, metrics_path=None):
+    root = Span(name, metrics_path=metrics_path)
+    _stack().append(root)
+    return root
+
+# Finishes a span from open_span, along with any spans still open below it
+def close_span(root):
+    stack = _stack()
+    while root in stack:
+        stack.pop().finish()
+    return root.finish()
+
+# Times a sub-step as a child of the innermost open span, e.g.
+#   with span("read") as s:
+#       df = load_charts(...)
+#       s.record_read(CHARTS_PARQUET_PATH, rows=len(df))
+@contextmanager
+def span(name):
+    parent = current_span()
+    child = Span(name, parent)
+    stack = _stack()
+    stack.append(child)
+    try:
+        yield child
+    except BaseException as e:
+        if not isinstance(e, SystemExit) or e.code not in (None, 0):
+            child.fail(e)
+        raise
+    finally:
+        stack.pop()
+        child.finish()
+        # File I/O rolls up, so a span that records no rows itself reports the rows and bytes
+        # its sub-steps read and wrote (in-memory steps such as a merge don't double count)
+        if parent is not None:
+            parent.file_rows_in += child.file_rows_in
+            parent.file_rows_out += child.file_rows_out
+            parent.bytes_read += child.bytes_read
+            parent.bytes_written += child.bytes_written
+
+# Formats a finished span and its children as an indented table
+def format_summary(root):
+    lines = [f"{'step':<40} {'wall s':>8} {'cpu s':>8} {'peak MB':>8} {'rows in':>12} {'rows out':>12} "
+             f"{'MB read':>9} {'MB written':>10}"]
+
+    def add(s):
+        r = s.finish() if s.record is None else s.record
+        label = ("  " * s.depth + s.name)[:40]
+        rss = "" if r["peak_rss_mb"] is None else f"{r['peak_rss_mb']:.0f}"
+        lines.append(f"{label:<40} {r['wall_seconds']:>8.2f} {r['cpu_seconds']:>8.2f} {rss:>8} "
+                     f"{r['rows_in']:>12,} {r['rows_out']:>12,} {r['bytes_read'] / 1e6:>9.1f} "
+                     f"{r['bytes_written'] / 1e6:>10.1f}" + ("  FAILED" if r["status"] != "ok" else ""))
+        for child in s.children:
+            add(child)
+
+    add(root)
+    return "\n".join(lines)
+
+# Reads the metrics file and returns the records of the most recent run of every stage
+def latest_runs(path=METRICS_PATH):
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    latest = {}
+    for r in records:
+        if r["depth"] == 0:
+            latest[r["name"]] = r["run_id"]
+    runs = set(latest.values())
+    return [r for r in records if r["run_id"] in runs]
+
+# Prints the latest run of every stage from the metrics file as a summary table
+def print_summary(path=METRICS_PATH):
+    records = latest_runs(path)
+    if not records:
+        print(f"No metrics recorded in {path}")
+        return
+    header = f"{'step':<48} {'status':<7} {'wall s':>8} {'cpu s':>8} {'peak MB':>8} {'rows in':>12} {'rows out':>12}"
+    print(header)
+    # Children are written before their parents; order each run as a tree instead
+    by_parent = {}
+    for r in records:
+        by_parent.setdefault((r["run_id"], r["parent"]), []).append(r)
+
+    def show(r):
+        rss = "" if r["peak_rss_mb"] is None else f"{r['peak_rss_mb']:.0f}"
+        label = ("  " * r["depth"] + r["name"])[:48]
+        print(f"{label:<48} {r['status']:<7} {r['wall_seconds']:>8.2f} {r['cpu_seconds']:>8.2f} {rss:>8} "
+              f"{r['rows_in']:>12,} {r['rows_out']:>12,}")
+        for child in sorted(by_parent.get((r["run_id"], r["span"]), []), key=lambda c: c["started_at"]):
+            show(child)
+
+    roots = sorted((r for r in records if r["depth"] == 0), key=lambda r: r["started_at"])
+    for root in roots:
+        show(root)
+
+# Command line: python utils/metrics_utils.py [metrics file] prints the latest run of every stage
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Summarize the pipeline metrics file.")
+    parser.add_argument("path", nargs="?", default=METRICS_PATH, help="JSON-lines metrics file")
+    print_summary(parser.parse_args().path)
@@ -0,0 +1,70 @@
+# utils/model_utils.py
+
+import os
+from collections import namedtuple
+import joblib
+import numpy as np
+import pandas as pd
+
+# Trained by scripts/train_mood_cluster_classifier.py from the genre clusters table
+MODEL_PATH = os.path.join("models", "mood_cluster_classifier.pkl")
+GENRE_CLUSTERS_PATH = os.path.join("data", "genre_clusters.csv")
+
+# Audio features the classifier was trained on, in training order
+MOOD_FEATURES = [
+    "valence", "danceability", "energy", "tempo",
+    "acousticness", "instrumentalness", "liveness", "speechiness"
+]
+
+# Loads the mood cluster classifier
+# n_jobs sets how many cores predict_proba spreads the trees over (-1 = all cores)
+def load_mood_model(path=MODEL_PATH, n_jobs=None):
+    model = joblib.load(path)
+    if n_jobs is not None and hasattr(model, "n_jobs"):
+        model.set_params(n_jobs=n_jobs)
+    return model
+
+# Predicts mood clusters for every row of a DataFrame in one vectorized call
+# Returns a DataFrame aligned with df: the predicted cluster, its probability, and one
+# prob_cluster_<id> column per cluster. Rows missing any mood feature get <NA>.
+def score_mood_clusters(model, df):
+    features = df[MOOD_FEATURES].apply(pd.to_numeric, errors="coerce")
+    valid = features.notna().all(axis=1).to_numpy()
+
+    probabilities = np.full((len(df), len(model.classes_)), np.nan)
+    cluster = pd.Series(pd.NA, index=df.index, dtype="Int16")
+    confidence = np.full(len(df), np.nan)
+
+    if valid.any():
+        probabilities[valid] = model.predict_proba(features[valid])
+        best = probabilities[valid].argmax(axis=1)
+        cluster[valid] = model.classes_[best]
+        confidence[valid] = probabilities[valid][np.arange(len(best)), best]
+
+    result = pd.DataFrame({"cluster": cluster, "cluster_probability": confidence}, index=df.index)
+    for i, label in enumerate(model.classes_):
+        result[f"prob_cluster_{label}"] = probabilities[:, i]
+    return result
+
+# Result of a single prediction: the cluster, the model's probability for it, and its genres
+MoodPrediction = namedtuple("MoodPrediction", ["cluster", "probability", "genres"])
+
+# Builds {cluster id: sorted tuple of genre names} from the genre_clusters table
+def build_cluster_genre_index(cluster_df):
+    genres = cluster_df.dropna(subset=["track_genre"]).groupby("cluster")["track_genre"]
+    return {int(cluster): tuple(sorted(names.unique())) for cluster, names in genres}
+
+# Keeps the classifier and the cluster → genres index in memory, so a prediction
+# is a single predict_proba call plus a dictionary lookup, with no disk access
+class MoodClusterPredictor:
+    def __init__(self, model, genres_by_cluster):
+        self.model = model
+        self.genres_by_cluster = genres_by_cluster
+
+    # Predicts the cluster for one track given its mood features as keyword arguments
+    def predict(self, **features):
+        row = pd.DataFrame([[features[f] for f in MOOD_FEATURES]], columns=MOOD_FEATURES)
+        probabilities = self.model.predict_proba(row)[0]
+        best = int(probabilities.argmax())
+        cluster = int(self.model.classes_[best])
+        return MoodPrediction(cluster, float(probabilities[best]), self.genres_by_cluster.get(cluster, ()))
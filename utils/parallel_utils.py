@@ -0,0 +1,155 @@
+# utils/parallel_utils.py
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+import pandas as pd
+
+# Below this many rows, per-region work runs in-process (starting a pool costs more than it saves)
+MIN_ROWS_FOR_POOL = 200_000
+
+# Every column buffer in the shared block starts on a cache-line boundary
+BUFFER_ALIGNMENT = 64
+
+# Nullable pandas arrays, shared as their values plus a missing-value mask
+MASKED_ARRAYS = (pd.arrays.IntegerArray, pd.arrays.FloatingArray, pd.arrays.BooleanArray)
+
+# Splits a column into flat numpy buffers plus what is needed to rebuild it (meta):
+# categoricals are shared as their codes, nullable columns as values and mask, numpy columns as they are.
+# Text and other object columns are factorized into categoricals, so they arrive in workers as categoricals.
+def _encode_column(series):
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return ("category", series.dtype), [series.cat.codes.to_numpy()]
+    if isinstance(series.array, MASKED_ARRAYS):
+        array = series.array
+        return ("masked", type(array)), [array.to_numpy(dtype=array.dtype.numpy_dtype, na_value=0), array.isna()]
+    if isinstance(series.dtype, np.dtype) and series.dtype.kind in "biufcmM":
+        return ("numpy", None), [series.to_numpy()]
+    codes, uniques = pd.factorize(series, sort=True)
+    return ("category", pd.CategoricalDtype(uniques)), [codes]
+
+# Rebuilds a column from its buffers without copying them
+def _decode_column(meta, buffers):
+    kind, info = meta
+    if kind == "category":
+        return pd.Categorical.from_codes(buffers[0], dtype=info)
+    if kind == "masked":
+        return info(buffers[0], buffers[1])
+    return buffers[0]
+
+# Rows start to stop of a shared frame as a DataFrame whose columns are read-only views of the block
+def _frame_view(spec, buf, start, stop):
+    columns = {}
+    for col, (meta, buffers) in spec["columns"].items():
+        views = []
+        for offset, dtype in buffers:
+            dtype = np.dtype(dtype)
+            view = np.ndarray(stop - start, dtype, buf, offset + start * dtype.itemsize)
+            view.flags.writeable = False
+            views.append(view)
+        columns[col] = _decode_column(meta, views)
+    return pd.DataFrame(columns, copy=False)
+
+# Attaches to an existing block (Python 3.13+ can skip registering it with the resource tracker,
+# which only the creating process should do, since it alone unlinks the block)
+def _attach(name):
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        return shared_memory.SharedMemory(name=name)
+
+# A DataFrame copied once into a shared memory block, with its rows grouped by region.
+# Worker processes attach to the block by name and read their region's rows as zero-copy views,
+# so partitions are never pickled; only the small spec (buffer offsets, categories) is sent, once per worker.
+# Rows with a missing region are left out. Use as a context manager: the block is freed on exit.
+class SharedFrame:
+    def __init__(self, df, region_col="region"):
+        codes, labels = pd.factorize(df[region_col], sort=True)
+        order = np.argsort(codes, kind="stable")
+        order = order[codes[order] >= 0]
+        counts = np.bincount(codes[codes >= 0], minlength=len(labels))
+        bounds = np.concatenate([[0], np.cumsum(counts)])
+        # (region, first row, end row) of every region, in region order
+        self.partitions = [(labels[i], int(bounds[i]), int(bounds[i + 1])) for i in range(len(labels)) if counts[i]]
+
+        # Lay out every column buffer in one block
+        encoded = {col: _encode_column(df[col]) for col in df.columns}
+        layout, size = {}, 0
+        for col, (meta, buffers) in encoded.items():
+            entries = []
+            for buffer in buffers:
+                size = -(-size // BUFFER_ALIGNMENT) * BUFFER_ALIGNMENT
+                entries.append((size, buffer.dtype.str))
+                size += buffer.dtype.itemsize * len(order)
+            layout[col] = (meta, entries)
+
+        # Copy the columns in region order straight into the block (one pass per buffer)
+        self.shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        for col, (meta, buffers) in encoded.items():
+            for (offset, dtype), buffer in zip(layout[col][1], buffers):
+                np.take(buffer, order, out=np.ndarray(len(order), dtype, self.shm.buf, offset))
+        self.spec = {"name": self.shm.name, "columns": layout}
+
+    # The rows of one partition, read in this process
+    def frame(self, start, stop):
+        return _frame_view(self.spec, self.shm.buf, start, stop)
+
+    def close(self):
+        try:
+            self.shm.close()
+        except BufferError:
+            # A result still references the block; the mapping is released once it is garbage collected
+            pass
+        self.shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+# The shared block as attached by this worker process
+_worker = {}
+
+def _init_worker(spec):
+    _worker["shm"] = _attach(spec["name"])
+    _worker["spec"] = spec
+
+def _run_partition(func, region, start, stop, kwargs):
+    return func(region, _frame_view(_worker["spec"], _worker["shm"].buf, start, stop), **kwargs)
+
+# Merges per-region results into one DataFrame with a leading region column:
+# a DataFrame result contributes its rows, a dict or Series one row
+def merge_region_results(results, region_col="region"):
+    frames = []
+    for region, result in results:
+        if isinstance(result, pd.DataFrame):
+            frame = result.reset_index(drop=True)
+        else:
+            frame = pd.DataFrame([dict(result)])
+        frame.insert(0, region_col, region)
+        frames.append(frame)
+    if not frames:
+        return pd.DataFrame(columns=[region_col])
+    return pd.concat(frames, ignore_index=True)
+
+# Runs func(region, rows, **kwargs) for every region of df and merges the results (see merge_region_results).
+# Regions are spread across a process pool (default: one process per CPU core) that reads them from a
+# SharedFrame; the largest regions are started first so one big region doesn't finish last.
+# func must be a module-level function, and its result must not be a view of the rows it was given.
+# Small inputs, or workers=1, run in-process on the same views.
+def map_regions(func, df, region_col="region", workers=None, **kwargs):
+    with SharedFrame(df, region_col) as shared:
+        workers = min(workers or os.cpu_count() or 1, len(shared.partitions))
+        if workers <= 1 or len(df) < MIN_ROWS_FOR_POOL:
+            results = [(region, func(region, shared.frame(start, stop), **kwargs))
+                       for region, start, stop in shared.partitions]
+            return merge_region_results(results, region_col)
+
+        largest_first = sorted(shared.partitions, key=lambda p: p[2] - p[1], reverse=True)
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(shared.spec,)) as pool:
+            futures = {region: pool.submit(_run_partition, func, region, start, stop, kwargs)
+                       for region, start, stop in largest_first}
+            results = [(region, futures[region].result()) for region, _, _ in shared.partitions]
+    return merge_region_results(results, region_col)
@@ -0,0 +1,83 @@
+# utils/pipeline_utils.py
+
+import hashlib
+import json
+import os
+
+# Size of each block read while hashing, large enough to keep big CSVs fast to fingerprint
+HASH_BLOCK_SIZE = 1024 * 1024
+
+# Loads the saved pipeline state (per-stage fingerprints and cached file hashes)
+# Returns an empty state if the file is missing or unreadable
+def load_state(path):
+    if not os.path.exists(path):
+        return {"stages": {}, "files": {}}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return {"stages": {}, "files": {}}
+    state.setdefault("stages", {})
+    state.setdefault("files", {})
+    return state
+
+# Writes the pipeline state atomically so an interrupted run never leaves a half-written file
+def save_state(path, state):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+# Computes the SHA-256 content hash of a single file
+# The hash is cached by (size, mtime) so unchanged multi-GB inputs are not re-read on every run
+def hash_file(path, file_cache):
+    stat = os.stat(path)
+    cached = file_cache.get(path)
+    if cached and cached["size"] == stat.st_size and cached["mtime_ns"] == stat.st_mtime_ns:
+        return cached["sha256"]
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+
+    file_cache[path] = {
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "sha256": digest.hexdigest()
+    }
+    return file_cache[path]["sha256"]
+
+# Hashes a file or every file under a directory (sorted, so the result is stable)
+# Returns None when the path does not exist
+def hash_path(path, file_cache):
+    if os.path.isfile(path):
+        return hash_file(path, file_cache)
+    if not os.path.isdir(path):
+        return None
+
+    digest = hashlib.sha256()
+    for root, dirs, files in os.walk(path):
+        dirs.sort()
+        for name in sorted(files):
+            file_path = os.path.join(root, name)
+            digest.update(os.path.relpath(file_path, path).encode("utf-8"))
+            digest.update(hash_file(file_path, file_cache).encode("ascii"))
+    return digest.hexdigest()
+
+# Builds a single fingerprint for a stage from the content of its inputs, its code and its arguments
+# Any change to an input file, the script itself, or a shared module it imports changes the fingerprint
+def fingerprint_stage(inputs, code, file_cache, args=()):
+    digest = hashlib.sha256()
+    digest.update(f"args:{json.dumps(list(args))}\n".encode("utf-8"))
+    for label, paths in (("input", inputs), ("code", code)):
+        for path in sorted(paths):
+            digest.update(f"{label}:{path}:{hash_path(path, file_cache)}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+# A stage is current when all its outputs exist and the recorded fingerprint still matches
+def is_stage_current(stage_name, fingerprint, outputs, state):
+    if not all(os.path.exists(path) for path in outputs):
+        return False
+    return state["stages"].get(stage_name, {}).get("fingerprint") == fingerprint
@@ -0,0 +1,90 @@
+# utils/rolling_utils.py
+
+import numpy as np
+import pandas as pd
+
+# Trailing windows (in days) of the rolling popularity measures
+ROLLING_WINDOWS = (7, 28, 90)
+
+# Days since the epoch for a date column (strings, datetimes or dates)
+def day_numbers(dates):
+    return pd.to_datetime(pd.Series(dates)).to_numpy().astype("datetime64[D]").astype(np.int64)
+
+# Trailing-window sums of values for many series at once, without a groupby per window.
+# Each observation belongs to a series (group code) and a day. All series are laid end to end on one
+# sorted axis (group * span + day), so one cumulative sum covers every series; the sum over the window
+# (day - w, day] is cumsum[upper] - cumsum[lower], with both bounds found by binary search.
+# Returns {w: sums} for the query points, which default to the observations themselves.
+def rolling_sums(group_codes, days, values, windows=ROLLING_WINDOWS, query_codes=None, query_days=None):
+    group_codes = np.asarray(group_codes, dtype=np.int64)
+    days = np.asarray(days, dtype=np.int64)
+    values = np.asarray(values, dtype=np.float64)
+    query_codes = group_codes if query_codes is None else np.asarray(query_codes, dtype=np.int64)
+    query_days = days if query_days is None else np.asarray(query_days, dtype=np.int64)
+    if len(days) == 0 or len(query_days) == 0:
+        return {w: np.zeros(len(query_days)) for w in windows}
+
+    # The span between series is wider than any day offset minus the longest window,
+    # so a window never reaches into the previous series
+    first_day = min(days.min(), query_days.min())
+    span = max(days.max(), query_days.max()) - first_day + max(windows) + 1
+    axis = group_codes * span + (days - first_day)
+    order = np.argsort(axis, kind="stable")
+    axis = axis[order]
+    cumulative = np.concatenate([[0.0], np.cumsum(values[order])])
+
+    query_axis = query_codes * span + (query_days - first_day)
+    upper = np.searchsorted(axis, query_axis, side="right")
+    return {
+        w: cumulative[upper] - cumulative[np.searchsorted(axis, query_axis - w, side="right")]
+        for w in windows
+    }
+
+# Rolling streams-weighted popularity of entities (genres, artists, languages, ...) within groups
+# (e.g. regions). daily holds the group columns, entity_col, "date" and "streams"; several rows per
+# entity and day are fine. For every window the result has streams_<w>d, the entity's streams over
+# the trailing w days, and share_<w>d, that as a share of all streams in the group over the same days
+# (group_totals: the same columns without entity_col; defaults to the sum over entities, which
+# double counts streams of entries with several entities, e.g. tracks with two genres).
+# Values are computed at each day an entity charted, or at every day in dates when given.
+def rolling_popularity(daily, entity_col, group_cols=(), windows=ROLLING_WINDOWS, group_totals=None, dates=None):
+    group_cols = list(group_cols)
+    keys = group_cols + [entity_col]
+    daily = daily[keys + ["date", "streams"]].dropna(subset=keys + ["date"])
+    days = day_numbers(daily["date"])
+    series_codes = daily.groupby(keys, observed=True, sort=False).ngroup().to_numpy()
+
+    # Query points: the observations themselves, or every series at every requested date
+    if dates is None:
+        points = daily[keys].assign(day=days).drop_duplicates()
+    else:
+        series = daily[keys].drop_duplicates()
+        grid = np.unique(day_numbers(dates))
+        points = series.loc[series.index.repeat(len(grid))].assign(day=np.tile(grid, len(series)))
+    points = points.reset_index(drop=True)
+    point_codes = points.merge(
+        daily[keys].assign(code=series_codes).drop_duplicates(keys), on=keys, how="left"
+    )["code"].to_numpy()
+
+    sums = rolling_sums(series_codes, days, daily["streams"].fillna(0).to_numpy(), windows,
+                        point_codes, points["day"].to_numpy())
+
+    # Streams of the whole group over the same windows
+    totals = (daily.drop(columns=entity_col) if group_totals is None else group_totals[group_cols + ["date", "streams"]])
+    if group_cols:
+        total_codes = totals.groupby(group_cols, observed=True, sort=False).ngroup().to_numpy()
+        lookup = totals[group_cols].assign(code=total_codes).drop_duplicates(group_cols)
+        point_total_codes = points[group_cols].merge(lookup, on=group_cols, how="left")["code"].fillna(-1).to_numpy()
+    else:
+        total_codes = np.zeros(len(totals), dtype=np.int64)
+        point_total_codes = np.zeros(len(points), dtype=np.int64)
+    total_sums = rolling_sums(total_codes, day_numbers(totals["date"]), totals["streams"].fillna(0).to_numpy(),
+                              windows, point_total_codes, points["day"].to_numpy())
+
+    result = points.drop(columns="day")
+    result["date"] = pd.to_datetime(points["day"].to_numpy().astype("datetime64[D]"))
+    for w in windows:
+        result[f"streams_{w}d"] = sums[w]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            result[f"share_{w}d"] = np.where(total_sums[w] > 0, sums[w] / total_sums[w], 0.0)
+    return result.sort_values(keys + ["date"]).reset_index(drop=True)
@@ -0,0 +1,109 @@
+# utils/schema_utils.py
+
+import argparse
+import numpy as np
+import pandas as pd
+
+# In-memory dtypes applied by every loader in utils/data_utils.py (see compact_frame)
+# The Parquet column types stay in data_utils (CHARTS_SCHEMA, AUDIO_FEATURES_SCHEMA); these only
+# decide how a column is held in pandas once it has been read.
+
+# Text columns that repeat a small set of values (a region or genre appears on millions of rows)
+# Held as categoricals: one small integer code per row plus each distinct string once
+CATEGORY_COLUMNS = [
+    "region", "chart", "trend", "market", "country", "region_name",
+    "artist_name", "track_name", "track_genre", "genre_name", "cluster_name", "language",
+]
+
+# Numeric columns downcast to the smallest type that holds their range
+# Audio features are 0-1 ratios, dB or BPM, so float32's ~7 significant digits lose nothing measurable
+NUMERIC_DTYPES = {
+    **{f: "float32" for f in [
+        "danceability", "energy", "loudness", "speechiness", "acousticness",
+        "instrumentalness", "liveness", "valence", "tempo",
+    ]},
+    "key": "int8",
+    "mode": "int8",
+    "time_signature": "int8",
+    "position": "int16",
+    "year": "int16",
+    "popularity": "int16",
+    "duration_ms": "int32",
+}
+
+FRAME_DTYPES = {**{c: "category" for c in CATEGORY_COLUMNS}, **NUMERIC_DTYPES}
+
+# A text column only becomes categorical if it has at most this many distinct values per row;
+# mostly-unique columns (e.g. track_name in the audio features) are smaller as plain strings
+CATEGORY_MAX_UNIQUE_RATIO = 0.5
+
+# Registered categorical columns present in a list of column names (e.g. for pyarrow's read_dictionary)
+def category_columns(columns):
+    return [c for c in columns if FRAME_DTYPES.get(c) == "category"]
+
+# Converts one column to its registered dtype, or returns it unchanged if the conversion doesn't fit
+def compact_column(series, dtype):
+    if dtype == "category":
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            values = series.cat.remove_unused_categories()
+        elif pd.api.types.is_object_dtype(series.dtype) or pd.api.types.is_string_dtype(series.dtype):
+            values = series.astype("category")
+        else:
+            return series
+        if values.cat.categories.size > CATEGORY_MAX_UNIQUE_RATIO * len(series):
+            return values.astype(values.cat.categories.dtype)
+        # Sorted categories keep groupby and factorize(sort=True) in alphabetical order,
+        # whether the column came from CSV or from a Parquet dictionary
+        return values.cat.set_categories(values.cat.categories.sort_values())
+
+    if not pd.api.types.is_numeric_dtype(series.dtype) or pd.api.types.is_bool_dtype(series.dtype):
+        return series
+    if dtype.startswith("float"):
+        return series.astype(dtype) if pd.api.types.is_float_dtype(series.dtype) else series
+
+    # Integers: only when every value fits; missing values need pandas' nullable integer type
+    limits = np.iinfo(dtype)
+    values = series.dropna()
+    if not values.empty and ((values % 1 != 0).any() or values.min() < limits.min or values.max() > limits.max):
+        return series
+    return series.astype(dtype.capitalize() if series.hasnans else dtype)
+
+# Applies the registered dtypes to every matching column of a DataFrame (in place, and returns it)
+# downcast=False only applies the categoricals, e.g. for small frames that end up in charts and tooltips
+def compact_frame(df, dtypes=None, downcast=True):
+    dtypes = FRAME_DTYPES if dtypes is None else dtypes
+    for col, dtype in dtypes.items():
+        if col in df.columns and (downcast or dtype == "category"):
+            df[col] = compact_column(df[col], dtype)
+    return df
+
+# Per-column dtype and memory of a frame before and after compact_frame, largest columns first
+def memory_report(df):
+    before = df.memory_usage(deep=True, index=False)
+    compact = compact_frame(df.copy())
+    after = compact.memory_usage(deep=True, index=False)
+    report = pd.DataFrame({
+        "dtype_before": df.dtypes.astype(str),
+        "mb_before": before / 2**20,
+        "dtype_after": compact.dtypes.astype(str),
+        "mb_after": after / 2**20,
+    }).sort_values("mb_before", ascending=False)
+    report.loc["total"] = ["", report["mb_before"].sum(), "", report["mb_after"].sum()]
+    return report
+
+# Command line: python utils/schema_utils.py charts|audio_features prints the memory saved per column
+if __name__ == "__main__":
+    import os, sys
+    sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+    from utils.data_utils import load_charts, load_audio_features
+
+    parser = argparse.ArgumentParser(description="Show how much memory the in-memory schema saves on a dataset.")
+    parser.add_argument("dataset", choices=["charts", "audio_features"])
+    args = parser.parse_args()
+
+    loader = load_charts if args.dataset == "charts" else load_audio_features
+    report = memory_report(loader(compact=False))
+    total = report.loc["total"]
+    print(report.round(2).to_string())
+    print(f"\n{args.dataset}: {total['mb_before']:,.1f} MB -> {total['mb_after']:,.1f} MB "
+          f"({total['mb_before'] / max(total['mb_after'], 1e-9):.1f}x smaller)")
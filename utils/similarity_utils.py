@@ -0,0 +1,153 @@
+# utils/similarity_utils.py
+
+import os
+import json
+from concurrent.futures import ThreadPoolExecutor
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.neighbors import KDTree
+from utils.model_utils import MOOD_FEATURES
+
+# Persisted index: the KD-tree (its arrays are memory-mapped on load), the track metadata
+# aligned with the tree's rows, per-genre centroids, and the scaling used to standardize features
+INDEX_DIR = os.path.join("models", "similarity_index")
+TREE_FILE = "tree.joblib"
+TRACKS_FILE = "tracks.parquet"
+GENRES_FILE = "genre_centroids.parquet"
+META_FILE = "meta.json"
+
+# Track columns kept alongside the vectors so results can be shown without another lookup
+TRACK_COLUMNS = ["track_id", "track_name", "artist_name", "track_genre"]
+
+# Leaf size of the KD-tree; 8 dimensions is well within the range where KD-trees beat brute force
+LEAF_SIZE = 40
+
+# Rows per query batch when answering many queries at once
+QUERY_BATCH_SIZE = 10_000
+
+# Nearest-neighbour index over standardized mood feature vectors
+# - similar_tracks / similar_tracks_batch: tracks that sound most like given tracks
+# - similar_to_features: tracks closest to a hand-picked feature profile
+# - similar_genres: genres whose average sound is closest to a given genre
+class SimilarityIndex:
+    def __init__(self, tree, tracks, genre_centroids, mean, std):
+        self.tree = tree
+        self.tracks = tracks.reset_index(drop=True)
+        self.genre_centroids = genre_centroids
+        self.mean = np.asarray(mean, dtype=np.float64)
+        self.std = np.asarray(std, dtype=np.float64)
+        self.row_by_id = pd.Series(self.tracks.index, index=self.tracks["track_id"])
+
+    # Builds the index from audio features (one row per track and genre, as in audio_features_cleaned)
+    # Each feature is scaled to zero mean and unit variance so tempo doesn't dominate the distance
+    @classmethod
+    def build(cls, df, leaf_size=LEAF_SIZE):
+        df = df.dropna(subset=MOOD_FEATURES)
+        values = df[MOOD_FEATURES].to_numpy(dtype=np.float64)
+        mean = values.mean(axis=0)
+        std = values.std(axis=0)
+        std[std == 0] = 1.0
+        scaled = (values - mean) / std
+
+        # Genre centroids use every row; the tree holds each track once
+        centroids = pd.DataFrame(scaled, columns=MOOD_FEATURES, index=df.index)
+        centroids["track_genre"] = df["track_genre"]
+        centroids = centroids.dropna(subset=["track_genre"]).groupby("track_genre", observed=True)[MOOD_FEATURES].mean()
+
+        first = ~df["track_id"].duplicated().to_numpy()
+        tracks = df.loc[first, [c for c in TRACK_COLUMNS if c in df.columns]]
+        tree = KDTree(scaled[first], leaf_size=leaf_size)
+        return cls(tree, tracks, centroids, mean, std)
+
+    # Writes the index to a directory; the tree goes through joblib so its arrays can be memory-mapped
+    def save(self, index_dir=INDEX_DIR):
+        os.makedirs(index_dir, exist_ok=True)
+        joblib.dump(self.tree, os.path.join(index_dir, TREE_FILE))
+        self.tracks.to_parquet(os.path.join(index_dir, TRACKS_FILE), index=False)
+        self.genre_centroids.to_parquet(os.path.join(index_dir, GENRES_FILE))
+        with open(os.path.join(index_dir, META_FILE), "w", encoding="utf-8") as f:
+            json.dump({"features": MOOD_FEATURES, "mean": self.mean.tolist(), "std": self.std.tolist(),
+                       "tracks": len(self.tracks)}, f, indent=2)
+
+    # Loads a saved index; with mmap=True the tree's arrays stay on disk and are paged in on demand,
+    # so loading takes milliseconds and several processes share one copy in the OS page cache
+    @classmethod
+    def load(cls, index_dir=INDEX_DIR, mmap=True):
+        tree = joblib.load(os.path.join(index_dir, TREE_FILE), mmap_mode="r" if mmap else None)
+        tracks = pd.read_parquet(os.path.join(index_dir, TRACKS_FILE))
+        centroids = pd.read_parquet(os.path.join(index_dir, GENRES_FILE))
+        with open(os.path.join(index_dir, META_FILE), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta["features"] != MOOD_FEATURES:
+            raise ValueError(f"Index in {index_dir} was built for features {meta['features']}")
+        return cls(tree, tracks, centroids, meta["mean"], meta["std"])
+
+    # Scales raw feature values the same way the indexed vectors were scaled
+    def standardize(self, values):
+        return (np.asarray(values, dtype=np.float64) - self.mean) / self.std
+
+    # Returns the k tracks closest to each standardized vector, excluding the given rows
+    # Result: one row per (query, neighbour) with the query position, rank and distance
+    def _query(self, vectors, k, exclude_rows=None):
+        extra = 0 if exclude_rows is None else 1
+        distances, rows = self.tree.query(vectors, k=min(k + extra, len(self.tracks)))
+
+        query_pos = np.repeat(np.arange(len(vectors)), rows.shape[1])
+        result = self.tracks.iloc[rows.ravel()].reset_index(drop=True)
+        result.insert(0, "query", query_pos)
+        result["distance"] = distances.ravel()
+
+        if exclude_rows is not None:
+            result = result[rows.ravel() != np.repeat(exclude_rows, rows.shape[1])]
+        result = result.groupby("query").head(k)
+        result.insert(1, "rank", result.groupby("query").cumcount() + 1)
+        return result.reset_index(drop=True)
+
+    # Top-k tracks that sound most like the given track (the track itself is excluded)
+    def similar_tracks(self, track_id, k=10):
+        if track_id not in self.row_by_id.index:
+            raise KeyError(f"Unknown track_id: {track_id}")
+        row = int(self.row_by_id[track_id])
+        vector = np.asarray(self.tree.data[row]).reshape(1, -1)
+        return self._query(vector, k, exclude_rows=np.array([row])).drop(columns="query")
+
+    # Top-k similar tracks for many tracks at once
+    # Queries run in batches on a thread pool (the tree search releases the GIL), so all cores are used.
+    # Unknown track IDs are skipped. Returns query_track_id, rank, the neighbour's columns and distance.
+    def similar_tracks_batch(self, track_ids, k=10, workers=None, batch_size=QUERY_BATCH_SIZE):
+        known = [tid for tid in dict.fromkeys(track_ids) if tid in self.row_by_id.index]
+        rows = self.row_by_id[known].to_numpy()
+        data = np.asarray(self.tree.data)
+
+        def run(start):
+            batch = rows[start:start + batch_size]
+            result = self._query(data[batch], k, exclude_rows=batch)
+            result["query"] += start
+            return result
+
+        with ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+            parts = list(pool.map(run, range(0, len(rows), batch_size)))
+        if not parts:
+            return pd.DataFrame(columns=["query_track_id", "rank"] + list(self.tracks.columns) + ["distance"])
+
+        result = pd.concat(parts, ignore_index=True)
+        result["query"] = np.asarray(known, dtype=object)[result["query"].to_numpy()]
+        return result.rename(columns={"query": "query_track_id"})
+
+    # Top-k tracks closest to a feature profile given as keyword arguments (e.g. valence=0.8, ...)
+    def similar_to_features(self, k=10, **features):
+        vector = self.standardize([[features[f] for f in MOOD_FEATURES]])
+        return self._query(vector, k).drop(columns="query")
+
+    # Top-k genres whose average (standardized) sound is closest to the given genre
+    # There are only a few hundred genres, so an exact distance over all centroids is fastest
+    def similar_genres(self, genre, k=10):
+        if genre not in self.genre_centroids.index:
+            raise KeyError(f"Unknown genre: {genre}")
+        centroids = self.genre_centroids.to_numpy()
+        distances = np.linalg.norm(centroids - self.genre_centroids.loc[genre].to_numpy(), axis=1)
+        result = pd.DataFrame({"track_genre": self.genre_centroids.index, "distance": distances})
+        result = result[result["track_genre"] != genre].nsmallest(k, "distance").reset_index(drop=True)
+        result.insert(0, "rank", result.index + 1)
+        return result
@@ -1,6 +1,10 @@
 # utils/spotify_auth.py
 
 import os
+import json
+import time
+import threading
+from contextlib import contextmanager
 import requests
 from dotenv import load_dotenv
 
@@ -8,25 +12,158 @@ from dotenv import load_dotenv
 # This avoids hardcoding sensitive credentials like client_id or client_secret
 load_dotenv()
 
-# Retrieves an app-level Spotify access token using Client Credentials Flow
-def get_token():
-    auth_url = "https://accounts.spotify.com/api/token"
-    auth_data = {'grant_type': 'client_credentials'}
+AUTH_URL = "https://accounts.spotify.com/api/token"
+
+# Tokens are cached on disk so threads, worker processes and separate scripts share them
+# (override the location with SPOTIFY_TOKEN_CACHE; the file holds secrets, so it is git-ignored)
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+TOKEN_CACHE_PATH = os.getenv("SPOTIFY_TOKEN_CACHE", os.path.join(PROJECT_ROOT, ".spotify_token_cache.json"))
+
+# A cached token is treated as expired this many seconds before Spotify's expires_in,
+# so a request never goes out with a token that lapses in flight
+EXPIRY_MARGIN_SECONDS = 60
+
+# Reads every configured client-credential pair
+# SPOTIFY_CREDENTIALS may list several pairs as "id1:secret1,id2:secret2" to spread rate limits;
+# the single SPOTIFY_CLIENT_ID / SPOTIFY_CLIENT_SECRET pair is always included if set
+def load_credentials():
+    credentials = []
+    for pair in os.getenv("SPOTIFY_CREDENTIALS", "").split(","):
+        if ":" in pair:
+            client_id, client_secret = pair.strip().split(":", 1)
+            credentials.append((client_id, client_secret))
 
-    # Load client credentials from environment variables
     client_id = os.getenv("SPOTIFY_CLIENT_ID")
     client_secret = os.getenv("SPOTIFY_CLIENT_SECRET")
+    if client_id and client_secret and (client_id, client_secret) not in credentials:
+        credentials.append((client_id, client_secret))
 
     # Raise an error if credentials are missing or not properly set
-    if not client_id or not client_secret:
+    if not credentials:
         raise Exception("Missing Spotify credentials in environment variables or .env file.")
+    return credentials
+
+# Requests a new app-level access token using the Client Credentials Flow
+# Returns the token and the absolute time (epoch seconds) at which it should be considered expired
+def request_token(client_id, client_secret):
+    auth_data = {'grant_type': 'client_credentials'}
 
     # Make a POST request to Spotify's authentication endpoint
-    auth_response = requests.post(auth_url, data=auth_data, auth=(client_id, client_secret))
+    auth_response = requests.post(AUTH_URL, data=auth_data, auth=(client_id, client_secret))
 
     # If the response fails, raise an exception with the returned error message
     if auth_response.status_code != 200:
         raise Exception(f"Spotify auth failed: {auth_response.text}")
 
-    # Extract and return the access token from the JSON response
-    return auth_response.json()['access_token']
\ No newline at end of file
+    payload = auth_response.json()
+    expires_at = time.time() + payload.get("expires_in", 3600) - EXPIRY_MARGIN_SECONDS
+    return payload['access_token'], expires_at
+
+# Holds an exclusive lock on <path>.lock for the duration of the block
+# Uses fcntl on POSIX and msvcrt on Windows, so it also serializes separate processes
+@contextmanager
+def locked_file(path):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path + ".lock", "a+") as lock_file:
+        if os.name == "nt":
+            import msvcrt
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if os.name == "nt":
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+# Reads the on-disk token cache ({client_id: {"access_token": ..., "expires_at": ...}})
+def read_token_cache(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+# Writes the token cache atomically, readable only by the current user
+def write_token_cache(path, cache):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(cache, f)
+    if os.name != "nt":
+        os.chmod(tmp_path, 0o600)
+    os.replace(tmp_path, path)
+
+# Hands out cached access tokens, refreshing them only when they are about to expire
+# - an in-memory cache serves repeated calls in the same process without touching the disk
+# - a locked cache file shares tokens across threads and worker processes, so only one of them
+#   performs the auth round-trip when a token expires
+# - with several credential pairs configured, calls rotate round-robin across them
+class TokenManager:
+    def __init__(self, credentials=None, cache_path=TOKEN_CACHE_PATH, rotate=True):
+        self.credentials = credentials or load_credentials()
+        self.cache_path = cache_path
+        self.rotate = rotate
+        self.lock = threading.Lock()
+        self.memory = {}
+        self.next_index = 0
+
+    # Picks the credential pair for this call
+    def _next_credentials(self):
+        with self.lock:
+            pair = self.credentials[self.next_index % len(self.credentials)]
+            if self.rotate:
+                self.next_index += 1
+        return pair
+
+    # Returns a valid access token, from memory, from the shared cache file, or from Spotify
+    def get_token(self):
+        client_id, client_secret = self._next_credentials()
+
+        cached = self.memory.get(client_id)
+        if cached and cached["expires_at"] > time.time():
+            return cached["access_token"]
+
+        with self.lock, locked_file(self.cache_path):
+            cache = read_token_cache(self.cache_path)
+            cached = cache.get(client_id)
+            if not cached or cached["expires_at"] <= time.time():
+                access_token, expires_at = request_token(client_id, client_secret)
+                cached = {"access_token": access_token, "expires_at": expires_at}
+                cache[client_id] = cached
+                write_token_cache(self.cache_path, cache)
+            self.memory[client_id] = cached
+            return cached["access_token"]
+
+    # Drops a token the API rejected (HTTP 401) so the next call fetches a fresh one
+    def invalidate(self, token):
+        with self.lock, locked_file(self.cache_path):
+            self.memory = {cid: t for cid, t in self.memory.items() if t["access_token"] != token}
+            cache = read_token_cache(self.cache_path)
+            remaining = {cid: t for cid, t in cache.items() if t.get("access_token") != token}
+            if remaining != cache:
+                write_token_cache(self.cache_path, remaining)
+
+# Process-wide token manager, created on first use
+_manager = None
+_manager_lock = threading.Lock()
+
+def get_token_manager():
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = TokenManager()
+        return _manager
+
+# Retrieves an app-level Spotify access token using Client Credentials Flow
+# Tokens are cached until shortly before they expire, so calling this per request is cheap
+def get_token():
+    return get_token_manager().get_token()
+
+# Marks a token as rejected so the next get_token() call replaces it
+def invalidate_token(token):
+    get_token_manager().invalidate(token)
@@ -0,0 +1,76 @@
+# utils/trend_utils.py
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+# Fits a least-squares line of yearly counts against year for every group at once
+# df holds one row per observation (e.g. one chart entry) with the group columns and a year column.
+# Counts are scattered into a single (group_1 × group_2 × ... × year) tensor with np.bincount,
+# and slope, intercept, R² and a two-sided p-value for the slope are computed in closed form.
+# Groups whose total count over the range is below min_count are dropped.
+def compute_trend_slopes(df, group_cols, year_col="year", start_year=2018, end_year=2023, min_count=10):
+    years = np.arange(start_year, end_year + 1)
+    n_years = len(years)
+    if n_years < 2:
+        raise ValueError("A trend needs at least two years")
+
+    in_range = df[year_col].between(start_year, end_year)
+    df = df.loc[in_range, list(group_cols) + [year_col]].dropna()
+
+    # Encode each group column as integer codes and build one flat index into the count tensor
+    codes, levels = [], []
+    for col in group_cols:
+        col_codes, col_levels = pd.factorize(df[col], sort=True)
+        codes.append(col_codes)
+        levels.append(col_levels)
+    shape = tuple(len(lv) for lv in levels) + (n_years,)
+
+    flat_index = np.ravel_multi_index(
+        tuple(codes) + (df[year_col].to_numpy().astype(np.int64) - start_year,),
+        shape
+    )
+    counts = np.bincount(flat_index, minlength=int(np.prod(shape))).reshape(-1, n_years).astype(np.float64)
+
+    # Keep only groups that were observed and meet the minimum total count
+    totals = counts.sum(axis=1)
+    keep = (totals > 0) & (totals >= min_count)
+    counts = counts[keep]
+    group_index = np.nonzero(keep)[0]
+
+    # Ordinary least squares for every row of counts against the same year vector
+    x_mean = years.mean()
+    x_centered = years - x_mean
+    sxx = np.sum(x_centered ** 2)
+    y_mean = counts.mean(axis=1)
+    slope = counts @ x_centered / sxx
+    intercept = y_mean - slope * x_mean
+
+    residuals = counts - (intercept[:, None] + slope[:, None] * years[None, :])
+    ss_res = np.sum(residuals ** 2, axis=1)
+    ss_tot = np.sum((counts - y_mean[:, None]) ** 2, axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        r2 = np.where(ss_tot > 0, 1 - ss_res / ss_tot, 0.0)
+
+        # t-test of the slope against zero with n - 2 degrees of freedom
+        dof = n_years - 2
+        if dof > 0:
+            std_err = np.sqrt(ss_res / dof / sxx)
+            t_stat = slope / std_err
+            p_value = 2 * stats.t.sf(np.abs(t_stat), dof)
+            # A perfect fit has zero standard error: significant if the slope is non-zero
+            p_value = np.where(std_err == 0, np.where(slope == 0, 1.0, 0.0), p_value)
+        else:
+            p_value = np.full(len(slope), np.nan)
+
+    # Translate the flat group positions back to the original labels
+    group_positions = np.unravel_index(group_index, shape[:-1])
+    result = pd.DataFrame({
+        col: np.asarray(lv)[pos] for col, lv, pos in zip(group_cols, levels, group_positions)
+    })
+    result["slope"] = slope
+    result["intercept"] = intercept
+    result["r2"] = r2
+    result["p_value"] = p_value
+    result["total_count"] = totals[keep].astype(np.int64)
+    return result